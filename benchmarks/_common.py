@@ -0,0 +1,130 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The benchmarks talk to a local MongoDB server that stands in for the Atlas cluster.
+Start one with e.g. `mongod --dbpath /tmp/mongo-bench` and point MONGO_DB_URL at it
+(defaults to mongodb://localhost:27017).
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+os.environ.setdefault("MONGO_DB_URL", "mongodb://localhost:27017")
+
+BENCH_COLLECTION_NAME = "Proj1-Data-bench"
+INSERT_CHUNK_SIZE = 50_000
+
+
+def synthetic_documents(n_docs: int, start_id: int = 0, seed: int = 42, na_rate: float = 0.001):
+    """
+    Yields Proj1-Data shaped documents with realistic value ranges.
+    A small share of the numeric fields is set to the string "na", as in the real collection.
+    """
+    rng = np.random.default_rng(seed + start_id)
+    genders = np.array(["Male", "Female"])
+    vehicle_ages = np.array(["< 1 Year", "1-2 Year", "> 2 Years"])
+    damages = np.array(["Yes", "No"])
+    for offset in range(0, n_docs, INSERT_CHUNK_SIZE):
+        size = min(INSERT_CHUNK_SIZE, n_docs - offset)
+        age = rng.integers(20, 86, size)
+        region = rng.integers(0, 53, size).astype(float)
+        premium = np.round(rng.uniform(2630, 540165, size), 1)
+        channel = rng.integers(1, 164, size).astype(float)
+        vintage = rng.integers(10, 300, size)
+        na_mask = rng.random(size) < na_rate
+        for i in range(size):
+            yield {
+                "id": start_id + offset + i + 1,
+                "Gender": str(genders[rng.integers(0, 2)]),
+                "Age": int(age[i]),
+                "Driving_License": int(rng.random() < 0.998),
+                "Region_Code": "na" if na_mask[i] else float(region[i]),
+                "Previously_Insured": int(rng.random() < 0.46),
+                "Vehicle_Age": str(vehicle_ages[rng.integers(0, 3)]),
+                "Vehicle_Damage": str(damages[rng.integers(0, 2)]),
+                "Annual_Premium": float(premium[i]),
+                "Policy_Sales_Channel": float(channel[i]),
+                "Vintage": int(vintage[i]),
+                "Response": int(rng.random() < 0.12),
+            }
+
+
+def synthetic_frame(n_rows: int, seed: int = 42, na_rate: float = 0.001):
+    """Vectorized equivalent of `synthetic_documents` as a DataFrame, with "na" already turned into NaN."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    region = rng.integers(0, 53, n_rows).astype(float)
+    region[rng.random(n_rows) < na_rate] = np.nan
+    return pd.DataFrame({
+        "id": np.arange(1, n_rows + 1),
+        "Gender": rng.choice(["Male", "Female"], n_rows),
+        "Age": rng.integers(20, 86, n_rows),
+        "Driving_License": (rng.random(n_rows) < 0.998).astype(int),
+        "Region_Code": region,
+        "Previously_Insured": (rng.random(n_rows) < 0.46).astype(int),
+        "Vehicle_Age": rng.choice(["< 1 Year", "1-2 Year", "> 2 Years"], n_rows),
+        "Vehicle_Damage": rng.choice(["Yes", "No"], n_rows),
+        "Annual_Premium": np.round(rng.uniform(2630, 540165, n_rows), 1),
+        "Policy_Sales_Channel": rng.integers(1, 164, n_rows).astype(float),
+        "Vintage": rng.integers(10, 300, n_rows),
+        "Response": (rng.random(n_rows) < 0.12).astype(int),
+    })
+
+
+def seed_collection(n_docs: int, collection_name: str = BENCH_COLLECTION_NAME) -> None:
+    """Fills the benchmark collection with `n_docs` synthetic documents unless it already holds exactly that many."""
+    import pymongo
+    from vehicle_insurance_prediction.constants import DATABASE_NAME
+
+    client = pymongo.MongoClient(os.environ["MONGO_DB_URL"])
+    collection = client[DATABASE_NAME][collection_name]
+    if collection.estimated_document_count() == n_docs:
+        return
+    collection.drop()
+    started = time.perf_counter()
+    chunk = []
+    for document in synthetic_documents(n_docs):
+        chunk.append(document)
+        if len(chunk) == INSERT_CHUNK_SIZE:
+            collection.insert_many(chunk, ordered=False)
+            chunk = []
+    if chunk:
+        collection.insert_many(chunk, ordered=False)
+    print(f"seeded {n_docs} documents into {collection_name} in {time.perf_counter() - started:.1f}s")
+
+
+def _isolated_target(queue, func, args, kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((result, elapsed, peak_rss_mb))
+
+
+def run_isolated(func, *args, **kwargs):
+    """
+    Runs `func` in a fresh interpreter and returns (result, seconds, peak RSS in MiB),
+    so every measured path starts from the same memory baseline.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_isolated_target, args=(queue, func, args, kwargs))
+    process.start()
+    outcome = queue.get()
+    process.join()
+    return outcome
+
+
+def print_table(header, rows) -> None:
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
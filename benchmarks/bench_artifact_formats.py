@@ -0,0 +1,62 @@
+"""
+Benchmark the tabular artifact formats of the pipeline (csv, parquet, feather).
+
+Replays the artifact I/O of one pipeline run on a synthetic dataset:
+  * write   - feature store, train and test files (DataIngestion)
+  * read    - train + test read twice (DataValidation, DataTransformation) and test once (ModelEvaluation)
+  * select  - train read restricted to two columns
+and reports the seconds spent and the on-disk size for every format.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_artifact_formats.py --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from _common import print_table, synthetic_frame
+
+from vehicle_insurance_prediction.constants.training_pipeline import ARTIFACT_FILE_EXTENSIONS
+from vehicle_insurance_prediction.utils.main_utils import read_dataframe, write_dataframe
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    dataframe = synthetic_frame(args.rows)
+    train_df = dataframe.sample(frac=0.8, random_state=42)
+    test_df = dataframe.drop(train_df.index)
+
+    rows = []
+    for file_format, extension in ARTIFACT_FILE_EXTENSIONS.items():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = {name: os.path.join(tmp_dir, name + extension) for name in ("feature_store", "train", "test")}
+
+            started = time.perf_counter()
+            write_dataframe(paths["feature_store"], dataframe)
+            write_dataframe(paths["train"], train_df)
+            write_dataframe(paths["test"], test_df)
+            write_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for _ in range(2):
+                read_dataframe(paths["train"])
+                read_dataframe(paths["test"])
+            read_dataframe(paths["test"])
+            read_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            read_dataframe(paths["train"], columns=["id", "Response"])
+            select_seconds = time.perf_counter() - started
+
+            size_mb = sum(os.path.getsize(path) for path in paths.values()) / 2 ** 20
+            rows.append((file_format, f"{write_seconds:.2f}", f"{read_seconds:.2f}", f"{select_seconds:.2f}", f"{size_mb:.1f}"))
+
+    print_table(("format", "write_s", "read_s", "select_s", "size_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark the ModelTrainer backends on the same transformed arrays.
+
+Compares:
+  * RandomForestClassifier          - the trainer's 200-tree, depth-10 forest
+  * HistGradientBoostingClassifier  - histogram gradient boosting with early stopping
+
+For each backend the benchmark reports training seconds, pickled model size, single-row predict latency
+(median over --single-row-calls calls, as an endpoint serving one record sees it), batch predict latency
+on the test split and test F1. Both backends use the defaults of the model backend registry.
+
+Pass the transformed arrays of a pipeline run with --train/--test (features .npy; the *_target.npy
+files next to them are picked up), or leave them out to use synthetic arrays.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_model_backends.py --rows 1000000
+    PYTHONPATH=src python benchmarks/bench_model_backends.py \
+        --train artifact/<run>/data_transformation/transformed/train.npy \
+        --test artifact/<run>/data_transformation/transformed/test.npy
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from _common import print_table, run_isolated
+
+N_FEATURES = 10
+MINORITY_SHARE = 0.12
+
+
+def synthetic_arrays(tmp_dir, n_rows, seed=42):
+    from vehicle_insurance_prediction.utils.main_utils import save_numpy_array_data
+
+    rng = np.random.default_rng(seed)
+    paths = []
+    for split, size in (("train", n_rows), ("test", n_rows // 4)):
+        y = (rng.random(size) < MINORITY_SHARE).astype(np.int8)
+        X = rng.standard_normal((size, N_FEATURES)).astype(np.float32)
+        X[y == 1, :3] += 0.75
+        features_path = os.path.join(tmp_dir, f"{split}.npy")
+        save_numpy_array_data(features_path, X)
+        save_numpy_array_data(os.path.join(tmp_dir, f"{split}_target.npy"), y)
+        paths.append(features_path)
+    return paths
+
+
+def target_path(features_path):
+    path = os.path.splitext(features_path)[0] + "_target.npy"
+    return path if os.path.exists(path) else ""
+
+
+def train_and_measure(model_class, train_path, test_path, n_jobs, single_row_calls):
+    from sklearn.metrics import f1_score
+    from vehicle_insurance_prediction.utils.main_utils import load_feature_target_arrays
+    from vehicle_insurance_prediction.utils.model_backends import get_model_backend
+
+    x_train, y_train = load_feature_target_arrays(train_path, target_path(train_path), mmap_mode="r")
+    x_test, y_test = load_feature_target_arrays(test_path, target_path(test_path), mmap_mode="r")
+    backend = get_model_backend(model_class)
+    model = backend.build({}, n_jobs)
+
+    started = time.perf_counter()
+    backend.fit(model, x_train, y_train, n_jobs)
+    fit_seconds = time.perf_counter() - started
+    size_mb = len(pickle.dumps(model)) / 2 ** 20
+
+    row = np.asarray(x_test[:1])
+    latencies = []
+    for _ in range(single_row_calls):
+        started = time.perf_counter()
+        model.predict(row)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    y_pred = model.predict(x_test)
+    batch_seconds = time.perf_counter() - started
+    return fit_seconds, size_mb, float(np.median(latencies)) * 1000, batch_seconds, float(f1_score(y_test, y_pred))
+
+
+def main():
+    from vehicle_insurance_prediction.utils.main_utils import get_available_cpus
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--train", type=str, default="")
+    parser.add_argument("--test", type=str, default="")
+    parser.add_argument("--n-jobs", type=int, default=get_available_cpus())
+    parser.add_argument("--single-row-calls", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        train_path, test_path = (args.train, args.test) if args.train else synthetic_arrays(tmp_dir, args.rows)
+        for model_class in ("RandomForestClassifier", "HistGradientBoostingClassifier"):
+            (fit_seconds, size_mb, single_row_ms, batch_seconds, f1), _, peak_rss_mb = run_isolated(
+                train_and_measure, model_class, train_path, test_path, args.n_jobs, args.single_row_calls)
+            rows.append((model_class, f"{fit_seconds:.1f}", f"{size_mb:,.1f}", f"{single_row_ms:.2f}",
+                         f"{batch_seconds:.2f}", f"{f1:.4f}", f"{peak_rss_mb:,.0f}"))
+
+    print_table(("model", "fit_s", "pickle_mb", "single_row_ms", "batch_s", "f1", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark the MongoDB client settings against a local MongoDB stand-in.
+
+Every run exports the projected collection through the same streaming path as ingestion
+(--workers parallel partitions) with one setting changed from the defaults:
+  * pool      - MONGO_MAX_POOL_SIZE
+  * compress  - MONGO_COMPRESSORS (none, zlib, snappy, zstd)
+  * batch     - MONGO_CURSOR_BATCH_SIZE
+  * read_pref - MONGO_EXPORT_READ_PREFERENCE
+
+Each setting runs in a fresh interpreter, as the client is created once per process.
+On a loopback server compression only shows its CPU cost; the wire savings appear
+against a remote cluster (point MONGO_DB_URL at it).
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_mongo_client.py --size 1000000 --workers 4
+"""
+import argparse
+import os
+
+from _common import BENCH_COLLECTION_NAME, print_table, run_isolated, seed_collection
+
+SETTINGS = [
+    ("defaults", {}),
+    ("pool", {"MONGO_MAX_POOL_SIZE": "4"}),
+    ("pool", {"MONGO_MAX_POOL_SIZE": "100"}),
+    ("compress", {"MONGO_COMPRESSORS": "none"}),
+    ("compress", {"MONGO_COMPRESSORS": "zlib"}),
+    ("compress", {"MONGO_COMPRESSORS": "snappy"}),
+    ("compress", {"MONGO_COMPRESSORS": "zstd"}),
+    ("batch", {"MONGO_CURSOR_BATCH_SIZE": "101"}),
+    ("batch", {"MONGO_CURSOR_BATCH_SIZE": "1000"}),
+    ("batch", {"MONGO_CURSOR_BATCH_SIZE": "10000"}),
+    ("read_pref", {"MONGO_EXPORT_READ_PREFERENCE": "primary"}),
+    ("read_pref", {"MONGO_EXPORT_READ_PREFERENCE": "secondaryPreferred"}),
+]
+
+
+def export(env, collection_name, batch_size, n_workers):
+    os.environ.update(env)
+    from vehicle_insurance_prediction.components.data_ingestion import DataIngestion
+    from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+
+    columns = DataIngestion().get_projection_columns()
+    return sum(len(partition_df) for partition_df in Proj1Data().iter_collection_partitions(
+        collection_name=collection_name, n_workers=n_workers, batch_size=batch_size, columns=columns))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    seed_collection(args.size)
+    rows = []
+    for name, env in SETTINGS:
+        n_rows, seconds, peak_rss_mb = run_isolated(export, env, BENCH_COLLECTION_NAME, args.batch_size, args.workers)
+        value = ",".join(env.values()) or "-"
+        rows.append((name, value, n_rows, f"{seconds:.2f}", f"{n_rows / seconds:,.0f}", f"{peak_rss_mb:,.0f}"))
+    print_table(("setting", "value", "rows", "seconds", "rows/s", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark BSON decoding during export against a local MongoDB stand-in.
+
+Compares:
+  * dict      - cursor documents decoded into per-document dicts, then pivoted into columns
+  * raw_bson  - raw BSON batches decoded straight into typed arrow column buffers (needs pymongoarrow)
+
+Both paths request the same projected fields and stream in batches of --batch-size documents.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_mongo_decode.py --sizes 1000000 --batch-size 10000 --check-parity
+"""
+import argparse
+
+from _common import BENCH_COLLECTION_NAME, print_table, run_isolated, seed_collection
+
+
+def _field_types():
+    from vehicle_insurance_prediction.components.data_ingestion import DataIngestion
+    data_ingestion = DataIngestion()
+    return data_ingestion.get_field_types(data_ingestion.get_projection_columns())
+
+
+def export(collection_name, batch_size, decode_mode):
+    from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+    field_types = _field_types()
+    columns = list(field_types)
+    return sum(len(batch_df) for batch_df in Proj1Data().iter_collection_batches(
+        collection_name=collection_name, batch_size=batch_size, columns=columns,
+        field_types=field_types if decode_mode == "raw_bson" else None))
+
+
+def check_parity(collection_name, batch_size):
+    """True when both decoders produce the same values, "na" included, once the dtype plan is applied."""
+    import pandas as pd
+    from vehicle_insurance_prediction.components.data_ingestion import DataIngestion
+    from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+    from vehicle_insurance_prediction.utils.main_utils import apply_dtype_plan
+
+    field_types = _field_types()
+    dtype_plan = DataIngestion().get_dtype_plan()
+    my_data = Proj1Data()
+    frames = {}
+    for decode_mode in ("dict", "raw_bson"):
+        frame = pd.concat(my_data.iter_collection_batches(
+            collection_name=collection_name, batch_size=batch_size, columns=list(field_types),
+            field_types=field_types if decode_mode == "raw_bson" else None), ignore_index=True)
+        frames[decode_mode] = apply_dtype_plan(frame, dtype_plan).sort_values("id").reset_index(drop=True)
+    return frames["dict"].equals(frames["raw_bson"])
+
+
+def main():
+    from vehicle_insurance_prediction.data_access.proj1_data import RAW_BSON_DECODING_AVAILABLE
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--check-parity", action="store_true")
+    args = parser.parse_args()
+
+    if not RAW_BSON_DECODING_AVAILABLE:
+        raise SystemExit("pymongoarrow is not installed; the raw_bson path cannot be benchmarked.")
+
+    rows = []
+    for size in args.sizes:
+        seed_collection(size)
+        for decode_mode in ("dict", "raw_bson"):
+            n_rows, seconds, peak_rss_mb = run_isolated(export, BENCH_COLLECTION_NAME, args.batch_size, decode_mode)
+            rows.append((size, decode_mode, n_rows, f"{n_rows / seconds:,.0f}", f"{peak_rss_mb:,.0f}"))
+        if args.check_parity:
+            parity, _, _ = run_isolated(check_parity, BENCH_COLLECTION_NAME, args.batch_size)
+            print(f"{size} docs: raw_bson decoding matches dict decoding: {parity}")
+    print_table(("docs", "decode", "rows", "rows/s", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark the MongoDB export paths of Proj1Data against a local MongoDB stand-in.
+
+Compares:
+  * legacy       - list(collection.find()) into a DataFrame
+  * streaming    - cursor batches pivoted into columns and concatenated into a DataFrame
+  * stream_file  - DataIngestion.export_data_into_feature_store in streaming mode: cursor batches
+                   deduplicated and appended straight to the feature store file, one batch in memory
+  * parallel     - `_id` range partitions read concurrently (--workers), checked for row parity
+                   against the single-cursor export
+  * async        - overlapped fetch / decode / write stages producing the feature store and the
+                   hash-split train and test files in one pass
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_mongo_export.py --sizes 1000000 10000000 --batch-size 10000 --workers 8
+"""
+import argparse
+import os
+import tempfile
+
+from _common import BENCH_COLLECTION_NAME, print_table, run_isolated, seed_collection
+
+
+def export_legacy(collection_name):
+    from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+    return len(Proj1Data().export_collection_as_dataframe(collection_name=collection_name))
+
+
+def export_streaming(collection_name, batch_size):
+    from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+    return len(Proj1Data().export_collection_as_dataframe(collection_name=collection_name, batch_size=batch_size))
+
+
+def bench_ingestion_config(tmp_dir, collection_name, batch_size):
+    from vehicle_insurance_prediction.entity.config_entity import DataIngestionConfig, TrainingPipelineConfig
+
+    config = DataIngestionConfig(TrainingPipelineConfig())
+    config.collection_name = collection_name
+    config.export_batch_size = batch_size
+    config.snapshot_cache = False
+    config.field_report_sample_size = 0
+    for attribute in ("feature_store_file_path", "training_file_path", "testing_file_path",
+                      "field_report_file_path", "dedup_report_file_path"):
+        setattr(config, attribute, os.path.join(tmp_dir, os.path.basename(getattr(config, attribute))))
+    return config
+
+
+def export_stream_file(collection_name, batch_size):
+    from vehicle_insurance_prediction.components.data_ingestion import DataIngestion
+    from vehicle_insurance_prediction.utils.main_utils import count_dataframe_rows
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = bench_ingestion_config(tmp_dir, collection_name, batch_size)
+        config.streaming_export = True
+        config.export_workers = 1
+        DataIngestion(config).export_data_into_feature_store()
+        return count_dataframe_rows(config.feature_store_file_path)
+
+
+def export_parallel(collection_name, batch_size, n_workers):
+    from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+    return sum(len(batch_df) for batch_df in Proj1Data().iter_collection_partitions(
+        collection_name=collection_name, n_workers=n_workers, batch_size=batch_size))
+
+
+def export_async(collection_name, batch_size):
+    from vehicle_insurance_prediction.components.data_ingestion import DataIngestion
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        return DataIngestion(bench_ingestion_config(tmp_dir, collection_name, batch_size)).run_async_ingestion()
+
+
+def check_parallel_parity(collection_name, batch_size, n_workers):
+    """True when the partitioned export holds exactly the rows of the single-cursor export."""
+    import pandas as pd
+    from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+
+    my_data = Proj1Data()
+    single = my_data.export_collection_as_dataframe(collection_name=collection_name, batch_size=batch_size)
+    parallel = pd.concat(my_data.iter_collection_partitions(
+        collection_name=collection_name, n_workers=n_workers, batch_size=batch_size), ignore_index=True)
+    single = single.sort_values("id").reset_index(drop=True)
+    parallel = parallel[single.columns].sort_values("id").reset_index(drop=True)
+    return single.equals(parallel)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--check-parity", action="store_true")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        seed_collection(size)
+        paths = {
+            "legacy": (export_legacy, (BENCH_COLLECTION_NAME,)),
+            "streaming": (export_streaming, (BENCH_COLLECTION_NAME, args.batch_size)),
+            "stream_file": (export_stream_file, (BENCH_COLLECTION_NAME, args.batch_size)),
+            "parallel": (export_parallel, (BENCH_COLLECTION_NAME, args.batch_size, args.workers)),
+            "async": (export_async, (BENCH_COLLECTION_NAME, args.batch_size)),
+        }
+        for name, (func, func_args) in paths.items():
+            n_rows, seconds, peak_rss_mb = run_isolated(func, *func_args)
+            rows.append((size, name, n_rows, f"{n_rows / seconds:,.0f}", f"{peak_rss_mb:,.0f}"))
+        if args.check_parity:
+            parity, _, _ = run_isolated(check_parallel_parity, BENCH_COLLECTION_NAME, args.batch_size, args.workers)
+            print(f"{size} docs: parallel export matches single-cursor export: {parity}")
+    print_table(("docs", "path", "rows", "rows/s", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark the encoding pushdown against a local MongoDB stand-in.
+
+Compares:
+  * pandas    - stored fields exported, then "na" replacement, gender mapping, dummies and renaming in pandas
+  * pushdown  - the same cleaning and encoding run as an aggregation pipeline, documents arrive numeric
+
+--check-parity verifies that both paths produce identical feature frames.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_mongo_pushdown.py --sizes 1000000 --check-parity
+"""
+import argparse
+
+from _common import BENCH_COLLECTION_NAME, print_table, run_isolated, seed_collection
+
+
+def _data_ingestion(encoding_pushdown):
+    from vehicle_insurance_prediction.components.data_ingestion import DataIngestion
+    data_ingestion = DataIngestion()
+    data_ingestion.data_ingestion_config.encoding_pushdown = encoding_pushdown
+    return data_ingestion
+
+
+def _data_transformation():
+    from vehicle_insurance_prediction.components.data_transformation import DataTransformation
+    from vehicle_insurance_prediction.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
+    from vehicle_insurance_prediction.entity.config_entity import DataTransformationConfig, TrainingPipelineConfig
+    return DataTransformation(DataIngestionArtifact("", "", ""), DataTransformationConfig(TrainingPipelineConfig()),
+                              DataValidationArtifact(True, "", ""))
+
+
+def export_features(collection_name, batch_size, encoding_pushdown):
+    """Feature frame sorted by id, as the preprocessor receives it."""
+    import pandas as pd
+    from vehicle_insurance_prediction.constants.training_pipeline import TARGET_COLUMN
+    from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+    from vehicle_insurance_prediction.utils.main_utils import apply_dtype_plan
+
+    data_ingestion = _data_ingestion(encoding_pushdown)
+    columns = data_ingestion.get_output_columns()
+    frame = pd.concat(Proj1Data().iter_collection_batches(
+        collection_name=collection_name, batch_size=batch_size, columns=columns,
+        stages=data_ingestion.get_encoding_stages(columns)), ignore_index=True)
+    frame = apply_dtype_plan(frame, data_ingestion.get_dtype_plan())
+    frame = frame.sort_values("id").reset_index(drop=True).drop(columns=[TARGET_COLUMN])
+    if encoding_pushdown:
+        return frame.drop(columns=["id"])
+    return _data_transformation().apply_custom_transformations(frame)
+
+
+def run_path(collection_name, batch_size, encoding_pushdown):
+    return len(export_features(collection_name, batch_size, encoding_pushdown))
+
+
+def check_parity(collection_name, batch_size):
+    """True when both paths give the same columns in the same order and the same values, NaN included."""
+    import numpy as np
+
+    pandas_frame = export_features(collection_name, batch_size, encoding_pushdown=False)
+    pushdown_frame = export_features(collection_name, batch_size, encoding_pushdown=True)
+    if list(pandas_frame.columns) != list(pushdown_frame.columns):
+        print(f"column mismatch: {list(pandas_frame.columns)} != {list(pushdown_frame.columns)}")
+        return False
+    return np.array_equal(pandas_frame.to_numpy(dtype="float64"), pushdown_frame.to_numpy(dtype="float64"),
+                          equal_nan=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--check-parity", action="store_true")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        seed_collection(size)
+        for name, encoding_pushdown in (("pandas", False), ("pushdown", True)):
+            n_rows, seconds, peak_rss_mb = run_isolated(run_path, BENCH_COLLECTION_NAME, args.batch_size, encoding_pushdown)
+            rows.append((size, name, n_rows, f"{n_rows / seconds:,.0f}", f"{peak_rss_mb:,.0f}"))
+        if args.check_parity:
+            parity, _, _ = run_isolated(check_parity, BENCH_COLLECTION_NAME, args.batch_size)
+            print(f"{size} docs: pushdown encoding matches pandas encoding: {parity}")
+    print_table(("docs", "path", "rows", "rows/s", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark the resampling step of DataTransformation on synthetic transformed features.
+
+Compares:
+  * smoteenn     - imblearn SMOTEENN(sampling_strategy="minority"), the previous step
+  * scalable     - ScalableResampler with exact, chunked and parallel neighbour search
+  * approximate  - ScalableResampler searching neighbours within random blocks
+
+SMOTEENN is skipped above --smoteenn-max-rows, where it takes hours.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_resampling.py --sizes 100000 1000000 5000000
+"""
+import argparse
+
+import numpy as np
+
+from _common import print_table, run_isolated
+
+N_FEATURES = 10
+MINORITY_SHARE = 0.12
+
+
+def synthetic_features(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n_rows) < MINORITY_SHARE).astype(np.int8)
+    X = rng.standard_normal((n_rows, N_FEATURES)).astype(np.float32)
+    X[y == 1, :3] += 0.75
+    return X, y
+
+
+def resample(n_rows, name, n_jobs):
+    from imblearn.combine import SMOTEENN
+    from vehicle_insurance_prediction.utils.resampling import ScalableResampler
+
+    X, y = synthetic_features(n_rows)
+    if name == "smoteenn":
+        resampler = SMOTEENN(sampling_strategy="minority")
+    else:
+        resampler = ScalableResampler(n_jobs=n_jobs, approximate=name == "approximate")
+    X_res, y_res = resampler.fit_resample(X, y)
+    return len(X_res), float(y_res.mean())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--smoteenn-max-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        for name in ("smoteenn", "scalable", "approximate"):
+            if name == "smoteenn" and size > args.smoteenn_max_rows:
+                continue
+            (n_out, minority_share), seconds, peak_rss_mb = run_isolated(resample, size, name, args.n_jobs)
+            rows.append((size, name, n_out, f"{minority_share:.3f}", f"{seconds:.1f}", f"{peak_rss_mb:,.0f}"))
+
+    print_table(("rows", "resampler", "rows_out", "minority_share", "seconds", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark RandomForestClassifier training and prediction as the worker count grows from 1 to N cores.
+
+Uses the ModelTrainer parameters on synthetic float32 features. N defaults to get_available_cpus(), the
+CPUs the container's quota allows, which is what ModelTrainerConfig.n_jobs resolves to.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_rf_scaling.py --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from _common import print_table, run_isolated
+
+N_FEATURES = 10
+
+
+def synthetic_features(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n_rows) < 0.5).astype(np.int8)
+    X = rng.standard_normal((n_rows, N_FEATURES)).astype(np.float32)
+    X[y == 1, :3] += 0.75
+    return X, y
+
+
+def fit_and_predict(n_rows, n_jobs):
+    from sklearn.ensemble import RandomForestClassifier
+    from vehicle_insurance_prediction.constants.training_pipeline import (
+        MODEL_TRAINER_N_ESTIMATORS, MODEL_TRAINER_MIN_SAMPLES_SPLIT, MODEL_TRAINER_MIN_SAMPLES_LEAF,
+        MIN_SAMPLES_SPLIT_MAX_DEPTH, MIN_SAMPLES_SPLIT_CRITERION, MIN_SAMPLES_SPLIT_RANDOM_STATE
+    )
+
+    X, y = synthetic_features(n_rows)
+    model = RandomForestClassifier(
+        n_estimators=MODEL_TRAINER_N_ESTIMATORS, min_samples_split=MODEL_TRAINER_MIN_SAMPLES_SPLIT,
+        min_samples_leaf=MODEL_TRAINER_MIN_SAMPLES_LEAF, max_depth=MIN_SAMPLES_SPLIT_MAX_DEPTH,
+        criterion=MIN_SAMPLES_SPLIT_CRITERION, random_state=MIN_SAMPLES_SPLIT_RANDOM_STATE, n_jobs=n_jobs
+    )
+    started = time.perf_counter()
+    model.fit(X, y)
+    fit_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    model.predict(X)
+    return fit_seconds, time.perf_counter() - started
+
+
+def worker_counts(max_jobs):
+    counts, n_jobs = [], 1
+    while n_jobs < max_jobs:
+        counts.append(n_jobs)
+        n_jobs *= 2
+    return counts + [max_jobs]
+
+
+def main():
+    from vehicle_insurance_prediction.utils.main_utils import get_available_cpus
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-jobs", type=int, default=get_available_cpus())
+    args = parser.parse_args()
+
+    rows, baseline = [], None
+    for n_jobs in worker_counts(args.max_jobs):
+        (fit_seconds, predict_seconds), _, peak_rss_mb = run_isolated(fit_and_predict, args.rows, n_jobs)
+        baseline = baseline or fit_seconds
+        rows.append((args.rows, n_jobs, f"{fit_seconds:.1f}", f"{baseline / fit_seconds:.2f}x",
+                     f"{predict_seconds:.2f}", f"{peak_rss_mb:,.0f}"))
+
+    print_table(("rows", "n_jobs", "fit_s", "fit_speedup", "predict_s", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark the transformed-array artifact formats handed from DataTransformation to ModelTrainer.
+
+Compares:
+  * legacy - one float64 array with the target glued on as last column, loaded fully with np.load
+  * mmap   - float32 features and an int8 target in separate files, opened with mmap_mode="r"
+
+For each format the benchmark saves the train split, loads it the way ModelTrainer does and converts the
+features to the C-ordered float32 block tree estimators train on, reporting seconds, file size and peak RSS.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_transformed_arrays.py --rows 10000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from _common import print_table, run_isolated
+
+N_FEATURES = 10
+
+
+def synthetic_arrays(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n_rows, N_FEATURES)), (rng.random(n_rows) < 0.5).astype(np.int64)
+
+
+def save_format(tmp_dir, n_rows, layout):
+    from vehicle_insurance_prediction.utils.main_utils import save_numpy_array_data
+
+    features, target = synthetic_arrays(n_rows)
+    features_path = os.path.join(tmp_dir, f"{layout}_train.npy")
+    target_path = os.path.join(tmp_dir, f"{layout}_train_target.npy")
+    if layout == "legacy":
+        save_numpy_array_data(features_path, np.c_[features, target])
+        return features_path, ""
+    save_numpy_array_data(features_path, features, dtype="float32")
+    save_numpy_array_data(target_path, target, dtype="int8")
+    return features_path, target_path
+
+
+def load_for_training(features_path, target_path, mmap_mode):
+    from vehicle_insurance_prediction.utils.main_utils import load_feature_target_arrays
+
+    started = time.perf_counter()
+    x, y = load_feature_target_arrays(features_path, target_path, mmap_mode=mmap_mode)
+    load_seconds = time.perf_counter() - started
+    # what the tree estimators do with their input before fitting
+    x = np.asarray(x, dtype=np.float32, order="C")
+    return load_seconds, float(x[:, 0].sum() + y.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for layout, mmap_mode in (("legacy", None), ("mmap", "r")):
+            features_path, target_path = save_format(tmp_dir, args.rows, layout)
+            size_mb = sum(os.path.getsize(path) for path in (features_path, target_path) if path) / 2 ** 20
+            (load_seconds, _), seconds, peak_rss_mb = run_isolated(load_for_training, features_path, target_path, mmap_mode)
+            rows.append((args.rows, layout, f"{size_mb:,.0f}", f"{load_seconds:.2f}", f"{seconds:.2f}", f"{peak_rss_mb:,.0f}"))
+
+    print_table(("rows", "format", "size_mb", "load_s", "load_and_convert_s", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
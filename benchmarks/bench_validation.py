@@ -0,0 +1,60 @@
+"""
+Benchmark the data validation modes on synthetic train/test files.
+
+Compares:
+  * fast - columns from the header / file metadata, profile of a `sample_size` row sample
+  * full - every row streamed through the profiler
+
+Fast validation time should stay flat as the files grow.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_validation.py --sizes 100000 1000000 10000000 --format parquet
+"""
+import argparse
+import os
+import tempfile
+
+from _common import print_table, run_isolated, synthetic_frame
+
+
+def validate(train_file_path, test_file_path, validation_mode, report_dir):
+    from vehicle_insurance_prediction.components.data_validation import DataValidation
+    from vehicle_insurance_prediction.entity.artifact_entity import DataIngestionArtifact
+    from vehicle_insurance_prediction.entity.config_entity import DataValidationConfig, TrainingPipelineConfig
+
+    config = DataValidationConfig(TrainingPipelineConfig())
+    config.validation_mode = validation_mode
+    config.validation_report_file_path = os.path.join(report_dir, f"report_{validation_mode}.json")
+    artifact = DataValidation(DataIngestionArtifact("", train_file_path, test_file_path), config).initiate_data_validation()
+    return artifact.validation_status
+
+
+def main():
+    from vehicle_insurance_prediction.constants.training_pipeline import ARTIFACT_FILE_EXTENSIONS
+    from vehicle_insurance_prediction.utils.main_utils import write_dataframe
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--format", choices=list(ARTIFACT_FILE_EXTENSIONS), default="parquet")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        dataframe = synthetic_frame(size)
+        split = int(size * 0.8)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            train_file_path = os.path.join(tmp_dir, "train" + ARTIFACT_FILE_EXTENSIONS[args.format])
+            test_file_path = os.path.join(tmp_dir, "test" + ARTIFACT_FILE_EXTENSIONS[args.format])
+            write_dataframe(train_file_path, dataframe.iloc[:split])
+            write_dataframe(test_file_path, dataframe.iloc[split:])
+            del dataframe
+            for validation_mode in ("fast", "full"):
+                status, seconds, peak_rss_mb = run_isolated(validate, train_file_path, test_file_path,
+                                                            validation_mode, tmp_dir)
+                rows.append((size, validation_mode, status, f"{seconds:.2f}", f"{peak_rss_mb:,.0f}"))
+
+    print_table(("rows", "mode", "status", "seconds", "peak_rss_mb"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,20 @@ def model_fn(model_dir):
     return model
 
 
+def _order_columns(df):
+    """
+    Puts the columns the schema knows in schema order (raw or pre-encoded layout), so requests with
+    keys in any order reach the model in the column order it was trained on.
+    """
+    from vehicle_insurance_prediction.entity.schema_entity import load_schema
+
+    schema = load_schema()
+    column_index = max((schema.column_index, schema.encoded_column_index),
+                       key=lambda index: len(set(index).intersection(df.columns)))
+    # unknown columns keep their relative order after the schema columns
+    return df[sorted(df.columns, key=lambda column: column_index.get(column, len(column_index)))]
+
+
 def input_fn(request_body, request_content_type):
     """
     Deserializes the input request body into a pandas DataFrame.
@@ -40,7 +54,7 @@ def input_fn(request_body, request_content_type):
         # The input is expected to be a dictionary or a list of dictionaries
         # that can be converted to a DataFrame.
         df = pd.DataFrame(input_data)
-        return df
+        return _order_columns(df)
     else:
         raise ValueError(f"Unsupported content type: {request_content_type}")
 
@@ -8,6 +8,7 @@ setup(
     author_email="ravipanavir@gmail.com",
     packages=find_packages(),
     include_package_data=True,
+    package_data={"vehicle_insurance_prediction": ["constants/*.yaml"]},
     zip_safe=False,
     # IMPORTANT: do NOT require numpy/pandas/scikit-learn here.
     install_requires=[
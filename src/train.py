@@ -72,6 +72,12 @@ def start_training(output_path: str, model_dir: str):
         shutil.copy(trained_model_path, destination_path)
         logging.info("Saved trained model to %s", destination_path)
 
+        # the drift sketch of the training data travels with the model as the reference of later runs
+        drift_sketch_path = getattr(data_validation_artifact, "drift_sketch_file_path", "")
+        if drift_sketch_path and os.path.exists(drift_sketch_path):
+            shutil.copy(drift_sketch_path, os.path.join(model_dir, os.path.basename(drift_sketch_path)))
+            logging.info("Saved drift sketch next to the model in %s", model_dir)
+
         try:
             schema_dest = os.path.join(output_path, "schema_path.txt")
             with open(schema_dest, "w") as fh:
@@ -91,7 +97,11 @@ if __name__ == "__main__":
     parser.add_argument("--output-data-dir", type=str, default=os.environ.get("SM_OUTPUT_DATA_DIR"))
     parser.add_argument("--model-dir", type=str, default=os.environ.get("SM_MODEL_DIR"))
     parser.add_argument("--train", type=str, default=os.environ.get("SM_CHANNEL_TRAIN"))
+    parser.add_argument("--drift-reference", type=str, default=os.environ.get("SM_CHANNEL_DRIFT_REFERENCE"))
     args = parser.parse_args()
+    if args.drift_reference:
+        # channel holding the drift sketch stored with the production model
+        os.environ["DRIFT_REFERENCE_PATH"] = os.path.join(args.drift_reference, "drift_sketch.json")
     logging.info("SageMaker training job started.")
     start_training(output_path=args.output_data_dir, model_dir=args.model_dir)
     logging.info("SageMaker training job completed (script exit).")
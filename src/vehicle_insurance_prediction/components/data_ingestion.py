@@ -1,14 +1,34 @@
+import asyncio
+import hashlib
+import json
 import os
 import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
+import numpy as np
+import pandas as pd
+from bson import ObjectId
 from pandas import DataFrame
 from sklearn.model_selection import train_test_split
 
+from vehicle_insurance_prediction.constants.training_pipeline import (
+    TARGET_COLUMN, DATA_INGESTION_SPLIT_HASH_KEY
+)
 from vehicle_insurance_prediction.entity.config_entity import DataIngestionConfig, TrainingPipelineConfig
 from vehicle_insurance_prediction.entity.artifact_entity import DataIngestionArtifact
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
 from vehicle_insurance_prediction.exception import MyException
 from vehicle_insurance_prediction.logger import logging
-from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data, RAW_BSON_DECODING_AVAILABLE
+from vehicle_insurance_prediction.utils.artifact_cache import ArtifactCache
+from vehicle_insurance_prediction.utils.stream_dedup import StreamDeduplicator
+from vehicle_insurance_prediction.utils.main_utils import (
+    read_yaml_file, write_yaml_file, read_dataframe, write_dataframe, iter_dataframe_chunks, DataFrameWriter,
+    apply_dtype_plan, dataframe_memory_mb, log_memory_usage
+)
 
 class DataIngestion:
     def __init__(self, data_ingestion_config: DataIngestionConfig = None):
@@ -22,49 +42,643 @@ class DataIngestion:
         """
         try:
             self.data_ingestion_config = data_ingestion_config
+            self._deduplicator: Optional[StreamDeduplicator] = None
         except Exception as e:
             raise MyException(e, sys)
 
-    def export_data_into_feature_store(self) -> DataFrame:
+    def get_schema_columns(self) -> List[str]:
+        """
+        Method Name :   get_schema_columns
+        Description :   This method lists the schema's numerical, categorical and target columns
+
+        Output      :   list of column names
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            schema = load_schema()
+            wanted = schema.numerical_set | schema.categorical_set | {schema.target_column}
+            # keep the document field order of the schema so the feature store layout stays the same
+            columns = [column for column in schema.columns if column in wanted]
+            columns += sorted(wanted.difference(columns))
+            return columns
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def get_dtype_plan(self) -> dict:
+        """
+        Method Name :   get_dtype_plan
+        Description :   This method derives the compact dtype of every schema column applied to the
+                        exported batches and to every later read of the ingested files
+
+        Output      :   dict of column -> dtype, empty when the plan is disabled
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not self.data_ingestion_config.apply_dtype_plan:
+                return {}
+            return load_schema().get_dtype_plan(self.data_ingestion_config.encoding_pushdown)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def get_projection_columns(self) -> Optional[List[str]]:
+        """
+        Method Name :   get_projection_columns
+        Description :   This method builds the list of fields requested from mongodb: the schema
+                        columns plus the split key when the hash split needs it
+
+        Output      :   list of column names, or None when projection pushdown is disabled
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not self.data_ingestion_config.projection_pushdown:
+                return None
+            columns = self.get_schema_columns()
+            split_key = self.data_ingestion_config.split_key_column
+            if self.data_ingestion_config.split_mode == "hash" and split_key not in columns:
+                columns = [split_key, *columns]
+            logging.info(f"Projection pushdown on columns: {columns}")
+            return columns
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def get_output_columns(self) -> Optional[List[str]]:
+        """
+        Method Name :   get_output_columns
+        Description :   This method lists the columns of the exported frames: the projected fields, or with
+                        encoding pushdown the encoded columns plus the split key when the hash split needs it
+
+        Output      :   list of column names, or None when the layout is taken from the documents
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not self.data_ingestion_config.encoding_pushdown:
+                return self.get_projection_columns()
+            columns = list(load_schema().encoded_columns)
+            split_key = self.data_ingestion_config.split_key_column
+            if self.data_ingestion_config.split_mode == "hash" and split_key not in columns:
+                columns = [split_key, *columns]
+            return columns
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def get_encoding_stages(self, columns: Optional[List[str]]) -> Optional[List[dict]]:
+        """
+        Method Name :   get_encoding_stages
+        Description :   This method builds the aggregation stages that clean and encode the documents
+                        inside mongodb when encoding pushdown is enabled
+
+        Output      :   list of aggregation stages, or None when documents are exported as stored
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not self.data_ingestion_config.encoding_pushdown:
+                return None
+            schema = load_schema()
+            numeric_columns = [column for column in schema.columns if schema.dtypes[column] != "object"]
+            return Proj1Data.build_encoding_stages(columns, numeric_columns)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def get_field_types(self, columns: Optional[List[str]]) -> Optional[dict]:
+        """
+        Method Name :   get_field_types
+        Description :   This method maps every projected field to its schema dtype for the raw BSON
+                        decoding path
+
+        Output      :   dict of column -> schema dtype, or None when documents are decoded into dicts
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if self.data_ingestion_config.decode_mode != "raw_bson" or self.data_ingestion_config.encoding_pushdown \
+                    or not columns:
+                return None
+            if not RAW_BSON_DECODING_AVAILABLE:
+                logging.warning("pymongoarrow is not installed, falling back to decoding documents into dicts.")
+                return None
+            dtypes = dict(load_schema().dtypes)
+            dtypes.setdefault(self.data_ingestion_config.split_key_column, self.data_ingestion_config.split_key_dtype)
+            return {column: dtypes[column] for column in columns}
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def write_field_report(self, my_data: Proj1Data, columns: Optional[List[str]]) -> None:
+        """
+        Method Name :   write_field_report
+        Description :   This method writes the per-field byte and BSON decoding cost report of the
+                        collection next to the feature store
+
+        On Failure  :   Write a warning log and continue, the report is diagnostic only
+        """
+        sample_size = self.data_ingestion_config.field_report_sample_size
+        if sample_size <= 0:
+            return
+        try:
+            report = my_data.profile_field_costs(
+                collection_name=self.data_ingestion_config.collection_name,
+                columns=columns,
+                sample_size=sample_size
+            )
+            write_yaml_file(self.data_ingestion_config.field_report_file_path, report, replace=True)
+            logging.info(f"Field cost report saved to {self.data_ingestion_config.field_report_file_path}")
+        except Exception as e:
+            logging.warning(f"Could not write field cost report: {e}")
+
+    def get_snapshot_key(self, my_data: Proj1Data, columns: Optional[List[str]]) -> Optional[str]:
+        """
+        Method Name :   get_snapshot_key
+        Description :   This method combines the collection fingerprint with every setting that shapes
+                        the feature store file into the key of its cached snapshot
+
+        Output      :   snapshot cache key, or None when the snapshot cache is disabled
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not self.data_ingestion_config.snapshot_cache:
+                return None
+            fingerprint = my_data.collection_fingerprint(
+                collection_name=self.data_ingestion_config.collection_name,
+                sample_size=self.data_ingestion_config.fingerprint_sample_size
+            )
+            settings = {
+                "fingerprint": fingerprint,
+                "collection_name": self.data_ingestion_config.collection_name,
+                "columns": columns,
+                "artifact_format": self.data_ingestion_config.artifact_format,
+                "dtype_plan": {column: str(dtype) for column, dtype in self.get_dtype_plan().items()},
+                "dedup_key_columns": (self.data_ingestion_config.dedup_key_columns or "features")
+                if self.data_ingestion_config.dedup else None,
+            }
+            return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:32]
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def _get_snapshot_cache(self) -> ArtifactCache:
+        return ArtifactCache(self.data_ingestion_config.snapshot_cache_dir,
+                             self.data_ingestion_config.snapshot_cache_max_bytes, name="snapshot_cache")
+
+    def link_snapshot(self, snapshot_key: str) -> bool:
+        """
+        Method Name :   link_snapshot
+        Description :   This method places the cached snapshot files of an unchanged collection at the
+                        feature store file path and report paths of this run
+
+        Output      :   True when a snapshot matched the key
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            entry_dir = self._get_snapshot_cache().get(snapshot_key)
+            if entry_dir is None:
+                return False
+            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
+            ArtifactCache.link_or_copy(os.path.join(entry_dir, os.path.basename(feature_store_file_path)),
+                                       feature_store_file_path)
+            for report_file_path in (self.data_ingestion_config.field_report_file_path,
+                                     self.data_ingestion_config.dedup_report_file_path):
+                cached_report = os.path.join(entry_dir, os.path.basename(report_file_path))
+                if os.path.exists(cached_report):
+                    ArtifactCache.link_or_copy(cached_report, report_file_path)
+            return True
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def restore_snapshot(self, snapshot_key: str) -> Optional[DataFrame]:
+        """
+        Method Name :   restore_snapshot
+        Description :   This method places the cached snapshot of an unchanged collection at the feature
+                        store file path, together with its field report
+
+        Output      :   feature store dataframe, or None when no snapshot matches the key
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not self.link_snapshot(snapshot_key):
+                return None
+            dataframe = read_dataframe(self.data_ingestion_config.feature_store_file_path, dtype_plan=self.get_dtype_plan())
+            logging.info(f"Reused snapshot {snapshot_key} of an unchanged collection, shape: {dataframe.shape}")
+            return dataframe
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def store_snapshot(self, snapshot_key: str) -> None:
+        """
+        Method Name :   store_snapshot
+        Description :   This method adds the freshly exported feature store file and reports to the
+                        snapshot cache, evicting the least recently used snapshots above the size bound
+
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            files = {}
+            for file_path in (self.data_ingestion_config.feature_store_file_path,
+                              self.data_ingestion_config.field_report_file_path,
+                              self.data_ingestion_config.dedup_report_file_path):
+                if os.path.exists(file_path):
+                    files[os.path.basename(file_path)] = file_path
+            self._get_snapshot_cache().put(snapshot_key, files)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def get_deduplicator(self, columns: List[str], load_state: bool = False) -> StreamDeduplicator:
+        """
+        Method Name :   get_deduplicator
+        Description :   This method creates the streaming deduplicator keyed on the configured key columns,
+                        or on every feature and target column of the exported layout
+
+        Output      :   deduplicator, restored from the persisted state when `load_state` is set
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            key_columns = self.data_ingestion_config.dedup_key_columns or self._get_split_output_columns(columns)
+            if load_state:
+                return StreamDeduplicator.load(self.data_ingestion_config.dedup_state_file_path, key_columns,
+                                               self.data_ingestion_config.dedup_expected_rows,
+                                               self.data_ingestion_config.dedup_false_positive_rate)
+            return StreamDeduplicator(key_columns, self.data_ingestion_config.dedup_expected_rows,
+                                      self.data_ingestion_config.dedup_false_positive_rate)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def deduplicate(self, dataframe: DataFrame) -> DataFrame:
+        """
+        Method Name :   deduplicate
+        Description :   This method drops the rows of a batch already seen earlier in the export (or, for
+                        incremental runs, in any earlier delta)
+
+        Output      :   batch without duplicate rows
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not self.data_ingestion_config.dedup:
+                return dataframe
+            if self._deduplicator is None:
+                self._deduplicator = self.get_deduplicator(list(dataframe.columns),
+                                                           load_state=self.data_ingestion_config.incremental)
+            return self._deduplicator.filter(dataframe)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def write_dedup_report(self) -> None:
+        """
+        Method Name :   write_dedup_report
+        Description :   This method saves how many duplicate rows the export dropped
+
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if self._deduplicator is None:
+                return
+            report = self._deduplicator.report()
+            write_yaml_file(self.data_ingestion_config.dedup_report_file_path, report, replace=True)
+            logging.info(f"Dropped {report['duplicates_dropped']} duplicate rows of {report['rows_seen']} "
+                         f"({report['dedup_ratio']:.2%}) keyed on {report['key_columns']}")
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def read_dedup_report(self) -> dict:
+        """
+        Method Name :   read_dedup_report
+        Description :   This method reads the dedup statistics of this run, also when they come from a snapshot
+
+        Output      :   dedup report, empty when deduplication did not run
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not os.path.exists(self.data_ingestion_config.dedup_report_file_path):
+                return {}
+            return read_yaml_file(file_path=self.data_ingestion_config.dedup_report_file_path)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def export_data_into_feature_store(self) -> Optional[DataFrame]:
         """
         Method Name :   export_data_into_feature_store
-        Description :   This method exports data from mongodb to csv file
+        Description :   This method exports data from mongodb to the feature store file
         
-        Output      :   data is returned as artifact of data ingestion components
+        Output      :   data is returned as artifact of data ingestion components; None for streamed
+                        exports, whose data is only in the feature store file
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
             logging.info("Exporting data from mongodb")
             my_data = Proj1Data()
-            dataframe = my_data.export_collection_as_dataframe(
-                collection_name=self.data_ingestion_config.collection_name
-            )
-            
-            logging.info(f"Shape of dataframe: {dataframe.shape}")
-            
-            # Validate dataframe is not empty
-            if dataframe.empty or len(dataframe) == 0:
-                raise ValueError("No data fetched from MongoDB! Collection may be empty.")
-            
             feature_store_file_path = self.data_ingestion_config.feature_store_file_path
-            dir_path = os.path.dirname(feature_store_file_path)
-            os.makedirs(dir_path, exist_ok=True)
-            
-            logging.info(f"Saving exported data into feature store file path: {feature_store_file_path}")
-            dataframe.to_csv(feature_store_file_path, index=False, header=True)
-            logging.info(f"Data successfully saved to {feature_store_file_path}")
-            
+            columns = self.get_output_columns()
+
+            # the aggregation pipeline of the encoding pushdown is only read batch by batch
+            streaming = self.data_ingestion_config.streaming_export or self.data_ingestion_config.encoding_pushdown
+
+            snapshot_key = self.get_snapshot_key(my_data, columns)
+            if snapshot_key is not None:
+                if streaming:
+                    if self.link_snapshot(snapshot_key):
+                        return None
+                else:
+                    dataframe = self.restore_snapshot(snapshot_key)
+                    if dataframe is not None:
+                        return dataframe
+
+            self.write_field_report(my_data, self.get_projection_columns())
+
+            if streaming:
+                if self._stream_into_feature_store(my_data, feature_store_file_path, columns) == 0:
+                    raise ValueError("No data fetched from MongoDB! Collection may be empty.")
+                dataframe = None
+            else:
+                # holds the whole collection in memory, the streaming export is the one for larger collections
+                dataframe = my_data.export_collection_as_dataframe(
+                    collection_name=self.data_ingestion_config.collection_name,
+                    columns=columns
+                )
+
+                logging.info(f"Shape of dataframe: {dataframe.shape}")
+
+                # Validate dataframe is not empty
+                if dataframe.empty or len(dataframe) == 0:
+                    raise ValueError("No data fetched from MongoDB! Collection may be empty.")
+
+                before_mb = dataframe_memory_mb(dataframe)
+                dataframe = self.deduplicate(apply_dtype_plan(dataframe, self.get_dtype_plan()))
+                log_memory_usage("data_ingestion", dataframe, before_mb)
+
+                dir_path = os.path.dirname(feature_store_file_path)
+                os.makedirs(dir_path, exist_ok=True)
+
+                logging.info(f"Saving exported data into feature store file path: {feature_store_file_path}")
+                write_dataframe(feature_store_file_path, dataframe)
+                logging.info(f"Data successfully saved to {feature_store_file_path}")
+
+            self.write_dedup_report()
+            if snapshot_key is not None:
+                self.store_snapshot(snapshot_key)
+            return dataframe
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def _stream_into_feature_store(self, my_data: Proj1Data, feature_store_file_path: str,
+                                   columns: Optional[List[str]] = None, query: Optional[dict] = None) -> int:
+        """
+        Method Name :   _stream_into_feature_store
+        Description :   This method pulls the collection in cursor batches, or in key-range partitions
+                        read in parallel, and appends every batch to the feature store file as soon
+                        as it is decoded. Only one batch is held in memory at a time.
+
+        Output      :   number of rows written to the feature store file
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            batch_size = self.data_ingestion_config.export_batch_size
+            logging.info(f"Streaming data into feature store file path: {feature_store_file_path} (batch size: {batch_size})")
+
+            field_types = self.get_field_types(columns)
+            stages = self.get_encoding_stages(columns)
+            if self.data_ingestion_config.export_workers > 1:
+                batches = my_data.iter_collection_partitions(
+                    collection_name=self.data_ingestion_config.collection_name,
+                    n_workers=self.data_ingestion_config.export_workers,
+                    batch_size=batch_size,
+                    columns=columns,
+                    split_key=self.data_ingestion_config.export_split_key,
+                    query=query,
+                    field_types=field_types,
+                    stages=stages
+                )
+            else:
+                batches = my_data.iter_collection_batches(
+                    collection_name=self.data_ingestion_config.collection_name,
+                    batch_size=batch_size,
+                    columns=columns,
+                    query=query,
+                    field_types=field_types,
+                    stages=stages
+                )
+
+            dtype_plan = self.get_dtype_plan()
+            n_batches, peak_batch_mb = 0, 0.0
+            with DataFrameWriter(feature_store_file_path, file_format=self.data_ingestion_config.artifact_format) as writer:
+                for batch_df in batches:
+                    batch_df = self.deduplicate(apply_dtype_plan(batch_df, dtype_plan))
+                    peak_batch_mb = max(peak_batch_mb, dataframe_memory_mb(batch_df))
+                    writer.write(batch_df)
+                    n_batches += 1
+
+            logging.info(f"Streamed {writer.n_rows} rows in {n_batches} batches to {feature_store_file_path} "
+                         f"(largest batch in memory: {peak_batch_mb:.1f} MB)")
+            return writer.n_rows
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def read_watermark(self):
+        """
+        Method Name :   read_watermark
+        Description :   This method reads the high-water mark persisted by the previous incremental run
+
+        Output      :   last exported value of the watermark key, or None on the first run
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            watermark_file_path = self.data_ingestion_config.watermark_file_path
+            if not os.path.exists(watermark_file_path):
+                return None
+            watermark = read_yaml_file(file_path=watermark_file_path)
+            if watermark.get("key") != self.data_ingestion_config.watermark_key:
+                raise ValueError(f"Watermark in {watermark_file_path} tracks '{watermark.get('key')}', "
+                                 f"expected '{self.data_ingestion_config.watermark_key}'.")
+            if watermark.get("pre_encoded", False) != self.data_ingestion_config.encoding_pushdown:
+                raise ValueError(f"Feature store next to {watermark_file_path} was written with encoding pushdown "
+                                 f"{'on' if watermark.get('pre_encoded') else 'off'}; partitions cannot mix layouts.")
+            return ObjectId(watermark["value"]) if watermark.get("type") == "objectid" else watermark["value"]
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def write_watermark(self, value) -> None:
+        """
+        Method Name :   write_watermark
+        Description :   This method persists the high-water mark of the documents exported so far
+
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            watermark = {
+                "key": self.data_ingestion_config.watermark_key,
+                "type": "objectid" if isinstance(value, ObjectId) else type(value).__name__,
+                "value": str(value) if isinstance(value, ObjectId) else value,
+                "pre_encoded": self.data_ingestion_config.encoding_pushdown,
+            }
+            write_yaml_file(self.data_ingestion_config.watermark_file_path, watermark, replace=True)
+            logging.info(f"Watermark advanced to {watermark}")
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def export_delta_into_feature_store(self) -> Optional[int]:
+        """
+        Method Name :   export_delta_into_feature_store
+        Description :   This method exports only the documents above the persisted watermark and appends
+                        them as a new partition of the persistent feature store. The watermark is advanced
+                        only once the partition file is completely written.
+
+        Output      :   number of newly exported rows, or None when the collection has no new documents
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            # a lagging secondary could miss documents below the new watermark, so deltas read the primary
+            my_data = Proj1Data(read_preference="primary")
+            collection_name = self.data_ingestion_config.collection_name
+            watermark_key = self.data_ingestion_config.watermark_key
+
+            previous_watermark = self.read_watermark()
+            new_watermark = my_data.get_max_key(collection_name, split_key=watermark_key)
+            if new_watermark is None:
+                raise ValueError(f"Collection '{collection_name}' has no documents with key '{watermark_key}'.")
+            if previous_watermark is not None and new_watermark <= previous_watermark:
+                logging.info(f"No documents above watermark {previous_watermark}; feature store is up to date.")
+                return None
+
+            # the upper bound pins the delta, documents inserted while exporting are left for the next run
+            condition = {"$lte": new_watermark}
+            if previous_watermark is not None:
+                condition["$gt"] = previous_watermark
+            logging.info(f"Exporting delta of '{collection_name}' with {watermark_key} in ({previous_watermark}, {new_watermark}]")
+
+            columns = self.get_output_columns()
+            self.write_field_report(my_data, self.get_projection_columns())
+            partition_file_path = self.data_ingestion_config.incremental_partition_file_path
+            tmp_file_path = os.path.join(os.path.dirname(partition_file_path), "." + os.path.basename(partition_file_path))
+            n_rows = self._stream_into_feature_store(my_data, tmp_file_path, columns, query={watermark_key: condition})
+            if n_rows == 0:
+                # every document of the delta was a duplicate, so no partition is written; the watermark still moves
+                if os.path.exists(tmp_file_path):
+                    os.remove(tmp_file_path)
+                logging.info(f"Delta up to watermark {new_watermark} held only duplicates; no partition written")
+            else:
+                os.replace(tmp_file_path, partition_file_path)
+                logging.info(f"Appended {n_rows} rows to the feature store as {partition_file_path}")
+
+            self.write_watermark(new_watermark)
+            if self._deduplicator is not None:
+                # saved after the watermark: a crash in between can only let duplicates through, never drop rows
+                self._deduplicator.save(self.data_ingestion_config.dedup_state_file_path)
+                self.write_dedup_report()
+            return n_rows
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def list_incremental_partitions(self) -> List[str]:
+        """
+        Method Name :   list_incremental_partitions
+        Description :   This method lists the completed partition files of the persistent feature store
+
+        Output      :   sorted list of partition file paths
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            partitions_dir = self.data_ingestion_config.incremental_partitions_dir
+            partition_files = sorted(
+                os.path.join(partitions_dir, file_name) for file_name in os.listdir(partitions_dir)
+                if not file_name.startswith(".")
+            )
+            if not partition_files:
+                raise ValueError(f"Feature store at {partitions_dir} has no partitions.")
+            return partition_files
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def load_incremental_feature_store(self) -> DataFrame:
+        """
+        Method Name :   load_incremental_feature_store
+        Description :   This method combines every partition of the persistent feature store
+
+        Output      :   combined dataframe of all ingested documents
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            partition_files = self.list_incremental_partitions()
+            logging.info(f"Loading {len(partition_files)} feature store partitions")
+            dtype_plan = self.get_dtype_plan()
+            dataframe = pd.concat([read_dataframe(file_path, dtype_plan=dtype_plan) for file_path in partition_files],
+                                  ignore_index=True)
+            dataframe = apply_dtype_plan(dataframe, dtype_plan)
+            log_memory_usage("data_ingestion", dataframe)
             return dataframe
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def _hash_split_positions(self, keys: pd.Series) -> np.ndarray:
+        """
+        Maps every split key to a stable position in [0, 1). The position only depends on the key
+        value, so a row lands in the same split on every run and in every chunk.
+        """
+        if pd.api.types.is_numeric_dtype(keys):
+            # ints and floats of the same value must hash alike, e.g. after a NaN forced a float column
+            keys = pd.Series(keys.to_numpy(dtype="float64", na_value=np.nan))
+        hashes = pd.util.hash_pandas_object(keys, index=False, hash_key=DATA_INGESTION_SPLIT_HASH_KEY).to_numpy()
+        return hashes / np.float64(2 ** 64)
+
+    def get_test_mask(self, dataframe: DataFrame) -> np.ndarray:
+        """
+        Method Name :   get_test_mask
+        Description :   This method assigns the rows of one chunk to the test set by hashing the split key.
+                        A row goes to test when its hash position is below the split ratio. Positions do not
+                        depend on the target, so every class is split at the ratio in expectation (the hash
+                        split is stratified in expectation, never exactly) and an existing row keeps its
+                        side on every incremental ingest
 
+        Output      :   boolean mask, True for test rows
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            positions = self._hash_split_positions(dataframe[self.data_ingestion_config.split_key_column])
+            return positions < self.data_ingestion_config.train_test_split_ratio
         except Exception as e:
             raise MyException(e, sys)
 
+    def _get_split_output_columns(self, columns: List[str]) -> List[str]:
+        """
+        Drops the split key from train/test when it was only fetched for hashing, so the ingested
+        files keep exactly the schema columns.
+        """
+        if not (self.data_ingestion_config.projection_pushdown or self.data_ingestion_config.encoding_pushdown):
+            return list(columns)
+        schema_columns = self.get_schema_columns()
+        split_key = self.data_ingestion_config.split_key_column
+        return [column for column in columns if column != split_key or split_key in schema_columns]
+
+    def split_files_as_train_test(self, file_paths: List[str]) -> None:
+        """
+        Method Name :   split_files_as_train_test
+        Description :   This method hash-splits feature store files into train and test files in a single
+                        streaming pass over chunks, without loading the combined data.
+
+        Output      :   Train and test files are created
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        logging.info("Entered split_files_as_train_test method of Data_Ingestion class")
+        try:
+            chunk_size = self.data_ingestion_config.split_chunk_size
+            dtype_plan = self.get_dtype_plan()
+            with DataFrameWriter(self.data_ingestion_config.training_file_path) as train_writer, \
+                    DataFrameWriter(self.data_ingestion_config.testing_file_path) as test_writer:
+                for file_path in file_paths:
+                    for chunk_df in iter_dataframe_chunks(file_path, chunk_size=chunk_size, dtype_plan=dtype_plan):
+                        test_mask = self.get_test_mask(chunk_df)
+                        chunk_df = chunk_df[self._get_split_output_columns(chunk_df.columns)]
+                        train_writer.write(chunk_df[~test_mask])
+                        test_writer.write(chunk_df[test_mask])
+
+            if train_writer.n_rows == 0 or test_writer.n_rows == 0:
+                raise ValueError(f"Hash split produced an empty set (train: {train_writer.n_rows}, test: {test_writer.n_rows} rows)")
+            logging.info(f"Hash split {len(file_paths)} file(s) into {train_writer.n_rows} train and {test_writer.n_rows} test rows")
+            logging.info("Exited split_files_as_train_test method of Data_Ingestion class")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     def split_data_as_train_test(self, dataframe: DataFrame) -> None:
         """
         Method Name :   split_data_as_train_test
         Description :   This method splits the dataframe into train set and test set based on split ratio 
         
-        Output      :   Train and test CSV files are created
+        Output      :   Train and test files are created
         On Failure  :   Write an exception log and then raise an exception
         """
         logging.info("Entered split_data_as_train_test method of Data_Ingestion class")
@@ -74,20 +688,27 @@ class DataIngestion:
             if dataframe.empty or len(dataframe) == 0:
                 raise ValueError("Cannot split empty dataframe")
             
-            train_set, test_set = train_test_split(
-                dataframe, 
-                test_size=self.data_ingestion_config.train_test_split_ratio,
-                random_state=42
-            )
-            
-            logging.info("Performed train test split on the dataframe")
+            if self.data_ingestion_config.split_mode == "hash":
+                test_mask = self.get_test_mask(dataframe)
+                dataframe = dataframe[self._get_split_output_columns(dataframe.columns)]
+                train_set, test_set = dataframe[~test_mask], dataframe[test_mask]
+            else:
+                stratify = dataframe[TARGET_COLUMN] if self.data_ingestion_config.split_stratify else None
+                train_set, test_set = train_test_split(
+                    dataframe,
+                    test_size=self.data_ingestion_config.train_test_split_ratio,
+                    random_state=42,
+                    stratify=stratify
+                )
+
+            logging.info(f"Performed {self.data_ingestion_config.split_mode} train test split on the dataframe")
             
             dir_path = os.path.dirname(self.data_ingestion_config.training_file_path)
             os.makedirs(dir_path, exist_ok=True)
             
             logging.info("Exporting train and test file path.")
-            train_set.to_csv(self.data_ingestion_config.training_file_path, index=False, header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path, index=False, header=True)
+            write_dataframe(self.data_ingestion_config.training_file_path, train_set)
+            write_dataframe(self.data_ingestion_config.testing_file_path, test_set)
 
             logging.info(f"Train set saved to: {self.data_ingestion_config.training_file_path}")
             logging.info(f"Test set saved to: {self.data_ingestion_config.testing_file_path}")
@@ -96,6 +717,138 @@ class DataIngestion:
         except Exception as e:
             raise MyException(e, sys) from e
 
+    def _decode_pipeline_batch(self, raw_batch: bytes, columns: Optional[List[str]], dtype_plan: dict,
+                               field_types: Optional[dict] = None) -> DataFrame:
+        # encoded documents have their "na" values nulled by the aggregation already
+        replace_na = not self.data_ingestion_config.encoding_pushdown
+        batch_df = Proj1Data.decode_raw_batch(raw_batch, columns, replace_na, field_types=field_types)
+        return self.deduplicate(apply_dtype_plan(batch_df, dtype_plan))
+
+    def _write_pipeline_batch(self, batch_df: DataFrame, feature_store_writer: DataFrameWriter,
+                              train_writer: DataFrameWriter, test_writer: DataFrameWriter) -> None:
+        feature_store_writer.write(batch_df)
+        test_mask = self.get_test_mask(batch_df)
+        batch_df = batch_df[self._get_split_output_columns(batch_df.columns)]
+        train_writer.write(batch_df[~test_mask])
+        test_writer.write(batch_df[test_mask])
+
+    async def _run_async_pipeline(self, cursor, columns: Optional[List[str]]):
+        """
+        Runs the fetch, decode and write stages concurrently. Every stage hands its output to the next
+        through a bounded queue, so a slow stage blocks the ones before it instead of letting batches
+        pile up in memory. The blocking work of each stage runs on its own thread.
+        """
+        loop = asyncio.get_running_loop()
+        queue_size = self.data_ingestion_config.pipeline_queue_size
+        raw_queue, frame_queue = asyncio.Queue(maxsize=queue_size), asyncio.Queue(maxsize=queue_size)
+        busy_seconds = defaultdict(float)
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="ingestion")
+
+        async def run_in_thread(stage, func, *args):
+            started = time.perf_counter()
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            finally:
+                busy_seconds[stage] += time.perf_counter() - started
+
+        async def fetch():
+            while True:
+                raw_batch = await run_in_thread("fetch", next, cursor, None)
+                if raw_batch is None:
+                    break
+                if raw_batch:
+                    await raw_queue.put(raw_batch)
+            await raw_queue.put(None)
+
+        async def decode():
+            layout, dtype_plan = columns, self.get_dtype_plan()
+            # the same typed column decoding as the sequential export, when the projection is known
+            field_types = self.get_field_types(columns)
+            while True:
+                raw_batch = await raw_queue.get()
+                if raw_batch is None:
+                    break
+                batch_df = await run_in_thread("decode", self._decode_pipeline_batch, raw_batch, layout, dtype_plan,
+                                               field_types)
+                # without a projection the first batch fixes the layout of the files
+                layout = layout or list(batch_df.columns)
+                await frame_queue.put(batch_df)
+            await frame_queue.put(None)
+
+        async def write():
+            with DataFrameWriter(self.data_ingestion_config.feature_store_file_path,
+                                 file_format=self.data_ingestion_config.artifact_format) as feature_store_writer, \
+                    DataFrameWriter(self.data_ingestion_config.training_file_path) as train_writer, \
+                    DataFrameWriter(self.data_ingestion_config.testing_file_path) as test_writer:
+                while True:
+                    batch_df = await frame_queue.get()
+                    if batch_df is None:
+                        break
+                    await run_in_thread("write", self._write_pipeline_batch, batch_df,
+                                        feature_store_writer, train_writer, test_writer)
+            return feature_store_writer.n_rows, train_writer.n_rows, test_writer.n_rows
+
+        tasks = [asyncio.ensure_future(stage()) for stage in (fetch, decode, write)]
+        try:
+            *_, row_counts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+        return row_counts, dict(busy_seconds)
+
+    def run_async_ingestion(self) -> int:
+        """
+        Method Name :   run_async_ingestion
+        Description :   This method exports the collection into the feature store and hash-splits it into
+                        train and test files in one pass, overlapping the network fetch, the BSON decoding
+                        and the file writes of consecutive batches
+
+        Output      :   Feature store, train and test files are created; returns the number of rows
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        logging.info("Entered run_async_ingestion method of Data_Ingestion class")
+        try:
+            my_data = Proj1Data()
+            columns = self.get_output_columns()
+            snapshot_key = self.get_snapshot_key(my_data, columns)
+            if snapshot_key is not None and self.link_snapshot(snapshot_key):
+                self.split_files_as_train_test([self.data_ingestion_config.feature_store_file_path])
+                return len(read_dataframe(self.data_ingestion_config.feature_store_file_path,
+                                          columns=[self.data_ingestion_config.split_key_column]))
+
+            self.write_field_report(my_data, self.get_projection_columns())
+            cursor = my_data.open_raw_batch_cursor(
+                collection_name=self.data_ingestion_config.collection_name,
+                batch_size=self.data_ingestion_config.export_batch_size,
+                columns=columns,
+                stages=self.get_encoding_stages(columns)
+            )
+            started = time.perf_counter()
+            try:
+                (n_rows, n_train, n_test), busy_seconds = asyncio.run(
+                    self._run_async_pipeline(cursor, columns))
+            finally:
+                cursor.close()
+
+            if n_rows == 0:
+                raise ValueError("No data fetched from MongoDB! Collection may be empty.")
+            if n_train == 0 or n_test == 0:
+                raise ValueError(f"Hash split produced an empty set (train: {n_train}, test: {n_test} rows)")
+            busy = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in busy_seconds.items())
+            logging.info(f"Async ingestion wrote {n_rows} rows ({n_train} train, {n_test} test) in "
+                         f"{time.perf_counter() - started:.1f}s; stage busy time: {busy}")
+
+            self.write_dedup_report()
+            if snapshot_key is not None:
+                self.store_snapshot(snapshot_key)
+            logging.info("Exited run_async_ingestion method of Data_Ingestion class")
+            return n_rows
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     def initiate_data_ingestion(self) -> DataIngestionArtifact:
         """
         Method Name :   initiate_data_ingestion
@@ -107,17 +860,44 @@ class DataIngestion:
         logging.info("Entered initiate_data_ingestion method of Data_Ingestion class")
 
         try:
-            dataframe = self.export_data_into_feature_store()
-            logging.info("Got the data from mongodb")
+            if self.data_ingestion_config.incremental:
+                self.export_delta_into_feature_store()
+                feature_store_file_path = self.data_ingestion_config.incremental_partitions_dir
+                logging.info("Got the data from mongodb")
+
+                if self.data_ingestion_config.split_mode == "hash":
+                    # hash assignments are stable, so the partitions can be split chunk by chunk
+                    self.split_files_as_train_test(self.list_incremental_partitions())
+                else:
+                    self.split_data_as_train_test(self.load_incremental_feature_store())
+            elif self.data_ingestion_config.pipeline_mode == "async" and self.data_ingestion_config.split_mode == "hash":
+                self.run_async_ingestion()
+                feature_store_file_path = self.data_ingestion_config.feature_store_file_path
+            else:
+                if self.data_ingestion_config.pipeline_mode == "async":
+                    logging.warning("Async ingestion splits batch by batch and needs the hash split; running sequentially.")
+                dataframe = self.export_data_into_feature_store()
+                feature_store_file_path = self.data_ingestion_config.feature_store_file_path
+                logging.info("Got the data from mongodb")
 
-            self.split_data_as_train_test(dataframe)
+                if dataframe is not None:
+                    self.split_data_as_train_test(dataframe)
+                elif self.data_ingestion_config.split_mode == "hash":
+                    # streamed exports are split chunk by chunk from the file, never loaded whole
+                    self.split_files_as_train_test([feature_store_file_path])
+                else:
+                    self.split_data_as_train_test(read_dataframe(feature_store_file_path, dtype_plan=self.get_dtype_plan()))
             logging.info("Performed train test split on the dataset")
 
+            dedup_report = self.read_dedup_report()
             # FIX: Use correct parameter name - train_file_path instead of trained_file_path
             data_ingestion_artifact = DataIngestionArtifact(
-                feature_store_file_path=self.data_ingestion_config.feature_store_file_path,
+                feature_store_file_path=feature_store_file_path,
                 trained_file_path=self.data_ingestion_config.training_file_path,
-                test_file_path=self.data_ingestion_config.testing_file_path
+                test_file_path=self.data_ingestion_config.testing_file_path,
+                is_pre_encoded=self.data_ingestion_config.encoding_pushdown,
+                duplicates_dropped=dedup_report.get("duplicates_dropped", 0),
+                dedup_ratio=dedup_report.get("dedup_ratio", 0.0)
             )
             
             logging.info(f"Data ingestion artifact: {data_ingestion_artifact}")
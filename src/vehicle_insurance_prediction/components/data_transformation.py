@@ -1,17 +1,31 @@
+import hashlib
+import json
+import os
 import sys
+from typing import List, Optional, Tuple
+
 import numpy as np
 import pandas as pd
 from imblearn.combine import SMOTEENN
+import sklearn
+from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.compose import ColumnTransformer
 
-from vehicle_insurance_prediction.constants.training_pipeline import TARGET_COLUMN, SCHEMA_FILE_PATH, CURRENT_YEAR
+from vehicle_insurance_prediction.constants.training_pipeline import TARGET_COLUMN, CURRENT_YEAR, RANDOM_STATE
 from vehicle_insurance_prediction.entity.config_entity import DataTransformationConfig
 from vehicle_insurance_prediction.entity.artifact_entity import DataTransformationArtifact, DataIngestionArtifact, DataValidationArtifact
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
 from vehicle_insurance_prediction.exception import MyException
 from vehicle_insurance_prediction.logger import logging
-from vehicle_insurance_prediction.utils.main_utils import save_object, save_numpy_array_data, read_yaml_file
+from vehicle_insurance_prediction.utils.main_utils import (
+    read_dataframe, iter_dataframe_chunks, count_dataframe_rows, save_object, save_numpy_array_data, log_memory_usage,
+    file_sha256
+)
+from vehicle_insurance_prediction.utils.artifact_cache import ArtifactCache
+from vehicle_insurance_prediction.utils.feature_encoder import RawFeatureEncoder
+from vehicle_insurance_prediction.utils.resampling import ScalableResampler
 
 
 class DataTransformation:
@@ -22,22 +36,24 @@ class DataTransformation:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_transformation_config = data_transformation_config
             self.data_validation_artifact = data_validation_artifact
-            self._schema_config = read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            self._schema = load_schema()
+            self._input_columns = list(self._schema.get_columns(data_ingestion_artifact.is_pre_encoded))
+            self._dtype_plan = self._schema.get_dtype_plan(data_ingestion_artifact.is_pre_encoded)
         except Exception as e:
             raise MyException(e, sys)
 
     @staticmethod
-    def read_data(file_path) -> pd.DataFrame:
+    def read_data(file_path, columns: Optional[List[str]] = None, dtype_plan: Optional[dict] = None) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path, columns=columns, dtype_plan=dtype_plan)
         except Exception as e:
             raise MyException(e, sys)
 
     def get_data_transformer_object(self) -> Pipeline:
         """
-        Creates and returns a data transformer object for the data, 
-        including gender mapping, dummy variable creation, column renaming,
-        feature scaling, and type adjustments.
+        Creates and returns a data transformer object for the data: the fused raw feature encoder
+        (gender mapping, id dropping, dummy variable creation), median imputation of missing values
+        and feature scaling.
         """
         logging.info("Entered get_data_transformer_object method of DataTransformation class")
 
@@ -48,8 +64,8 @@ class DataTransformation:
             logging.info("Transformers Initialized: StandardScaler-MinMaxScaler")
 
             # Load schema configurations
-            num_features = self._schema_config['num_features']
-            mm_columns = self._schema_config['mm_columns']
+            num_features = self._schema.config['num_features']
+            mm_columns = self._schema.config['mm_columns']
             logging.info("Cols loaded from schema.")
 
             # Creating preprocessor pipeline
@@ -61,8 +77,14 @@ class DataTransformation:
                 remainder='passthrough'  # Leaves other columns as they are
             )
 
-            # Wrapping everything in a single pipeline
-            final_pipeline = Pipeline(steps=[("Preprocessor", preprocessor)])
+            # validation lets a few nulls through, but the resampler and the model reject NaN;
+            # the imputer keeps column names so the scalers can still select their columns
+            imputer = SimpleImputer(strategy="median", keep_empty_features=True).set_output(transform="pandas")
+
+            # Wrapping everything in a single pipeline, so the saved object accepts raw records
+            encoder = RawFeatureEncoder(drop_columns=self._schema.drop_columns)
+            final_pipeline = Pipeline(steps=[("RawFeatureEncoder", encoder), ("Imputer", imputer),
+                                             ("Preprocessor", preprocessor)])
             logging.info("Final Pipeline Ready!!")
             logging.info("Exited get_data_transformer_object method of DataTransformation class")
             return final_pipeline
@@ -71,51 +93,40 @@ class DataTransformation:
             logging.exception("Exception occurred in get_data_transformer_object method of DataTransformation class")
             raise MyException(e, sys) from e
 
-    def _map_gender_column(self, df):
-        """Map Gender column to 0 for Female and 1 for Male."""
-        logging.info("Mapping 'Gender' column to binary values")
-        df['Gender'] = df['Gender'].map({'Female': 0, 'Male': 1}).astype(int)
-        return df
-
-    def _create_dummy_columns(self, df):
-        """Create dummy variables for categorical features."""
-        logging.info("Creating dummy variables for categorical features")
-        df = pd.get_dummies(df, drop_first=True)
-        return df
-
-    def _rename_columns(self, df):
-        """Rename specific columns and ensure integer types for dummy columns."""
-        logging.info("Renaming specific columns and casting to int")
-        df = df.rename(columns={
-            "Vehicle_Age_< 1 Year": "Vehicle_Age_lt_1_Year",
-            "Vehicle_Age_> 2 Years": "Vehicle_Age_gt_2_Years"
-        })
-        for col in ["Vehicle_Age_lt_1_Year", "Vehicle_Age_gt_2_Years", "Vehicle_Damage_Yes"]:
-            if col in df.columns:
-                df[col] = df[col].astype('int')
-        return df
-
-    def _drop_id_column(self, df):
-        """Drop the 'id' column if it exists."""
-        logging.info("Dropping 'id' column")
-        drop_col = self._schema_config['drop_columns']
-        if drop_col in df.columns:
-            df = df.drop(drop_col, axis=1)
-        return df
-
-    def initiate_data_transformation(self) -> DataTransformationArtifact:
+    def get_resampler(self):
         """
-        Initiates the data transformation component for the pipeline.
+        Creates the resampler balancing the training split: the chunked, parallel ScalableResampler,
+        or imblearn's SMOTEENN when the "smoteenn" resampler is configured.
         """
         try:
-            logging.info("Data Transformation Started !!!")
-            if not self.data_validation_artifact.validation_status:
-                raise Exception(self.data_validation_artifact.message)
+            config = self.data_transformation_config
+            if config.resampler == "smoteenn":
+                return SMOTEENN(sampling_strategy="minority")
+            if config.resampler != "scalable":
+                raise ValueError(f"Unsupported resampler '{config.resampler}', expected 'scalable' or 'smoteenn'.")
+            return ScalableResampler(n_jobs=config.resampler_n_jobs, chunk_size=config.resampler_chunk_size,
+                                     approximate=config.resampler_approximate, block_size=config.resampler_block_size,
+                                     max_synthetic_rows=config.resampler_max_synthetic_rows, random_state=RANDOM_STATE)
+        except Exception as e:
+            raise MyException(e, sys) from e
 
-            # Load train and test data
-            train_df = self.read_data(file_path=self.data_ingestion_artifact.trained_file_path)
-            test_df = self.read_data(file_path=self.data_ingestion_artifact.test_file_path)
+    def apply_custom_transformations(self, df):
+        """Gender mapping, id dropping and dummy creation of raw input features, as the preprocessor's encoder does."""
+        return RawFeatureEncoder(drop_columns=self._schema.drop_columns).fit_transform(df)
+
+    def transform_in_memory(self, preprocessor: Pipeline) -> Tuple[np.ndarray, pd.Series, np.ndarray, pd.Series]:
+        """
+        Loads the train and test data, fits the preprocessor on the train features and transforms both splits.
+        """
+        try:
+            # Load train and test data, reading only the schema (or pre-encoded) columns
+            train_df = self.read_data(file_path=self.data_ingestion_artifact.trained_file_path, columns=self._input_columns,
+                                      dtype_plan=self._dtype_plan)
+            test_df = self.read_data(file_path=self.data_ingestion_artifact.test_file_path, columns=self._input_columns,
+                                     dtype_plan=self._dtype_plan)
             logging.info("Train-Test data loaded")
+            log_memory_usage("data_transformation.train", train_df)
+            log_memory_usage("data_transformation.test", test_df)
 
             input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN], axis=1)
             target_feature_train_df = train_df[TARGET_COLUMN]
@@ -124,53 +135,225 @@ class DataTransformation:
             target_feature_test_df = test_df[TARGET_COLUMN]
             logging.info("Input and Target cols defined for both train and test df.")
 
-            # Apply custom transformations in specified sequence
-            input_feature_train_df = self._map_gender_column(input_feature_train_df)
-            input_feature_train_df = self._drop_id_column(input_feature_train_df)
-            input_feature_train_df = self._create_dummy_columns(input_feature_train_df)
-            input_feature_train_df = self._rename_columns(input_feature_train_df)
+            logging.info("Initializing transformation for Training-data")
+            input_feature_train_arr = preprocessor.fit_transform(input_feature_train_df)
+            logging.info("Initializing transformation for Testing-data")
+            input_feature_test_arr = preprocessor.transform(input_feature_test_df)
+            return input_feature_train_arr, target_feature_train_df, input_feature_test_arr, target_feature_test_df
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def fit_preprocessor_in_chunks(self, preprocessor: Pipeline) -> Pipeline:
+        """
+        Fits the preprocessor on the train data block by block. The first block fits the whole pipeline, so
+        the fitted object has exactly the structure of an in-memory fit; every later block only updates the
+        running statistics of the scalers through partial_fit. The imputer medians come from the first block.
+        """
+        try:
+            encoder = preprocessor.named_steps["RawFeatureEncoder"]
+            imputer = preprocessor.named_steps["Imputer"]
+            column_transformer = preprocessor.named_steps["Preprocessor"]
+            n_rows = 0
+            for chunk_df in iter_dataframe_chunks(self.data_ingestion_artifact.trained_file_path,
+                                                  chunk_size=self.data_transformation_config.chunk_size,
+                                                  columns=self._input_columns, dtype_plan=self._dtype_plan):
+                features = chunk_df.drop(columns=[TARGET_COLUMN], axis=1)
+                if not n_rows:
+                    preprocessor.fit(features)
+                else:
+                    encoded = imputer.transform(encoder.transform(features))
+                    for _, transformer, columns in column_transformer.transformers_:
+                        if hasattr(transformer, "partial_fit"):
+                            transformer.partial_fit(encoded[columns])
+                n_rows += len(chunk_df)
+            logging.info(f"Preprocessor fitted on {n_rows} train rows in chunks")
+            return preprocessor
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def transform_file_in_chunks(self, preprocessor: Pipeline, file_path: str,
+                                 output_file_path: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Transforms a train/test file block by block into a memory-mapped feature array at `output_file_path`.
 
-            input_feature_test_df = self._map_gender_column(input_feature_test_df)
-            input_feature_test_df = self._drop_id_column(input_feature_test_df)
-            input_feature_test_df = self._create_dummy_columns(input_feature_test_df)
-            input_feature_test_df = self._rename_columns(input_feature_test_df)
-            logging.info("Custom transformations applied to train and test data")
+        Output      :   the memory-mapped features and the in-memory target
+        """
+        try:
+            config = self.data_transformation_config
+            n_rows = count_dataframe_rows(file_path)
+            n_features = len(preprocessor.named_steps["Preprocessor"].get_feature_names_out())
+            os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+            features = np.lib.format.open_memmap(output_file_path, mode="w+", dtype=config.feature_dtype,
+                                                 shape=(n_rows, n_features))
+            target = np.empty(n_rows, dtype=config.target_dtype)
+            offset = 0
+            for chunk_df in iter_dataframe_chunks(file_path, chunk_size=config.chunk_size, columns=self._input_columns,
+                                                  dtype_plan=self._dtype_plan):
+                stop = offset + len(chunk_df)
+                features[offset:stop] = preprocessor.transform(chunk_df.drop(columns=[TARGET_COLUMN], axis=1))
+                target[offset:stop] = chunk_df[TARGET_COLUMN].to_numpy()
+                offset = stop
+            features.flush()
+            logging.info(f"Transformed {n_rows} rows of {file_path} into {output_file_path}")
+            return features, target
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def transform_in_chunks(self, preprocessor: Pipeline) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Out-of-core counterpart of transform_in_memory: the preprocessor is fitted and applied block by
+        block, and the transformed splits are memory-mapped files instead of in-memory arrays.
+        The resampling that follows is not out-of-core: it reads the whole transformed train split into RAM.
+        """
+        try:
+            config = self.data_transformation_config
+            self.fit_preprocessor_in_chunks(preprocessor)
+            x_train, y_train = self.transform_file_in_chunks(preprocessor, self.data_ingestion_artifact.trained_file_path,
+                                                             config.unsampled_train_file_path)
+            x_test, y_test = self.transform_file_in_chunks(preprocessor, self.data_ingestion_artifact.test_file_path,
+                                                           config.unsampled_test_file_path)
+            return x_train, y_train, x_test, y_test
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_cache_key(self, preprocessor: Pipeline, resampler) -> Optional[str]:
+        """
+        Fingerprint of everything the transformation outputs depend on: the content of the train and test
+        files, the schema, the transformer and resampler parameters with their seed, and the output settings.
+        Returns None when the transformation cache is disabled.
+        """
+        try:
+            config = self.data_transformation_config
+            if not config.cache:
+                return None
+            resampler_params = resampler.get_params(deep=True) if hasattr(resampler, "get_params") else vars(resampler)
+            settings = {
+                "train": file_sha256(self.data_ingestion_artifact.trained_file_path),
+                "test": file_sha256(self.data_ingestion_artifact.test_file_path),
+                "schema": self._schema.sha256,
+                "preprocessor": {name: repr(value) for name, value in preprocessor.get_params(deep=True).items()},
+                "resampler": [type(resampler).__name__, {name: repr(value) for name, value in resampler_params.items()}],
+                "random_state": RANDOM_STATE,
+                "resample_test_split": config.resample_test_split,
+                "chunked": config.chunked,
+                "dtypes": [config.feature_dtype, config.target_dtype],
+                "outputs": [os.path.basename(file_path) for file_path in self._get_output_file_paths()],
+                "sklearn": sklearn.__version__,
+            }
+            return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:32]
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _get_cache(self) -> ArtifactCache:
+        return ArtifactCache(self.data_transformation_config.cache_dir, self.data_transformation_config.cache_max_bytes,
+                             name="transformation_cache")
+
+    def _get_output_file_paths(self) -> List[str]:
+        config = self.data_transformation_config
+        return [config.transformed_object_file_path, config.transformed_train_file_path,
+                config.transformed_train_target_file_path, config.transformed_test_file_path,
+                config.transformed_test_target_file_path, config.unsampled_train_file_path,
+                config.unsampled_train_target_file_path]
+
+    def restore_cached_outputs(self, cache_key: str) -> bool:
+        """Places the cached preprocessor and transformed arrays of `cache_key` at this run's output paths."""
+        try:
+            entry_dir = self._get_cache().get(cache_key)
+            if entry_dir is None:
+                return False
+            for file_path in self._get_output_file_paths():
+                ArtifactCache.link_or_copy(os.path.join(entry_dir, os.path.basename(file_path)), file_path)
+            return True
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def store_cached_outputs(self, cache_key: str) -> None:
+        """Adds this run's preprocessor and transformed arrays to the cache, evicting least recently used entries."""
+        try:
+            self._get_cache().put(cache_key, {os.path.basename(file_path): file_path
+                                              for file_path in self._get_output_file_paths()})
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_data_transformation_artifact(self) -> DataTransformationArtifact:
+        config = self.data_transformation_config
+        return DataTransformationArtifact(
+            transformed_object_file_path=config.transformed_object_file_path,
+            transformed_train_file_path=config.transformed_train_file_path,
+            transformed_test_file_path=config.transformed_test_file_path,
+            transformed_train_target_file_path=config.transformed_train_target_file_path,
+            transformed_test_target_file_path=config.transformed_test_target_file_path,
+            unsampled_train_file_path=config.unsampled_train_file_path,
+            unsampled_train_target_file_path=config.unsampled_train_target_file_path
+        )
+
+    def initiate_data_transformation(self) -> DataTransformationArtifact:
+        """
+        Initiates the data transformation component for the pipeline.
+        """
+        try:
+            logging.info("Data Transformation Started !!!")
+            if not self.data_validation_artifact.validation_status:
+                raise Exception(self.data_validation_artifact.message)
 
             logging.info("Starting data transformation")
             preprocessor = self.get_data_transformer_object()
+            resampler = self.get_resampler()
             logging.info("Got the preprocessor object")
 
-            logging.info("Initializing transformation for Training-data")
-            input_feature_train_arr = preprocessor.fit_transform(input_feature_train_df)
-            logging.info("Initializing transformation for Testing-data")
-            input_feature_test_arr = preprocessor.transform(input_feature_test_df)
+            # an unchanged input with unchanged settings reuses the outputs of an earlier run
+            cache_key = self.get_cache_key(preprocessor, resampler)
+            if cache_key is not None and self.restore_cached_outputs(cache_key):
+                logging.info(f"Reused cached transformation outputs {cache_key}")
+                return self.get_data_transformation_artifact()
+
+            if self.data_transformation_config.chunked:
+                (input_feature_train_arr, target_feature_train_df,
+                 input_feature_test_arr, target_feature_test_df) = self.transform_in_chunks(preprocessor)
+            else:
+                (input_feature_train_arr, target_feature_train_df,
+                 input_feature_test_arr, target_feature_test_df) = self.transform_in_memory(preprocessor)
             logging.info("Transformation done end to end to train-test df.")
 
-            logging.info("Applying SMOTEENN for handling imbalanced dataset.")
-            smt = SMOTEENN(sampling_strategy="minority")
-            input_feature_train_final, target_feature_train_final = smt.fit_resample(
+            logging.info(f"Applying {self.data_transformation_config.resampler} resampling for handling imbalanced dataset.")
+            input_feature_train_final, target_feature_train_final = resampler.fit_resample(
                 input_feature_train_arr, target_feature_train_df
             )
-            input_feature_test_final, target_feature_test_final = smt.fit_resample(
-                input_feature_test_arr, target_feature_test_df
-            )
-            logging.info("SMOTEENN applied to train-test df.")
-
-            train_arr = np.c_[input_feature_train_final, np.array(target_feature_train_final)]
-            test_arr = np.c_[input_feature_test_final, np.array(target_feature_test_final)]
-            logging.info("feature-target concatenation done for train-test df.")
+            # the evaluation split is resampled like the train split unless resample_test_split is turned off
+            if self.data_transformation_config.resample_test_split:
+                input_feature_test_final, target_feature_test_final = resampler.fit_resample(
+                    input_feature_test_arr, target_feature_test_df
+                )
+            else:
+                input_feature_test_final, target_feature_test_final = input_feature_test_arr, target_feature_test_df
+            logging.info("Resampling applied to train-test df.")
 
-            save_object(self.data_transformation_config.transformed_object_file_path, preprocessor)
-            save_numpy_array_data(self.data_transformation_config.transformed_train_file_path, array=train_arr)
-            save_numpy_array_data(self.data_transformation_config.transformed_test_file_path, array=test_arr)
+            # features and target are stored as separate arrays, so neither is copied into a glued float64 array
+            config = self.data_transformation_config
+            save_object(config.transformed_object_file_path, preprocessor)
+            save_numpy_array_data(config.transformed_train_file_path, array=input_feature_train_final,
+                                  dtype=config.feature_dtype)
+            save_numpy_array_data(config.transformed_train_target_file_path, array=target_feature_train_final,
+                                  dtype=config.target_dtype)
+            save_numpy_array_data(config.transformed_test_file_path, array=input_feature_test_final,
+                                  dtype=config.feature_dtype)
+            save_numpy_array_data(config.transformed_test_target_file_path, array=target_feature_test_final,
+                                  dtype=config.target_dtype)
+            # the unresampled train split is kept for the hyperparameter search, chunked mode has written it already
+            if not config.chunked:
+                save_numpy_array_data(config.unsampled_train_file_path, array=input_feature_train_arr,
+                                      dtype=config.feature_dtype)
+            save_numpy_array_data(config.unsampled_train_target_file_path, array=target_feature_train_df,
+                                  dtype=config.target_dtype)
             logging.info("Saving transformation object and transformed files.")
+            if os.path.exists(config.unsampled_test_file_path):
+                os.remove(config.unsampled_test_file_path)
+
+            if cache_key is not None:
+                self.store_cached_outputs(cache_key)
 
             logging.info("Data transformation completed successfully")
-            return DataTransformationArtifact(
-                transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
-                transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
-                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path
-            )
+            return self.get_data_transformation_artifact()
 
         except Exception as e:
             raise MyException(e, sys) from e
\ No newline at end of file
@@ -1,6 +1,7 @@
 import json
 import sys
 import os
+from typing import List, Optional, Tuple
 
 import pandas as pd
 
@@ -8,10 +9,14 @@ from pandas import DataFrame
 
 from vehicle_insurance_prediction.exception import MyException
 from vehicle_insurance_prediction.logger import logging
-from vehicle_insurance_prediction.utils.main_utils import read_yaml_file
+from vehicle_insurance_prediction.utils.main_utils import (
+    read_dataframe, read_dataframe_columns, sample_dataframe, iter_dataframe_chunks
+)
+from vehicle_insurance_prediction.utils.data_profiler import DataProfiler
+from vehicle_insurance_prediction.utils.drift_sketch import DriftSketch, build_drift_sketch
 from vehicle_insurance_prediction.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from vehicle_insurance_prediction.entity.config_entity import DataValidationConfig
-from vehicle_insurance_prediction.constants.training_pipeline import SCHEMA_FILE_PATH
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
 
 
 class DataValidation:
@@ -23,7 +28,13 @@ class DataValidation:
         try:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_validation_config = data_validation_config
-            self._schema_config =read_yaml_file(file_path=SCHEMA_FILE_PATH)
+            self._schema = load_schema()
+            # pre-encoded files carry the dummy columns in place of the one-hot encoded source columns
+            is_pre_encoded = data_ingestion_artifact.is_pre_encoded
+            self._expected_columns = self._schema.get_columns(is_pre_encoded)
+            self._dtype_plan = self._schema.get_dtype_plan(is_pre_encoded)
+            self._categorical_columns = self._schema.get_categorical_columns(is_pre_encoded)
+            self._column_specs = self._schema.get_column_specs(is_pre_encoded)
         except Exception as e:
             raise MyException(e,sys)
 
@@ -36,7 +47,7 @@ class DataValidation:
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            status = len(dataframe.columns) == len(self._schema_config["columns"])
+            status = len(dataframe.columns) == len(self._expected_columns)
             logging.info(f"Is required column present: [{status}]")
             return status
         except Exception as e:
@@ -51,10 +62,10 @@ class DataValidation:
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            dataframe_columns = df.columns
+            dataframe_columns = frozenset(df.columns)
             missing_numerical_columns = []
             missing_categorical_columns = []
-            for column in self._schema_config["numerical_columns"]:
+            for column in self._schema.numerical_columns:
                 if column not in dataframe_columns:
                     missing_numerical_columns.append(column)
 
@@ -62,7 +73,7 @@ class DataValidation:
                 logging.info(f"Missing numerical column: {missing_numerical_columns}")
 
 
-            for column in self._schema_config["categorical_columns"]:
+            for column in self._categorical_columns:
                 if column not in dataframe_columns:
                     missing_categorical_columns.append(column)
 
@@ -74,13 +85,118 @@ class DataValidation:
             raise MyException(e, sys) from e
 
     @staticmethod
-    def read_data(file_path) -> DataFrame:
+    def read_data(file_path, columns: Optional[List[str]] = None, dtype_plan: Optional[dict] = None) -> DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path, columns=columns, dtype_plan=dtype_plan)
         except Exception as e:
             raise MyException(e, sys)
         
 
+    def profile_file(self, file_path: str) -> Tuple[DataFrame, DataProfiler]:
+        """
+        Method Name :   profile_file
+        Description :   This method profiles a train/test file in one pass over its chunks, so the file is
+                        never loaded as a whole
+
+        Output      :   empty dataframe with the file's columns and the filled profiler
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            profiler = DataProfiler(self._column_specs)
+            header_df = None
+            for chunk_df in iter_dataframe_chunks(file_path, chunk_size=self.data_validation_config.chunk_size):
+                if header_df is None:
+                    header_df = chunk_df.head(0)
+                profiler.update(chunk_df)
+            logging.info(f"Profiled {profiler.n_rows} rows of {file_path}")
+            return (header_df if header_df is not None else DataFrame()), profiler
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def profile_sample(self, file_path: str, sample_df: Optional[DataFrame] = None) -> Tuple[DataFrame, DataProfiler]:
+        """
+        Method Name :   profile_sample
+        Description :   This method reads the columns of a train/test file from its header or metadata and profiles
+                        a sample of at most `sample_size` rows, so its cost does not grow with the file.
+                        A sample already read from the file can be passed as `sample_df`
+
+        Output      :   empty dataframe with the file's columns and the profiler filled from the sample
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            header_df = DataFrame(columns=read_dataframe_columns(file_path))
+            if sample_df is None:
+                sample_df = sample_dataframe(file_path, n_rows=self.data_validation_config.sample_size)
+            profiler = DataProfiler(self._column_specs)
+            profiler.update(sample_df)
+            logging.info(f"Profiled a sample of {profiler.n_rows} rows of {file_path}")
+            return header_df, profiler
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def check_profile(self, profiler: DataProfiler) -> List[str]:
+        """
+        Method Name :   check_profile
+        Description :   This method compares a profile against the configured null, dtype and range thresholds
+
+        Output      :   list of threshold violations
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            return profiler.check(
+                max_null_rate=self.data_validation_config.max_null_rate,
+                max_dtype_mismatch_rate=self.data_validation_config.max_dtype_mismatch_rate,
+                max_out_of_range_rate=self.data_validation_config.max_out_of_range_rate
+            )
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def detect_drift(self, sample_df: Optional[DataFrame] = None) -> Optional[dict]:
+        """
+        Method Name :   detect_drift
+        Description :   This method streams the whole training file into a drift sketch and stores it; that
+                        sketch is shipped with the model as the next runs' reference. Drift is scored against the
+                        sketch of the data the production model was trained on, from `sample_df` when given
+                        (fast mode) and from the full sketch otherwise
+
+        Output      :   drift report, None when sketching is disabled
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            if not self.data_validation_config.drift_sketch:
+                return None
+            # the stored sketch becomes a reference, so it always covers every training row
+            full_sketch = build_drift_sketch(self.data_ingestion_artifact.trained_file_path, self._column_specs,
+                                             chunk_size=self.data_validation_config.chunk_size,
+                                             n_workers=self.data_validation_config.drift_sketch_workers)
+            full_sketch.save(self.data_validation_config.drift_sketch_file_path)
+            if sample_df is not None:
+                sketch = DriftSketch.from_chunk(self._column_specs, sample_df)
+                logging.info(f"Scoring drift on a sample of {sketch.n_rows} training rows")
+            else:
+                sketch = full_sketch
+
+            reference_file_path = self.data_validation_config.drift_reference_file_path
+            reference = DriftSketch.load(reference_file_path)
+            if reference is None:
+                logging.info(f"No drift reference at {reference_file_path}, skipping drift scores")
+                return {"reference": None, "drifted_columns": [], "scores": {}}
+
+            scores = sketch.drift(reference)
+            drifted_columns = [
+                column for column, score in scores.items()
+                if (score["psi"] is not None and score["psi"] > self.data_validation_config.drift_psi_threshold)
+                or (score["ks"] is not None and score["ks"] > self.data_validation_config.drift_ks_threshold)
+            ]
+            if drifted_columns:
+                logging.warning(f"Drift against {reference_file_path} in columns: {drifted_columns}")
+            else:
+                logging.info(f"No drift against {reference_file_path}")
+            return {"reference": reference_file_path, "reference_rows": reference.n_rows, "sketch_rows": sketch.n_rows,
+                    "drifted_columns": drifted_columns, "scores": scores}
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     def initiate_data_validation(self) -> DataValidationArtifact:
         """
         Method Name :   initiate_data_validation
@@ -93,8 +209,21 @@ class DataValidation:
         try:
             validation_error_msg = ""
             logging.info("Starting data validation")
-            train_df, test_df = (DataValidation.read_data(file_path=self.data_ingestion_artifact.trained_file_path),
-                                 DataValidation.read_data(file_path=self.data_ingestion_artifact.test_file_path))
+            validation_mode = self.data_validation_config.validation_mode
+            if validation_mode not in ("fast", "full"):
+                raise ValueError(f"Unsupported validation mode '{validation_mode}', expected 'fast' or 'full'.")
+            logging.info(f"Validation mode: {validation_mode}")
+            if validation_mode == "fast":
+                # drift is scored on the same training sample the profile is built from
+                train_sample_df = sample_dataframe(self.data_ingestion_artifact.trained_file_path,
+                                                   n_rows=self.data_validation_config.sample_size)
+                train_df, train_profiler = self.profile_sample(self.data_ingestion_artifact.trained_file_path,
+                                                               sample_df=train_sample_df)
+                test_df, test_profiler = self.profile_sample(self.data_ingestion_artifact.test_file_path)
+            else:
+                train_sample_df = None
+                train_df, train_profiler = self.profile_file(self.data_ingestion_artifact.trained_file_path)
+                test_df, test_profiler = self.profile_file(self.data_ingestion_artifact.test_file_path)
 
             # Checking col len of dataframe for train/test df
             status = self.validate_number_of_columns(dataframe=train_df)
@@ -122,12 +251,25 @@ class DataValidation:
             else:
                 logging.info(f"All categorical/int columns present in testing dataframe: {status}")
 
+            # Checking null rates, dtype conformance and value ranges of the profiles
+            for name, profiler in (("training", train_profiler), ("test", test_profiler)):
+                violations = self.check_profile(profiler)
+                if violations:
+                    validation_error_msg += f"Profile of {name} dataframe breaks thresholds: {'; '.join(violations)}. "
+                else:
+                    logging.info(f"Profile of {name} dataframe within thresholds")
+
+            drift_report = self.detect_drift(sample_df=train_sample_df)
+            if drift_report and drift_report["drifted_columns"] and self.data_validation_config.fail_on_drift:
+                validation_error_msg += f"Training data drifted in columns: {drift_report['drifted_columns']}. "
+
             validation_status = len(validation_error_msg) == 0
 
             data_validation_artifact = DataValidationArtifact(
                 validation_status=validation_status,
                 message=validation_error_msg,
-                validation_report_file_path=self.data_validation_config.validation_report_file_path
+                validation_report_file_path=self.data_validation_config.validation_report_file_path,
+                drift_sketch_file_path=self.data_validation_config.drift_sketch_file_path if drift_report is not None else ""
             )
 
             # Ensure the directory for validation_report_file_path exists
@@ -137,7 +279,15 @@ class DataValidation:
             # Save validation status and message to a JSON file
             validation_report = {
                 "validation_status": validation_status,
-                "message": validation_error_msg.strip()
+                "message": validation_error_msg.strip(),
+                "mode": validation_mode,
+                "thresholds": {
+                    "max_null_rate": self.data_validation_config.max_null_rate,
+                    "max_dtype_mismatch_rate": self.data_validation_config.max_dtype_mismatch_rate,
+                    "max_out_of_range_rate": self.data_validation_config.max_out_of_range_rate,
+                },
+                "profile": {"train": train_profiler.result(), "test": test_profiler.result()},
+                "drift": drift_report,
             }
 
             with open(self.data_validation_config.validation_report_file_path, "w") as report_file:
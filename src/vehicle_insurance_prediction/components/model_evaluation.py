@@ -4,9 +4,12 @@ from sklearn.metrics import f1_score
 from vehicle_insurance_prediction.exception import MyException
 from vehicle_insurance_prediction.constants.training_pipeline import TARGET_COLUMN
 from vehicle_insurance_prediction.logger import logging
-from vehicle_insurance_prediction.utils.main_utils import load_object
+from vehicle_insurance_prediction.utils.main_utils import (
+    load_object, read_dataframe
+)
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
+from vehicle_insurance_prediction.utils.feature_encoder import accepts_raw_records, encode_raw_features
 import sys
-import pandas as pd
 from typing import Optional
 from vehicle_insurance_prediction.entity.s3_estimator import Proj1Estimator
 from dataclasses import dataclass
@@ -50,37 +53,6 @@ class ModelEvaluation:
         except Exception as e:
             raise  MyException(e,sys)
         
-    def _map_gender_column(self, df):
-        """Map Gender column to 0 for Female and 1 for Male."""
-        logging.info("Mapping 'Gender' column to binary values")
-        df['Gender'] = df['Gender'].map({'Female': 0, 'Male': 1}).astype(int)
-        return df
-
-    def _create_dummy_columns(self, df):
-        """Create dummy variables for categorical features."""
-        logging.info("Creating dummy variables for categorical features")
-        df = pd.get_dummies(df, drop_first=True)
-        return df
-
-    def _rename_columns(self, df):
-        """Rename specific columns and ensure integer types for dummy columns."""
-        logging.info("Renaming specific columns and casting to int")
-        df = df.rename(columns={
-            "Vehicle_Age_< 1 Year": "Vehicle_Age_lt_1_Year",
-            "Vehicle_Age_> 2 Years": "Vehicle_Age_gt_2_Years"
-        })
-        for col in ["Vehicle_Age_lt_1_Year", "Vehicle_Age_gt_2_Years", "Vehicle_Damage_Yes"]:
-            if col in df.columns:
-                df[col] = df[col].astype('int')
-        return df
-    
-    def _drop_id_column(self, df):
-        """Drop the 'id' column if it exists."""
-        logging.info("Dropping 'id' column")
-        if "_id" in df.columns:
-            df = df.drop("_id", axis=1)
-        return df
-
     def evaluate_model(self) -> EvaluateModelResponse:
         """
         Method Name :   evaluate_model
@@ -91,15 +63,12 @@ class ModelEvaluation:
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            test_df = pd.read_csv(self.data_ingestion_artifact.test_file_path)
+            schema = load_schema()
+            is_pre_encoded = self.data_ingestion_artifact.is_pre_encoded
+            test_df = read_dataframe(self.data_ingestion_artifact.test_file_path,
+                                     dtype_plan=schema.get_dtype_plan(is_pre_encoded))
             x, y = test_df.drop(TARGET_COLUMN, axis=1), test_df[TARGET_COLUMN]
-
-            logging.info("Test data loaded and now transforming it for prediction...")
-
-            x = self._map_gender_column(x)
-            x = self._drop_id_column(x)
-            x = self._create_dummy_columns(x)
-            x = self._rename_columns(x)
+            logging.info(f"Test data loaded, pre-encoded by mongodb: {is_pre_encoded}")
 
             trained_model = load_object(file_path=self.model_trainer_artifact.trained_model_file_path)
             logging.info("Trained model loaded/exists.")
@@ -110,6 +79,16 @@ class ModelEvaluation:
             best_model = self.get_best_model()
             if best_model is not None:
                 logging.info(f"Computing F1_Score for production model..")
+                if best_model.loaded_model is None:
+                    best_model.loaded_model = best_model.load_model()
+                # the pickled estimator keeps the n_jobs of the machine it was trained on
+                production_estimator = getattr(best_model.loaded_model, "trained_model_object", None)
+                if hasattr(production_estimator, "n_jobs"):
+                    production_estimator.n_jobs = self.model_eval_config.n_jobs
+                # models saved before the fused encoder expect features encoded outside the pipeline
+                if not accepts_raw_records(best_model.loaded_model):
+                    logging.info("Production model predates the raw feature encoder, encoding test data for it")
+                    x = encode_raw_features(x, drop_columns=(*schema.drop_columns, "_id"))
                 y_hat_best_model = best_model.predict(x)
                 best_model_f1_score = f1_score(y, y_hat_best_model)
                 logging.info(f"F1_Score-Production Model: {best_model_f1_score}, F1_Score-New Trained Model: {trained_model_f1_score}")
@@ -1,13 +1,16 @@
+import json
+import os
 import sys
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 
 from vehicle_insurance_prediction.exception import MyException
 from vehicle_insurance_prediction.logger import logging
-from vehicle_insurance_prediction.utils.main_utils import load_numpy_array_data, load_object, save_object
+from vehicle_insurance_prediction.utils.main_utils import load_feature_target_arrays, load_object, save_object, read_yaml_file
+from vehicle_insurance_prediction.utils.hyperparameter_search import SuccessiveHalvingSearch
+from vehicle_insurance_prediction.utils.model_backends import get_model_backend
 from vehicle_insurance_prediction.entity.config_entity import ModelTrainerConfig
 from vehicle_insurance_prediction.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, ClassificationMetricArtifact
 from vehicle_insurance_prediction.entity.estimator import MyModel
@@ -21,35 +24,103 @@ class ModelTrainer:
         """
         self.data_transformation_artifact = data_transformation_artifact
         self.model_trainer_config = model_trainer_config
+        self.model_config = read_yaml_file(file_path=model_trainer_config.model_config_file_path)
 
-    def get_model_object_and_report(self, train: np.array, test: np.array) -> Tuple[object, object]:
+    def get_model_params(self) -> dict:
+        """
+        Method Name :   get_model_params
+        Description :   This function returns the fixed model parameters: the defaults of the model backend
+                        updated by the `model.params` of model.yaml
+
+        Output      :   Returns a dict of estimator parameters
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            params = dict(get_model_backend(self.model_config["model"]["class"]).default_params)
+            params.update(self.model_config["model"].get("params") or {})
+            return params
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def tune_hyperparameters(self) -> Optional[dict]:
+        """
+        Method Name :   tune_hyperparameters
+        Description :   This function runs the hyperparameter search configured in model.yaml on the
+                        unresampled training arrays, scoring trials on a stratified validation split of them,
+                        and writes the best parameters and the trial history to the search report.
+                        The test split is left for the final metrics
+
+        Output      :   Returns the best parameters, or None when the search is disabled
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            search_config = self.model_config.get("search") or {}
+            if not search_config.get("enabled", False):
+                logging.info("Hyperparameter search disabled, training with the fixed parameters")
+                return None
+            if search_config.get("method", "successive_halving") != "successive_halving":
+                raise ValueError(f"Unknown search method {search_config['method']!r}, expected 'successive_halving'")
+
+            n_jobs = self.model_trainer_config.n_jobs
+            search = SuccessiveHalvingSearch(
+                model_class=self.model_config["model"]["class"],
+                params=self.get_model_params(),
+                search_space=self.model_config["model"].get("search_space") or {},
+                n_trials=search_config.get("n_trials", 27),
+                reduction_factor=search_config.get("reduction_factor", 3),
+                min_rows=search_config.get("min_rows", 20_000),
+                max_rows=search_config.get("max_rows"),
+                validation_fraction=search_config.get("validation_fraction", 0.2),
+                scoring=search_config.get("scoring", "f1"),
+                n_workers=search_config.get("n_workers") or n_jobs,
+                n_jobs=n_jobs,
+                random_state=search_config.get("random_state", self.model_trainer_config._random_state)
+            )
+            artifact = self.data_transformation_artifact
+            if not artifact.unsampled_train_file_path:
+                raise ValueError("The hyperparameter search needs the unresampled train arrays of data transformation.")
+            best_params, history = search.search(artifact.unsampled_train_file_path,
+                                                 artifact.unsampled_train_target_file_path)
+
+            search_report = {
+                "model_class": search.model_class,
+                "search": search_config,
+                "best_params": best_params,
+                "best_score": next(entry["score"] for entry in history if entry["status"] == "best"),
+                "trials": history,
+            }
+            os.makedirs(os.path.dirname(self.model_trainer_config.search_report_file_path), exist_ok=True)
+            with open(self.model_trainer_config.search_report_file_path, "w") as report_file:
+                json.dump(search_report, report_file, indent=4)
+            logging.info(f"Hyperparameter search report saved to {self.model_trainer_config.search_report_file_path}")
+            return best_params
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_model_object_and_report(self, x_train: np.array, y_train: np.array, x_test: np.array,
+                                    y_test: np.array, params: Optional[dict] = None) -> Tuple[object, object]:
         """
         Method Name :   get_model_object_and_report
-        Description :   This function trains a RandomForestClassifier with specified parameters
+        Description :   This function trains the model class of model.yaml with the given parameters,
+                        or the fixed parameters when none are given
         
         Output      :   Returns metric artifact object and trained model object
         On Failure  :   Write an exception log and then raise an exception
         """
         try:
-            logging.info("Training RandomForestClassifier with specified parameters")
-
-            # Splitting the train and test data into features and target variables
-            x_train, y_train, x_test, y_test = train[:, :-1], train[:, -1], test[:, :-1], test[:, -1]
-            logging.info("train-test split done.")
-
-            # Initialize RandomForestClassifier with specified parameters
-            model = RandomForestClassifier(
-                n_estimators = self.model_trainer_config._n_estimators,
-                min_samples_split = self.model_trainer_config._min_samples_split,
-                min_samples_leaf = self.model_trainer_config._min_samples_leaf,
-                max_depth = self.model_trainer_config._max_depth,
-                criterion = self.model_trainer_config._criterion,
-                random_state = self.model_trainer_config._random_state
-            )
+            model_class, n_jobs = self.model_config["model"]["class"], self.model_trainer_config.n_jobs
+            backend = get_model_backend(model_class)
+            params = params or self.get_model_params()
+            logging.info(f"Training {model_class} with {params} on {n_jobs} workers")
+
+            # Initialize the model with the selected parameters
+            model = backend.build(params, n_jobs)
 
             # Fit the model
             logging.info("Model training going on...")
-            model.fit(x_train, y_train)
+            backend.fit(model, x_train, y_train, n_jobs)
+            if getattr(model, "n_iter_", None) is not None:
+                logging.info(f"Early stopping kept {model.n_iter_} boosting iterations")
             logging.info("Model training done.")
 
             # Predictions and evaluation metrics
@@ -78,13 +149,18 @@ class ModelTrainer:
         try:
             print("------------------------------------------------------------------------------------------------")
             print("Starting Model Trainer Component")
-            # Load transformed train and test data
-            train_arr = load_numpy_array_data(file_path=self.data_transformation_artifact.transformed_train_file_path)
-            test_arr = load_numpy_array_data(file_path=self.data_transformation_artifact.transformed_test_file_path)
-            logging.info("train-test data loaded")
-            
-            # Train model and get metrics
-            trained_model, metric_artifact = self.get_model_object_and_report(train=train_arr, test=test_arr)
+            # Load transformed train and test data, memory-mapped so they share the page cache instead of being copied
+            artifact, mmap_mode = self.data_transformation_artifact, self.model_trainer_config.mmap_mode
+            x_train, y_train = load_feature_target_arrays(artifact.transformed_train_file_path,
+                                                          artifact.transformed_train_target_file_path, mmap_mode=mmap_mode)
+            x_test, y_test = load_feature_target_arrays(artifact.transformed_test_file_path,
+                                                        artifact.transformed_test_target_file_path, mmap_mode=mmap_mode)
+            logging.info(f"train-test data loaded: features {x_train.dtype} {x_train.shape}, target {y_train.dtype}")
+
+            # Search hyperparameters if model.yaml asks for it, then train on every row with the best ones
+            best_params = self.tune_hyperparameters()
+            trained_model, metric_artifact = self.get_model_object_and_report(x_train, y_train, x_test, y_test,
+                                                                              params=best_params)
             logging.info("Model object and artifact loaded.")
             
             # Load preprocessing object
@@ -92,12 +168,14 @@ class ModelTrainer:
             logging.info("Preprocessing obj loaded.")
 
             # Check if the model's accuracy meets the expected threshold
-            if accuracy_score(train_arr[:, -1], trained_model.predict(train_arr[:, :-1])) < self.model_trainer_config.expected_accuracy:
+            if accuracy_score(y_train, trained_model.predict(x_train)) < self.model_trainer_config.expected_accuracy:
                 logging.info("No model found with score above the base score")
                 raise Exception("No model found with score above the base score")
 
-            # Save the final model object that includes both preprocessing and the trained model
+            # Save the final model object that includes both preprocessing and the trained model,
+            # with the estimator's default worker count rather than the one of this training host
             logging.info("Saving new model as performace is better than previous one.")
+            trained_model = get_model_backend(self.model_config["model"]["class"]).for_serving(trained_model)
             my_model = MyModel(preprocessing_object=preprocessing_obj, trained_model_object=trained_model)
             save_object(self.model_trainer_config.trained_model_file_path, my_model)
             logging.info("Saved final model object that includes both preprocessing and the trained model")
@@ -106,6 +184,7 @@ class ModelTrainer:
             model_trainer_artifact = ModelTrainerArtifact(
                 trained_model_file_path=self.model_trainer_config.trained_model_file_path,
                 metric_artifact=metric_artifact,
+                search_report_file_path=self.model_trainer_config.search_report_file_path if best_params is not None else ""
             )
             logging.info(f"Model trainer artifact: {model_trainer_artifact}")
             return model_trainer_artifact
@@ -1,15 +1,56 @@
 import pymongo
 import os
 import sys
-from vehicle_insurance_prediction.constants import DATABASE_NAME, MONGODB_URL_KEY
+from pymongo import ReadPreference
+from vehicle_insurance_prediction.constants import (
+    DATABASE_NAME, MONGODB_URL_KEY,
+    MONGODB_MAX_POOL_SIZE_KEY, MONGODB_MAX_POOL_SIZE,
+    MONGODB_COMPRESSORS_KEY, MONGODB_COMPRESSORS,
+    MONGODB_CURSOR_BATCH_SIZE_KEY, MONGODB_CURSOR_BATCH_SIZE,
+    MONGODB_EXPORT_READ_PREFERENCE_KEY, MONGODB_EXPORT_READ_PREFERENCE,
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS_KEY, MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    MONGODB_CONNECT_TIMEOUT_MS_KEY, MONGODB_CONNECT_TIMEOUT_MS,
+    MONGODB_SOCKET_TIMEOUT_MS_KEY, MONGODB_SOCKET_TIMEOUT_MS,
+)
 from vehicle_insurance_prediction.logger import logging
 from vehicle_insurance_prediction.exception import MyException
 
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def get_client_settings() -> dict:
+    """
+    Client tuning read from the environment, falling back to the defaults in `constants`.
+    MONGO_COMPRESSORS is a comma separated list in order of preference; "none" disables compression.
+    """
+    compressors = os.getenv(MONGODB_COMPRESSORS_KEY, MONGODB_COMPRESSORS)
+    export_read_preference = os.getenv(MONGODB_EXPORT_READ_PREFERENCE_KEY, MONGODB_EXPORT_READ_PREFERENCE)
+    if export_read_preference not in READ_PREFERENCES:
+        raise ValueError(f"{MONGODB_EXPORT_READ_PREFERENCE_KEY} must be one of {list(READ_PREFERENCES)}, "
+                         f"got '{export_read_preference}'.")
+    return {
+        "max_pool_size": int(os.getenv(MONGODB_MAX_POOL_SIZE_KEY, MONGODB_MAX_POOL_SIZE)),
+        "compressors": "" if compressors.lower() == "none" else compressors,
+        "cursor_batch_size": int(os.getenv(MONGODB_CURSOR_BATCH_SIZE_KEY, MONGODB_CURSOR_BATCH_SIZE)),
+        "export_read_preference": export_read_preference,
+        "server_selection_timeout_ms": int(os.getenv(MONGODB_SERVER_SELECTION_TIMEOUT_MS_KEY, MONGODB_SERVER_SELECTION_TIMEOUT_MS)),
+        "connect_timeout_ms": int(os.getenv(MONGODB_CONNECT_TIMEOUT_MS_KEY, MONGODB_CONNECT_TIMEOUT_MS)),
+        "socket_timeout_ms": int(os.getenv(MONGODB_SOCKET_TIMEOUT_MS_KEY, MONGODB_SOCKET_TIMEOUT_MS)),
+    }
+
+
 class MongoDBClient:
     """
     Class to handle MongoDB connections.
     """
     client = None
+    settings = None
 
     def __init__(self, database_name=DATABASE_NAME) -> None:
         try:
@@ -17,7 +58,7 @@ class MongoDBClient:
                 mongo_db_url = os.getenv(MONGODB_URL_KEY)
                 if mongo_db_url is None:
                     raise Exception(f"Environment key: {MONGODB_URL_KEY} is not set.")
-                
+
                 # Masking for logs
                 if "@" in mongo_db_url:
                     masked_url = mongo_db_url.split("@")[0] + "@***"
@@ -25,12 +66,34 @@ class MongoDBClient:
                     masked_url = mongo_db_url[:20] + "..."
                 logging.info(f"Connecting to MongoDB: {masked_url}")
 
-                MongoDBClient.client = pymongo.MongoClient(mongo_db_url, serverSelectionTimeoutMS=5000)
+                settings = get_client_settings()
+                client_options = {
+                    "maxPoolSize": settings["max_pool_size"],
+                    "serverSelectionTimeoutMS": settings["server_selection_timeout_ms"],
+                    "connectTimeoutMS": settings["connect_timeout_ms"],
+                    "socketTimeoutMS": settings["socket_timeout_ms"],
+                }
+                if settings["compressors"]:
+                    # compressors whose python module is missing are dropped by pymongo with a warning
+                    client_options["compressors"] = settings["compressors"]
+                logging.info(f"MongoDB client settings: {settings}")
+
+                MongoDBClient.client = pymongo.MongoClient(mongo_db_url, **client_options)
                 MongoDBClient.client.admin.command('ping') # Verify connection
+                MongoDBClient.settings = settings
                 logging.info("MongoDB connection successful (ping verified).")
-            
+
             self.client = MongoDBClient.client
+            self.settings = MongoDBClient.settings
             self.database = self.client[database_name]
             self.database_name = database_name
         except Exception as e:
-            raise MyException(e, sys)
\ No newline at end of file
+            raise MyException(e, sys)
+
+    def get_read_preference(self, name: str = None):
+        """Read preference object for `name`, by default the configured export read preference."""
+        return READ_PREFERENCES[name or self.settings["export_read_preference"]]
+
+    def get_cursor_batch_size(self, batch_size: int) -> int:
+        """Number of documents fetched per round trip for exports that consume `batch_size` rows at a time."""
+        return self.settings["cursor_batch_size"] or batch_size
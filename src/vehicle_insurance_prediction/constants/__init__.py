@@ -2,4 +2,20 @@ import os
 
 DATABASE_NAME = "proj1"
 COLLECTION_NAME = "Proj1-Data"
-MONGODB_URL_KEY = "MONGO_DB_URL"
\ No newline at end of file
+MONGODB_URL_KEY = "MONGO_DB_URL"
+
+# MongoDB client tuning: environment key -> default
+MONGODB_MAX_POOL_SIZE_KEY = "MONGO_MAX_POOL_SIZE"
+MONGODB_MAX_POOL_SIZE = 100
+MONGODB_COMPRESSORS_KEY = "MONGO_COMPRESSORS"
+MONGODB_COMPRESSORS = "zstd,snappy,zlib"
+MONGODB_CURSOR_BATCH_SIZE_KEY = "MONGO_CURSOR_BATCH_SIZE"
+MONGODB_CURSOR_BATCH_SIZE = 0  # 0 lets the cursor fetch one export batch per round trip
+MONGODB_EXPORT_READ_PREFERENCE_KEY = "MONGO_EXPORT_READ_PREFERENCE"
+MONGODB_EXPORT_READ_PREFERENCE = "secondaryPreferred"
+MONGODB_SERVER_SELECTION_TIMEOUT_MS_KEY = "MONGO_SERVER_SELECTION_TIMEOUT_MS"
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = 5000
+MONGODB_CONNECT_TIMEOUT_MS_KEY = "MONGO_CONNECT_TIMEOUT_MS"
+MONGODB_CONNECT_TIMEOUT_MS = 10000
+MONGODB_SOCKET_TIMEOUT_MS_KEY = "MONGO_SOCKET_TIMEOUT_MS"
+MONGODB_SOCKET_TIMEOUT_MS = 120000
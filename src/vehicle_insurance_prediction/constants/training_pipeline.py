@@ -11,19 +11,21 @@ DATA_DIR = os.path.join(ARTIFACT_DIR, "data")
 SCHEMA_DIR = "config"
 SCHEMA_FILE_NAME = "schema.yaml"
 SCHEMA_FILE_PATH = os.path.join(SCHEMA_DIR, SCHEMA_FILE_NAME)
+# Schema shipped inside the package, used when no project schema file is present
+PACKAGED_SCHEMA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), SCHEMA_FILE_NAME)
 
-# Target and features (change TARGET_COLUMN to your real column name)
+# Target column (change TARGET_COLUMN to your real column name); the feature columns are read from the schema
 TARGET_COLUMN = "Response"
-NUMERICAL_COLUMNS = [
-    "Age",
-    "Region_Code",
-    "Annual_Premium",
-    "Policy_Sales_Channel",
-    "Vintage",
-]
-CATEGORICAL_COLUMNS = [
-    "Gender", "Driving_License", "Previously_Insured", "Vehicle_Age", "Vehicle_Damage"
-]
+
+# Encoding of the raw categorical columns, shared by the pandas encoders and the mongodb pushdown
+GENDER_COLUMN = "Gender"
+GENDER_MAPPING = {"Female": 0, "Male": 1}
+# dummy column -> (source column, value flagged with 1); the dropped first levels are "1-2 Year" and "No"
+DUMMY_COLUMNS = {
+    "Vehicle_Age_lt_1_Year": ("Vehicle_Age", "< 1 Year"),
+    "Vehicle_Age_gt_2_Years": ("Vehicle_Age", "> 2 Years"),
+    "Vehicle_Damage_Yes": ("Vehicle_Damage", "Yes"),
+}
 
 # Training settings
 CURRENT_YEAR = 2025
@@ -38,27 +40,118 @@ DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO: float = 0.2
+DATA_INGESTION_ARTIFACT_FORMAT: str = "csv"  # "csv" as before; "parquet" or "feather" write typed, compressed files
+DATA_INGESTION_ARTIFACT_COMPRESSION: str = "zstd"
+# "random": train_test_split(random_state=42) on the loaded data, as before; "hash": rows are assigned by a
+# hash of the split key, stable across reruns and applied chunk by chunk (incremental and async ingestion)
+DATA_INGESTION_SPLIT_MODE: str = "random"
+DATA_INGESTION_SPLIT_KEY_COLUMN: str = "id"
+DATA_INGESTION_SPLIT_KEY_DTYPE: str = "int64"
+DATA_INGESTION_SPLIT_STRATIFY: bool = False  # random split mode only; the hash split is stratified in expectation
+DATA_INGESTION_SPLIT_HASH_KEY: str = "vehicle_ins_0001"
+DATA_INGESTION_APPLY_DTYPE_PLAN: bool = True
+DATA_INGESTION_STREAMING_EXPORT: bool = True
+DATA_INGESTION_EXPORT_BATCH_SIZE: int = 10_000
+DATA_INGESTION_DECODE_MODE: str = "dict"  # "dict": one dict per document as before; "raw_bson": typed column buffers
+DATA_INGESTION_ENCODING_PUSHDOWN: bool = False
+DATA_INGESTION_PIPELINE_MODE: str = "sequential"
+DATA_INGESTION_PIPELINE_QUEUE_SIZE: int = 4
+DATA_INGESTION_PROJECTION_PUSHDOWN: bool = True
+DATA_INGESTION_EXPORT_WORKERS: int = 1  # one cursor as before; more export `_id` ranges in parallel
+DATA_INGESTION_EXPORT_SPLIT_KEY: str = "_id"
+DATA_INGESTION_PARTITIONS_PER_WORKER: int = 4
+# decoded batches a partition worker may hold ahead of the consumer; at most this many per worker are in memory
+DATA_INGESTION_PARTITION_QUEUE_SIZE: int = 2
+DATA_INGESTION_SPLIT_POINT_OVERSAMPLING: int = 20
+DATA_INGESTION_INCREMENTAL: bool = False
+DATA_INGESTION_WATERMARK_KEY: str = "_id"
+DATA_INGESTION_INCREMENTAL_STORE_DIR: str = os.path.join(ARTIFACT_DIR, DATA_INGESTION_DIR_NAME, DATA_INGESTION_FEATURE_STORE_DIR)
+DATA_INGESTION_INCREMENTAL_PARTITIONS_DIR: str = "partitions"
+DATA_INGESTION_WATERMARK_FILE_NAME: str = "watermark.yaml"
+DATA_INGESTION_FIELD_REPORT_FILE_NAME: str = "field_report.yaml"
+DATA_INGESTION_FIELD_REPORT_SAMPLE_SIZE: int = 1000
+# the snapshot key only samples the collection (see Proj1Data.collection_fingerprint): disable the cache
+# when documents are updated in place, such updates go unseen until the count or a sampled document changes
+DATA_INGESTION_SNAPSHOT_CACHE: bool = True
+DATA_INGESTION_SNAPSHOT_CACHE_DIR: str = os.path.join(ARTIFACT_DIR, "snapshot_cache")
+DATA_INGESTION_SNAPSHOT_CACHE_MAX_BYTES: int = 5 * 2 ** 30
+DATA_INGESTION_FINGERPRINT_SAMPLE_SIZE: int = 100
+# off by default: keyed on the feature and target columns it also drops distinct customers whose records
+# happen to be identical; set the key columns to ["id"] to drop only re-exported records
+DATA_INGESTION_DEDUP: bool = False
+DATA_INGESTION_DEDUP_KEY_COLUMNS = None  # e.g. ["id"]; None keys on all feature and target columns
+DATA_INGESTION_DEDUP_EXPECTED_ROWS: int = 10_000_000
+DATA_INGESTION_DEDUP_FALSE_POSITIVE_RATE: float = 0.001
+DATA_INGESTION_DEDUP_STATE_FILE_NAME: str = "dedup_state.npz"
+DATA_INGESTION_DEDUP_REPORT_FILE_NAME: str = "dedup_report.yaml"
 
 # Data Validation related constants
 DATA_VALIDATION_DIR_NAME: str = "data_validation"
 DATA_VALIDATION_REPORT_FILE_NAME: str = "report.yaml"
+DATA_VALIDATION_MAX_NULL_RATE: float = 0.05
+DATA_VALIDATION_MAX_DTYPE_MISMATCH_RATE: float = 0.0
+DATA_VALIDATION_MAX_OUT_OF_RANGE_RATE: float = 0.01
+DATA_VALIDATION_MODE: str = "fast"  # "fast": header/metadata checks and a sampled profile; "full": every row
+DATA_VALIDATION_SAMPLE_SIZE: int = 100_000
+# the stored sketch (the shipped drift reference) always covers every training row; "fast" mode scores drift
+# on the validation sample, "full" mode on every row
+DATA_VALIDATION_DRIFT_SKETCH: bool = True
+DATA_VALIDATION_DRIFT_SKETCH_FILE_NAME: str = "drift_sketch.json"
+DATA_VALIDATION_DRIFT_SKETCH_WORKERS: int = 4
+# sketch of the data the production model was trained on, stored next to the model; DRIFT_REFERENCE_PATH overrides it
+DATA_VALIDATION_DRIFT_REFERENCE_PATH_KEY: str = "DRIFT_REFERENCE_PATH"
+DATA_VALIDATION_DRIFT_REFERENCE_FILE_PATH: str = os.path.join(MODEL_DIR, DATA_VALIDATION_DRIFT_SKETCH_FILE_NAME)
+DATA_VALIDATION_DRIFT_PSI_THRESHOLD: float = 0.2
+DATA_VALIDATION_DRIFT_KS_THRESHOLD: float = 0.1
+DATA_VALIDATION_FAIL_ON_DRIFT: bool = False
 
 # Data Transformation related constants
 DATA_TRANSFORMATION_DIR_NAME: str = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR: str = "transformed"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
+DATA_TRANSFORMATION_FEATURE_DTYPE: str = "float32"
+DATA_TRANSFORMATION_TARGET_DTYPE: str = "int8"
+DATA_TRANSFORMATION_TARGET_FILE_SUFFIX: str = "_target"
+# fit the scalers and transform block by block into memory-mapped arrays. Only the preprocessing is out-of-core:
+# the resampler still reads the whole transformed train split into RAM (plus its synthetic rows and neighbour
+# indices), so the train split must fit in memory as feature_dtype, about rows x features x 4 bytes for float32
+DATA_TRANSFORMATION_CHUNKED: bool = False
+DATA_TRANSFORMATION_UNSAMPLED_FILE_SUFFIX: str = "_unsampled"
+DATA_TRANSFORMATION_CACHE: bool = True
+DATA_TRANSFORMATION_CACHE_DIR: str = os.path.join(ARTIFACT_DIR, "transformation_cache")
+DATA_TRANSFORMATION_CACHE_MAX_BYTES: int = 5 * 2 ** 30
+DATA_TRANSFORMATION_RESAMPLER: str = "scalable"  # "scalable" (ScalableResampler) or "smoteenn" (imblearn)
+DATA_TRANSFORMATION_RESAMPLE_TEST_SPLIT: bool = True  # as before; False evaluates on the real class balance
+DATA_TRANSFORMATION_RESAMPLER_N_JOBS: int = -1
+DATA_TRANSFORMATION_RESAMPLER_CHUNK_SIZE: int = 100_000
+DATA_TRANSFORMATION_RESAMPLER_APPROXIMATE: bool = False
+DATA_TRANSFORMATION_RESAMPLER_BLOCK_SIZE: int = 50_000
+DATA_TRANSFORMATION_RESAMPLER_MAX_SYNTHETIC_ROWS = None  # e.g. 2_000_000; None balances the classes fully
 
 # Model Trainer related constants
 MODEL_TRAINER_DIR_NAME: str = "model_trainer"
 MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
-MODEL_TRAINER_MODEL_CONFIG_FILE_PATH: str = os.path.join("config", "model.yaml")
+MODEL_TRAINER_MODEL_CONFIG_FILE_NAME: str = "model.yaml"
+MODEL_TRAINER_MODEL_CONFIG_FILE_PATH: str = os.path.join("config", MODEL_TRAINER_MODEL_CONFIG_FILE_NAME)
+# Model and search configuration shipped inside the package, used when no project model.yaml is present
+PACKAGED_MODEL_CONFIG_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), MODEL_TRAINER_MODEL_CONFIG_FILE_NAME)
+MODEL_TRAINER_SEARCH_REPORT_FILE_NAME: str = "hyperparameter_search.json"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
+MODEL_TRAINER_MMAP_MODE: str = "r"  # None loads the transformed arrays into memory
+MODEL_TRAINER_N_JOBS = None  # e.g. 8; None uses every CPU the container's quota allows
 MODEL_TRAINER_N_ESTIMATORS: int = 200
 MODEL_TRAINER_MIN_SAMPLES_SPLIT: int = 7
 MODEL_TRAINER_MIN_SAMPLES_LEAF: int = 6
 MIN_SAMPLES_SPLIT_MAX_DEPTH: int = 10
 MIN_SAMPLES_SPLIT_CRITERION: str = 'entropy'
 MIN_SAMPLES_SPLIT_RANDOM_STATE: int = 42
+# HistGradientBoostingClassifier backend, selected with `model.class` in model.yaml
+MODEL_TRAINER_HGB_MAX_ITER: int = 500
+MODEL_TRAINER_HGB_LEARNING_RATE: float = 0.1
+MODEL_TRAINER_HGB_MAX_LEAF_NODES: int = 31
+MODEL_TRAINER_HGB_EARLY_STOPPING: bool = True
+MODEL_TRAINER_HGB_N_ITER_NO_CHANGE: int = 10
+MODEL_TRAINER_HGB_VALIDATION_FRACTION: float = 0.1
 
 # Model Evaluation/Pusher related constants
 MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE: float = 0.02
@@ -68,5 +161,7 @@ MODEL_BUCKET_NAME = "rrr-mlops-sagemaker"
 FILE_NAME: str = "vehicle_insurance.csv"
 TRAIN_FILE_NAME: str = "train.csv"
 TEST_FILE_NAME: str = "test.csv"
+ARTIFACT_FILE_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+ARTIFACT_CHUNK_SIZE: int = 100_000
 PREPROCESSING_OBJECT_FILE_NAME = "preprocessing.pkl"
 MODEL_FILE_NAME = "model.pkl"
@@ -1,40 +1,497 @@
 from vehicle_insurance_prediction.configuration.mongo_db_connection import MongoDBClient
 from vehicle_insurance_prediction.constants import DATABASE_NAME
+from vehicle_insurance_prediction.constants.training_pipeline import (
+    DATA_INGESTION_EXPORT_BATCH_SIZE, DATA_INGESTION_PARTITIONS_PER_WORKER, DATA_INGESTION_PARTITION_QUEUE_SIZE,
+    DATA_INGESTION_SPLIT_POINT_OVERSAMPLING,
+    GENDER_COLUMN, GENDER_MAPPING, DUMMY_COLUMNS
+)
 from vehicle_insurance_prediction.exception import MyException
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+import bson
+import hashlib
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import queue
 import sys
+import threading
+import time
 import numpy as np
 import logging
 
+try:
+    from pymongoarrow.api import Schema, find_arrow_all
+    from pymongoarrow.context import PyMongoArrowContext
+    RAW_BSON_DECODING_AVAILABLE = True
+except ImportError:
+    RAW_BSON_DECODING_AVAILABLE = False
+
+# schema dtype -> arrow type the raw BSON decoder builds the column buffer with
+ARROW_FIELD_TYPES = {"object": pa.string(), "int64": pa.int64(), "float64": pa.float64()}
+
+# put on a partition's batch queue after its last batch
+_PARTITION_DONE = object()
+
 class Proj1Data:
-    def __init__(self):
+    def __init__(self, read_preference: Optional[str] = None):
+        """
+        :param read_preference: read preference of every export query, by default the configured
+                                export read preference of the MongoDB client
+        """
         try:
             self.mongo_client = MongoDBClient(database_name=DATABASE_NAME)
+            self.read_preference = self.mongo_client.get_read_preference(read_preference)
         except Exception as e:
             raise MyException(e, sys)
 
-    def export_collection_as_dataframe(self, collection_name: str, database_name: str = None) -> pd.DataFrame:
-        try:
-            if database_name is None:
-                collection = self.mongo_client.database[collection_name]
+    def _get_collection(self, collection_name: str, database_name: str = None):
+        if database_name is None:
+            collection = self.mongo_client.database[collection_name]
+        else:
+            collection = self.mongo_client.client[database_name][collection_name]
+        return collection.with_options(read_preference=self.read_preference)
+
+    @staticmethod
+    def _build_projection(columns: Optional[List[str]]) -> Optional[dict]:
+        """Mongo projection that returns only `columns` and suppresses `_id`."""
+        if not columns:
+            return None
+        projection = {column: 1 for column in columns}
+        projection["_id"] = 0
+        return projection
+
+    @staticmethod
+    def _documents_to_frame(documents: List[dict], columns: Optional[List[str]] = None,
+                            replace_na: bool = True) -> pd.DataFrame:
+        """
+        Pivots a batch of documents into one array per column and builds a DataFrame from them,
+        so only a single batch of per-document dicts is alive at any time.
+        """
+        if columns is None:
+            columns = [key for key in documents[0] if key != "_id"]
+        data = {column: [document.get(column) for document in documents] for column in columns}
+        df = pd.DataFrame(data, columns=columns)
+        if replace_na:
+            df.replace({"na": np.nan}, inplace=True)
+        return df
+
+    @staticmethod
+    def build_encoding_stages(columns: List[str], numeric_columns: List[str]) -> List[dict]:
+        """
+        Aggregation stages that return documents already cleaned and encoded into `columns`:
+        "na" in numeric fields becomes null, the gender is mapped to its code and every dummy column
+        is a 0/1 flag of its source value. Fields not in `columns`, `id` and `_id` included, are dropped.
+        """
+        projection = {"_id": 0}
+        for column in columns:
+            if column in DUMMY_COLUMNS:
+                source, value = DUMMY_COLUMNS[column]
+                projection[column] = {"$cond": [{"$eq": [f"${source}", value]}, 1, 0]}
+            elif column == GENDER_COLUMN:
+                projection[column] = {"$switch": {
+                    "branches": [{"case": {"$eq": [f"${column}", label]}, "then": code}
+                                 for label, code in GENDER_MAPPING.items()],
+                    "default": None,
+                }}
+            elif column in numeric_columns:
+                projection[column] = {"$cond": [{"$eq": [f"${column}", "na"]}, None, f"${column}"]}
             else:
-                collection = self.mongo_client.client[database_name][collection_name]
-            
+                projection[column] = 1
+        return [{"$project": projection}]
+
+    @staticmethod
+    def _range_filter(split_key: str, lower=None, upper=None) -> dict:
+        """Filter selecting `lower <= split_key < upper`; a missing bound leaves that side open."""
+        condition = {}
+        if lower is not None:
+            condition["$gte"] = lower
+        if upper is not None:
+            condition["$lt"] = upper
+        return {split_key: condition} if condition else {}
+
+    @staticmethod
+    def _and_filter(*queries: Optional[dict]) -> dict:
+        queries = [query for query in queries if query]
+        if len(queries) > 1:
+            return {"$and": queries}
+        return queries[0] if queries else {}
+
+    def get_max_key(self, collection_name: str, split_key: str = "_id", database_name: str = None,
+                    query: Optional[dict] = None):
+        """Returns the largest value of `split_key` among the documents matching `query`, or None if there are none."""
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            documents = list(collection.find(query or {}, {split_key: 1}).sort(split_key, -1).limit(1))
+            return documents[0].get(split_key) if documents else None
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def sample_split_points(self, collection_name: str, n_partitions: int, database_name: str = None,
+                            split_key: str = "_id", query: Optional[dict] = None) -> list:
+        """
+        Picks up to `n_partitions - 1` increasing values of `split_key` that cut the collection
+        (or the documents matching `query`) into key ranges of roughly equal size, using a
+        `$sample` of the keys.
+        """
+        try:
+            if n_partitions <= 1:
+                return []
+            collection = self._get_collection(collection_name, database_name)
+            pipeline = [{"$match": query}] if query else []
+            sample = collection.aggregate(pipeline + [
+                {"$sample": {"size": n_partitions * DATA_INGESTION_SPLIT_POINT_OVERSAMPLING}},
+                {"$project": {split_key: 1}},
+            ])
+            keys = sorted(document[split_key] for document in sample if document.get(split_key) is not None)
+            if not keys:
+                return []
+            step = len(keys) / n_partitions
+            return sorted(set(keys[int(i * step)] for i in range(1, n_partitions)))
+        except Exception as e:
+            raise MyException(e, sys)
+
+    @staticmethod
+    def _table_to_frame(table: pa.Table, field_types: Dict[str, str]) -> pd.DataFrame:
+        """
+        Turns a decoded arrow table into a DataFrame with the columns in `field_types` order.
+        "na" in numeric fields has already become null while decoding; string fields are cleared here.
+        """
+        arrays = []
+        for column in field_types:
+            array = table.column(column)
+            if pa.types.is_string(array.type):
+                array = pc.if_else(pc.equal(array, "na"), pa.scalar(None, pa.string()), array)
+            arrays.append(array)
+        return pa.table(arrays, names=list(field_types)).to_pandas()
+
+    @staticmethod
+    def _raw_schema(field_types: Dict[str, str]) -> "Schema":
+        return Schema({"_id": bson.ObjectId, **{column: ARROW_FIELD_TYPES[dtype] for column, dtype in field_types.items()}})
+
+    def _iter_raw_batches(self, collection, batch_size: int, field_types: Dict[str, str],
+                          query: Optional[dict]) -> Iterator[pd.DataFrame]:
+        """
+        Decodes raw BSON batches straight into typed arrow column buffers, without building a dict
+        per document. Batches are pages of `batch_size` documents in `_id` order.
+        """
+        schema = self._raw_schema(field_types)
+        last_id = None
+        while True:
+            page_query = self._and_filter(query, {"_id": {"$gt": last_id}} if last_id is not None else None)
+            # allow_invalid turns values of another BSON type, like "na" in a numeric field, into nulls
+            table = find_arrow_all(collection, page_query, schema=schema, sort=[("_id", 1)], limit=batch_size,
+                                   batch_size=self.mongo_client.get_cursor_batch_size(batch_size), allow_invalid=True)
+            if table.num_rows == 0:
+                break
+            last_id = table.column("_id")[-1].as_py()
+            if isinstance(last_id, bytes):
+                last_id = bson.ObjectId(last_id)
+            yield self._table_to_frame(table, field_types)
+            if table.num_rows < batch_size:
+                break
+
+    def iter_collection_batches(self, collection_name: str, database_name: str = None,
+                                batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE,
+                                columns: Optional[List[str]] = None,
+                                query: Optional[dict] = None,
+                                field_types: Optional[Dict[str, str]] = None,
+                                stages: Optional[List[dict]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams the collection (or the documents matching `query`) as DataFrames of at most `batch_size` rows.
+
+        When `columns` is given only those fields are requested from the server. Otherwise the
+        column layout is taken from the first document and kept for every following batch,
+        so all yielded frames can be appended to the same feature store file.
+
+        With `stages` the documents are read through that aggregation pipeline instead of `find`,
+        e.g. the ones of `build_encoding_stages`, and `columns` names its output fields.
+        With `field_types` (field -> schema dtype) the raw BSON batches are decoded column-wise
+        into exactly those fields instead, see `_iter_raw_batches`.
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            if stages:
+                pipeline = ([{"$match": query}] if query else []) + stages
+                cursor = collection.aggregate(pipeline, batchSize=self.mongo_client.get_cursor_batch_size(batch_size))
+                n_rows = 0
+                while True:
+                    documents = list(islice(cursor, batch_size))
+                    if not documents:
+                        break
+                    n_rows += len(documents)
+                    yield self._documents_to_frame(documents, columns, replace_na=False)
+                logging.info(f"Streamed {n_rows} encoded documents from collection '{collection_name}' in batches of {batch_size}.")
+                return
+            if field_types:
+                n_rows = 0
+                for batch_df in self._iter_raw_batches(collection, batch_size, field_types, query):
+                    n_rows += len(batch_df)
+                    yield batch_df
+                logging.info(f"Decoded {n_rows} raw BSON documents from collection '{collection_name}' in batches of {batch_size}.")
+                return
+            cursor = collection.find(query or {}, self._build_projection(columns),
+                                     batch_size=self.mongo_client.get_cursor_batch_size(batch_size))
+            n_rows = 0
+            while True:
+                documents = list(islice(cursor, batch_size))
+                if not documents:
+                    break
+                if columns is None:
+                    columns = [key for key in documents[0] if key != "_id"]
+                n_rows += len(documents)
+                yield self._documents_to_frame(documents, columns)
+            logging.info(f"Streamed {n_rows} documents from collection '{collection_name}' in batches of {batch_size}.")
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def open_raw_batch_cursor(self, collection_name: str, database_name: str = None,
+                              batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE,
+                              columns: Optional[List[str]] = None, query: Optional[dict] = None,
+                              stages: Optional[List[dict]] = None):
+        """
+        Cursor over the undecoded server batches of the collection (or the documents matching `query`),
+        read through the aggregation `stages` when given.
+        Every item is the raw BSON of up to `batch_size` documents, see `decode_raw_batch`.
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            if stages:
+                pipeline = ([{"$match": query}] if query else []) + stages
+                return collection.aggregate_raw_batches(pipeline, batchSize=batch_size)
+            return collection.find_raw_batches(query or {}, self._build_projection(columns), batch_size=batch_size)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    @classmethod
+    def decode_raw_batch(cls, raw_batch: bytes, columns: Optional[List[str]] = None,
+                         replace_na: bool = True, field_types: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """
+        Decodes one raw server batch into a DataFrame with the same layout as `iter_collection_batches`.
+        With `field_types` the batch is decoded into typed arrow column buffers like `_iter_raw_batches` does,
+        otherwise into one dict per document.
+        """
+        if field_types and RAW_BSON_DECODING_AVAILABLE:
+            context = PyMongoArrowContext(cls._raw_schema(field_types), allow_invalid=True)
+            context.process_bson_stream(raw_batch)
+            return cls._table_to_frame(context.finish(), field_types)
+        return cls._documents_to_frame(bson.decode_all(raw_batch), columns, replace_na)
+
+    @staticmethod
+    def _put_until_stopped(batch_queue: queue.Queue, item, stop_event: threading.Event) -> bool:
+        """Blocks until `item` fits into the queue; gives up once the consumer has stopped reading."""
+        while not stop_event.is_set():
+            try:
+                batch_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _export_partition(self, collection_name: str, database_name: str, batch_size: int,
+                          columns: Optional[List[str]], query: dict,
+                          field_types: Optional[Dict[str, str]], stages: Optional[List[dict]],
+                          batch_queue: queue.Queue, stop_event: threading.Event) -> None:
+        """Hands the batches of one key range to the consumer through `batch_queue`, then a done marker or the error."""
+        try:
+            for batch_df in self.iter_collection_batches(collection_name, database_name, batch_size=batch_size,
+                                                         columns=columns, query=query, field_types=field_types,
+                                                         stages=stages):
+                if not self._put_until_stopped(batch_queue, batch_df, stop_event):
+                    return
+            item = _PARTITION_DONE
+        except Exception as e:
+            item = e
+        self._put_until_stopped(batch_queue, item, stop_event)
+
+    def iter_collection_partitions(self, collection_name: str, database_name: str = None,
+                                   n_workers: int = 4, batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE,
+                                   columns: Optional[List[str]] = None,
+                                   split_key: str = "_id",
+                                   query: Optional[dict] = None,
+                                   field_types: Optional[Dict[str, str]] = None,
+                                   stages: Optional[List[dict]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Exports the collection (or the documents matching `query`) as key ranges of `split_key`
+        read concurrently by `n_workers` threads, each with its own cursor, and yields their batches.
+
+        Batches are yielded in key order regardless of which worker finishes first, so the
+        concatenated output is deterministic and holds exactly the rows of a single-cursor export.
+        At most `n_workers` ranges are read at a time and each worker blocks once it is
+        DATA_INGESTION_PARTITION_QUEUE_SIZE batches ahead of the consumer, so memory stays bounded
+        by a few batches per worker however large the collection is.
+        """
+        try:
+            n_partitions = n_workers * DATA_INGESTION_PARTITIONS_PER_WORKER
+            split_points = self.sample_split_points(collection_name, n_partitions, database_name, split_key, query)
+            bounds = [None, *split_points, None]
+            queries = [self._and_filter(query, self._range_filter(split_key, lower, upper))
+                       for lower, upper in zip(bounds[:-1], bounds[1:])]
+            if split_key != "_id" and split_points:
+                # range operators skip documents where the key is null or missing
+                queries.append(self._and_filter(query, {split_key: None}))
+            logging.info(f"Exporting collection '{collection_name}' as {len(queries)} '{split_key}' ranges on {n_workers} workers.")
+
+            stop_event = threading.Event()
+            executor = ThreadPoolExecutor(max_workers=n_workers)
+            pending_queries, batch_queues = iter(queries), deque()
+
+            def submit_next_partition() -> None:
+                partition_query = next(pending_queries, None)
+                if partition_query is None:
+                    return
+                batch_queue = queue.Queue(maxsize=DATA_INGESTION_PARTITION_QUEUE_SIZE)
+                executor.submit(self._export_partition, collection_name, database_name, batch_size, columns,
+                                partition_query, field_types, stages, batch_queue, stop_event)
+                batch_queues.append(batch_queue)
+
+            try:
+                for _ in range(n_workers):
+                    submit_next_partition()
+                layout = columns
+                while batch_queues:
+                    item = batch_queues[0].get()
+                    if item is _PARTITION_DONE:
+                        # the next range starts only once one is fully consumed
+                        batch_queues.popleft()
+                        submit_next_partition()
+                        continue
+                    if isinstance(item, Exception):
+                        raise item
+                    # partitions infer their layout independently when no projection is given
+                    layout = layout or list(item.columns)
+                    yield item.reindex(columns=layout)
+            finally:
+                stop_event.set()
+                executor.shutdown(wait=True)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def export_collection_as_dataframe(self, collection_name: str, database_name: str = None,
+                                       batch_size: int = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Exports the whole collection as a DataFrame.
+
+        With `batch_size` set, documents are pulled batch by batch through `iter_collection_batches`
+        instead of materializing every document as a dict first. With `columns` set, only those
+        fields are sent over the wire.
+
+        This is not memory-bounded: the whole collection ends up in one DataFrame, and with `batch_size`
+        the batch frames and their concatenation are alive at the same time. For collections that may not
+        fit in memory stream the batches instead, with `iter_collection_batches` or `iter_collection_partitions`
+        as the streaming export of DataIngestion does.
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name)
+
             # Debugging: Log document count
             doc_count = collection.count_documents({})
             logging.info(f"Found {doc_count} documents in collection '{collection_name}' of database '{self.mongo_client.database_name if database_name is None else database_name}'.")
-            
+
             if doc_count == 0:
                 raise ValueError(f"Collection '{collection_name}' is empty. Cannot export dataframe.")
-            
-            df = pd.DataFrame(list(collection.find()))
-            
+
+            if batch_size:
+                frames = list(self.iter_collection_batches(collection_name, database_name,
+                                                           batch_size=batch_size, columns=columns))
+                return pd.concat(frames, ignore_index=True)
+
+            df = pd.DataFrame(list(collection.find({}, self._build_projection(columns))), columns=columns)
+
             if "_id" in df.columns:
                 df = df.drop(columns=["_id"])
-            
+
             df.replace({"na": np.nan}, inplace=True)
             return df
-            
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def profile_field_costs(self, collection_name: str, database_name: str = None,
+                            columns: Optional[List[str]] = None, sample_size: int = 1000) -> Dict[str, object]:
+        """
+        Measures what every field of the collection costs on the wire and in BSON decoding,
+        based on the first `sample_size` documents.
+
+        Returns a report with per-field average bytes and decode time per document, whether the
+        field is kept by the projection on `columns`, and the resulting per-document savings.
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name).with_options(
+                codec_options=CodecOptions(document_class=RawBSONDocument)
+            )
+            raw_documents = list(collection.find({}, limit=sample_size))
+            if not raw_documents:
+                raise ValueError(f"Collection '{collection_name}' is empty. Cannot profile fields.")
+
+            field_bytes = defaultdict(int)
+            field_values = defaultdict(list)
+            document_bytes = 0
+            for raw_document in raw_documents:
+                document_bytes += len(raw_document.raw)
+                for key, value in bson.decode(raw_document.raw).items():
+                    # element size = encoded document minus the int32 length prefix and the terminator
+                    field_bytes[key] += len(bson.encode({key: value})) - 5
+                    field_values[key].append(value)
+
+            n_docs = len(raw_documents)
+            kept = set(columns) if columns else set(field_bytes)
+            fields = {}
+            for key, values in field_values.items():
+                encoded = bson.encode({key: values})
+                started = time.perf_counter()
+                bson.decode(encoded)
+                decode_seconds = time.perf_counter() - started
+                fields[key] = {
+                    "avg_bytes": round(field_bytes[key] / n_docs, 2),
+                    "byte_share": round(field_bytes[key] / document_bytes, 4),
+                    "decode_us_per_doc": round(decode_seconds * 1e6 / n_docs, 3),
+                    "projected": key in kept,
+                }
+
+            full_bytes = document_bytes / n_docs
+            projected_bytes = 5 + sum(fields[key]["avg_bytes"] for key in fields if fields[key]["projected"])
+            report = {
+                "sampled_documents": n_docs,
+                "avg_document_bytes": round(full_bytes, 2),
+                "avg_projected_document_bytes": round(projected_bytes, 2),
+                "wire_bytes_saved_ratio": round(1 - projected_bytes / full_bytes, 4),
+                "fields": fields,
+            }
+            logging.info(f"Projection keeps {projected_bytes:.0f} of {full_bytes:.0f} bytes per document "
+                         f"({report['wire_bytes_saved_ratio']:.1%} saved) in '{collection_name}'.")
+            return report
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def collection_fingerprint(self, collection_name: str, database_name: str = None,
+                               sample_size: int = 100) -> str:
+        """
+        Cheap fingerprint of the collection contents: the estimated document count and a checksum over
+        the raw BSON of the first and last `sample_size` documents by `_id`.
+
+        It is a heuristic, not a content hash. Inserts and deletes change the count, and appends with
+        growing `_id` change the last documents. Changes that keep the count and leave the sampled documents
+        alone are not seen: in-place updates of any other document, or a delete paired with an insert in the
+        middle of the `_id` range. Such changes stay invisible, for any length of time, until a later change
+        touches the count or a sampled document, so a cache keyed on this fingerprint keeps serving the
+        older contents until then.
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            raw_collection = collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+            digest = hashlib.sha256()
+            digest.update(str(collection.estimated_document_count()).encode())
+            for direction in (1, -1):
+                for raw_document in raw_collection.find({}).sort("_id", direction).limit(sample_size):
+                    digest.update(raw_document.raw)
+            fingerprint = digest.hexdigest()
+            logging.info(f"Fingerprint of collection '{collection_name}': {fingerprint}")
+            return fingerprint
         except Exception as e:
             raise MyException(e, sys)
 
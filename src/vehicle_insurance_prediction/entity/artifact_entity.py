@@ -6,18 +6,27 @@ class DataIngestionArtifact:
     feature_store_file_path: str
     trained_file_path: str
     test_file_path: str
+    is_pre_encoded: bool = False
+    duplicates_dropped: int = 0
+    dedup_ratio: float = 0.0
 
 @dataclass
 class DataValidationArtifact:
     validation_status:bool
     message: str
     validation_report_file_path: str 
+    drift_sketch_file_path: str = ""
 
 @dataclass
 class DataTransformationArtifact:
     transformed_object_file_path:str 
     transformed_train_file_path:str
     transformed_test_file_path:str
+    transformed_train_target_file_path: str = ""
+    transformed_test_target_file_path: str = ""
+    # train split before resampling, for the hyperparameter search
+    unsampled_train_file_path: str = ""
+    unsampled_train_target_file_path: str = ""
 
 @dataclass
 class ClassificationMetricArtifact:
@@ -29,6 +38,7 @@ class ClassificationMetricArtifact:
 class ModelTrainerArtifact:
     trained_model_file_path:str 
     metric_artifact:ClassificationMetricArtifact
+    search_report_file_path: str = ""
 
 @dataclass
 class ModelEvaluationArtifact:
@@ -1,6 +1,7 @@
 import os
 from vehicle_insurance_prediction.constants.training_pipeline import *
 from vehicle_insurance_prediction.constants.s3_bucket import *
+from vehicle_insurance_prediction.utils.main_utils import get_available_cpus, get_model_config_file_path
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -14,15 +15,56 @@ class TrainingPipelineConfig:
         self.timestamp: str = TIMESTAMP
 
 
+def with_artifact_format(file_name: str, artifact_format: str) -> str:
+    """Swaps the extension of a tabular artifact file name for the one of `artifact_format`."""
+    return os.path.splitext(file_name)[0] + ARTIFACT_FILE_EXTENSIONS[artifact_format]
+
+
 @dataclass
 class DataIngestionConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        self.artifact_format: str = DATA_INGESTION_ARTIFACT_FORMAT
         self.data_ingestion_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_INGESTION_DIR_NAME)
-        self.feature_store_file_path: str = os.path.join(self.data_ingestion_dir, DATA_INGESTION_FEATURE_STORE_DIR, FILE_NAME)
-        self.training_file_path: str = os.path.join(self.data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TRAIN_FILE_NAME)
-        self.testing_file_path: str = os.path.join(self.data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TEST_FILE_NAME)
+        self.feature_store_file_path: str = os.path.join(self.data_ingestion_dir, DATA_INGESTION_FEATURE_STORE_DIR,
+                                                         with_artifact_format(FILE_NAME, self.artifact_format))
+        self.training_file_path: str = os.path.join(self.data_ingestion_dir, DATA_INGESTION_INGESTED_DIR,
+                                                    with_artifact_format(TRAIN_FILE_NAME, self.artifact_format))
+        self.testing_file_path: str = os.path.join(self.data_ingestion_dir, DATA_INGESTION_INGESTED_DIR,
+                                                   with_artifact_format(TEST_FILE_NAME, self.artifact_format))
         self.train_test_split_ratio: float = DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
+        self.split_mode: str = DATA_INGESTION_SPLIT_MODE
+        self.split_key_column: str = DATA_INGESTION_SPLIT_KEY_COLUMN
+        self.split_key_dtype: str = DATA_INGESTION_SPLIT_KEY_DTYPE
+        self.split_stratify: bool = DATA_INGESTION_SPLIT_STRATIFY
+        self.split_chunk_size: int = ARTIFACT_CHUNK_SIZE
+        self.apply_dtype_plan: bool = DATA_INGESTION_APPLY_DTYPE_PLAN
         self.collection_name: str = DATA_INGESTION_COLLECTION_NAME
+        self.streaming_export: bool = DATA_INGESTION_STREAMING_EXPORT
+        self.export_batch_size: int = DATA_INGESTION_EXPORT_BATCH_SIZE
+        self.decode_mode: str = DATA_INGESTION_DECODE_MODE
+        self.encoding_pushdown: bool = DATA_INGESTION_ENCODING_PUSHDOWN
+        self.pipeline_mode: str = DATA_INGESTION_PIPELINE_MODE
+        self.pipeline_queue_size: int = DATA_INGESTION_PIPELINE_QUEUE_SIZE
+        self.projection_pushdown: bool = DATA_INGESTION_PROJECTION_PUSHDOWN
+        self.export_workers: int = DATA_INGESTION_EXPORT_WORKERS
+        self.export_split_key: str = DATA_INGESTION_EXPORT_SPLIT_KEY
+        self.incremental: bool = DATA_INGESTION_INCREMENTAL
+        self.watermark_key: str = DATA_INGESTION_WATERMARK_KEY
+        self.incremental_partitions_dir: str = os.path.join(DATA_INGESTION_INCREMENTAL_STORE_DIR, DATA_INGESTION_INCREMENTAL_PARTITIONS_DIR)
+        self.incremental_partition_file_path: str = os.path.join(self.incremental_partitions_dir, with_artifact_format(f"part_{training_pipeline_config.timestamp}", self.artifact_format))
+        self.watermark_file_path: str = os.path.join(DATA_INGESTION_INCREMENTAL_STORE_DIR, DATA_INGESTION_WATERMARK_FILE_NAME)
+        self.field_report_file_path: str = os.path.join(self.data_ingestion_dir, DATA_INGESTION_FIELD_REPORT_FILE_NAME)
+        self.field_report_sample_size: int = DATA_INGESTION_FIELD_REPORT_SAMPLE_SIZE
+        self.snapshot_cache: bool = DATA_INGESTION_SNAPSHOT_CACHE
+        self.snapshot_cache_dir: str = DATA_INGESTION_SNAPSHOT_CACHE_DIR
+        self.snapshot_cache_max_bytes: int = DATA_INGESTION_SNAPSHOT_CACHE_MAX_BYTES
+        self.fingerprint_sample_size: int = DATA_INGESTION_FINGERPRINT_SAMPLE_SIZE
+        self.dedup: bool = DATA_INGESTION_DEDUP
+        self.dedup_key_columns = DATA_INGESTION_DEDUP_KEY_COLUMNS
+        self.dedup_expected_rows: int = DATA_INGESTION_DEDUP_EXPECTED_ROWS
+        self.dedup_false_positive_rate: float = DATA_INGESTION_DEDUP_FALSE_POSITIVE_RATE
+        self.dedup_state_file_path: str = os.path.join(DATA_INGESTION_INCREMENTAL_STORE_DIR, DATA_INGESTION_DEDUP_STATE_FILE_NAME)
+        self.dedup_report_file_path: str = os.path.join(self.data_ingestion_dir, DATA_INGESTION_DEDUP_REPORT_FILE_NAME)
 
 
 @dataclass
@@ -30,6 +72,20 @@ class DataValidationConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
         self.data_validation_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_VALIDATION_DIR_NAME)
         self.validation_report_file_path: str = os.path.join(self.data_validation_dir, DATA_VALIDATION_REPORT_FILE_NAME)
+        self.max_null_rate: float = DATA_VALIDATION_MAX_NULL_RATE
+        self.max_dtype_mismatch_rate: float = DATA_VALIDATION_MAX_DTYPE_MISMATCH_RATE
+        self.max_out_of_range_rate: float = DATA_VALIDATION_MAX_OUT_OF_RANGE_RATE
+        self.chunk_size: int = ARTIFACT_CHUNK_SIZE
+        self.validation_mode: str = DATA_VALIDATION_MODE
+        self.sample_size: int = DATA_VALIDATION_SAMPLE_SIZE
+        self.drift_sketch: bool = DATA_VALIDATION_DRIFT_SKETCH
+        self.drift_sketch_file_path: str = os.path.join(self.data_validation_dir, DATA_VALIDATION_DRIFT_SKETCH_FILE_NAME)
+        self.drift_sketch_workers: int = DATA_VALIDATION_DRIFT_SKETCH_WORKERS
+        self.drift_reference_file_path: str = os.getenv(DATA_VALIDATION_DRIFT_REFERENCE_PATH_KEY,
+                                                        DATA_VALIDATION_DRIFT_REFERENCE_FILE_PATH)
+        self.drift_psi_threshold: float = DATA_VALIDATION_DRIFT_PSI_THRESHOLD
+        self.drift_ks_threshold: float = DATA_VALIDATION_DRIFT_KS_THRESHOLD
+        self.fail_on_drift: bool = DATA_VALIDATION_FAIL_ON_DRIFT
 
 
 @dataclass
@@ -40,6 +96,30 @@ class DataTransformationConfig:
                                                         TRAIN_FILE_NAME.replace("csv", "npy"))
         self.transformed_test_file_path: str = os.path.join(self.data_transformation_dir, DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
                                                        TEST_FILE_NAME.replace("csv", "npy"))
+        self.transformed_train_target_file_path: str = self.transformed_train_file_path.replace(
+            ".npy", DATA_TRANSFORMATION_TARGET_FILE_SUFFIX + ".npy")
+        self.transformed_test_target_file_path: str = self.transformed_test_file_path.replace(
+            ".npy", DATA_TRANSFORMATION_TARGET_FILE_SUFFIX + ".npy")
+        self.feature_dtype: str = DATA_TRANSFORMATION_FEATURE_DTYPE
+        self.target_dtype: str = DATA_TRANSFORMATION_TARGET_DTYPE
+        self.chunked: bool = DATA_TRANSFORMATION_CHUNKED
+        self.chunk_size: int = ARTIFACT_CHUNK_SIZE
+        self.unsampled_train_file_path: str = self.transformed_train_file_path.replace(
+            ".npy", DATA_TRANSFORMATION_UNSAMPLED_FILE_SUFFIX + ".npy")
+        self.unsampled_train_target_file_path: str = self.unsampled_train_file_path.replace(
+            ".npy", DATA_TRANSFORMATION_TARGET_FILE_SUFFIX + ".npy")
+        self.unsampled_test_file_path: str = self.transformed_test_file_path.replace(
+            ".npy", DATA_TRANSFORMATION_UNSAMPLED_FILE_SUFFIX + ".npy")
+        self.cache: bool = DATA_TRANSFORMATION_CACHE
+        self.cache_dir: str = DATA_TRANSFORMATION_CACHE_DIR
+        self.cache_max_bytes: int = DATA_TRANSFORMATION_CACHE_MAX_BYTES
+        self.resampler: str = DATA_TRANSFORMATION_RESAMPLER
+        self.resample_test_split: bool = DATA_TRANSFORMATION_RESAMPLE_TEST_SPLIT
+        self.resampler_n_jobs: int = DATA_TRANSFORMATION_RESAMPLER_N_JOBS
+        self.resampler_chunk_size: int = DATA_TRANSFORMATION_RESAMPLER_CHUNK_SIZE
+        self.resampler_approximate: bool = DATA_TRANSFORMATION_RESAMPLER_APPROXIMATE
+        self.resampler_block_size: int = DATA_TRANSFORMATION_RESAMPLER_BLOCK_SIZE
+        self.resampler_max_synthetic_rows = DATA_TRANSFORMATION_RESAMPLER_MAX_SYNTHETIC_ROWS
         self.transformed_object_file_path: str = os.path.join(self.data_transformation_dir,
                                                          DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
                                                          PREPROCESSING_OBJECT_FILE_NAME)
@@ -51,7 +131,10 @@ class ModelTrainerConfig:
         self.model_trainer_dir: str = os.path.join(training_pipeline_config.artifact_dir, MODEL_TRAINER_DIR_NAME)
         self.trained_model_file_path: str = os.path.join(self.model_trainer_dir, MODEL_TRAINER_TRAINED_MODEL_DIR, MODEL_FILE_NAME)
         self.expected_accuracy: float = MODEL_TRAINER_EXPECTED_SCORE
-        self.model_config_file_path: str = MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
+        self.mmap_mode: str = MODEL_TRAINER_MMAP_MODE
+        self.model_config_file_path: str = get_model_config_file_path()
+        self.search_report_file_path: str = os.path.join(self.model_trainer_dir, MODEL_TRAINER_SEARCH_REPORT_FILE_NAME)
+        self.n_jobs: int = MODEL_TRAINER_N_JOBS or get_available_cpus()
         self._n_estimators = MODEL_TRAINER_N_ESTIMATORS
         self._min_samples_split = MODEL_TRAINER_MIN_SAMPLES_SPLIT
         self._min_samples_leaf = MODEL_TRAINER_MIN_SAMPLES_LEAF
@@ -66,6 +149,7 @@ class ModelEvaluationConfig:
         self.changed_threshold_score: float = MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE
         self.bucket_name: str = MODEL_BUCKET_NAME
         self.s3_model_key_path: str = MODEL_FILE_NAME
+        self.n_jobs: int = MODEL_TRAINER_N_JOBS or get_available_cpus()
 
 @dataclass
 class ModelPusherConfig:
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
+
+import yaml
+
+from vehicle_insurance_prediction.constants.training_pipeline import DUMMY_COLUMNS
+from vehicle_insurance_prediction.exception import MyException
+from vehicle_insurance_prediction.logger import logging
+from vehicle_insurance_prediction.utils.data_profiler import build_column_specs
+from vehicle_insurance_prediction.utils.main_utils import (
+    get_schema_file_path, get_dtype_plan, get_encoded_columns, get_encoded_dtype_plan
+)
+
+
+def _frozen(mapping: dict) -> Mapping:
+    return MappingProxyType(dict(mapping))
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """
+    Read-only view of schema.yaml with everything the components derive from it computed once:
+    column orders and index maps, membership sets and the dtype plans of raw and pre-encoded data.
+    """
+    file_path: str
+    sha256: str
+    config: Mapping
+    columns: Tuple[str, ...]
+    column_set: FrozenSet[str]
+    column_index: Mapping
+    dtypes: Mapping
+    numerical_columns: Tuple[str, ...]
+    numerical_set: FrozenSet[str]
+    categorical_columns: Tuple[str, ...]
+    categorical_set: FrozenSet[str]
+    target_column: str
+    drop_columns: Tuple[str, ...]
+    dtype_plan: Mapping
+    column_specs: Mapping
+    encoded_columns: Tuple[str, ...]
+    encoded_column_set: FrozenSet[str]
+    encoded_column_index: Mapping
+    encoded_categorical_columns: Tuple[str, ...]
+    encoded_dtype_plan: Mapping
+    encoded_column_specs: Mapping
+
+    @classmethod
+    def from_config(cls, schema_config: dict, file_path: str = "", sha256: str = "") -> "CompiledSchema":
+        columns = tuple(column["name"] for column in schema_config["columns"])
+        drop_columns = schema_config.get("drop_columns") or ()
+        drop_columns = (drop_columns,) if isinstance(drop_columns, str) else tuple(drop_columns)
+        encoded_sources = {source for source, _ in DUMMY_COLUMNS.values()}
+        encoded_columns = tuple(get_encoded_columns(schema_config))
+        categorical_columns = tuple(schema_config.get("categorical_columns", []))
+        return cls(
+            file_path=file_path,
+            sha256=sha256,
+            config=_frozen(schema_config),
+            columns=columns,
+            column_set=frozenset(columns),
+            column_index=_frozen({column: i for i, column in enumerate(columns)}),
+            dtypes=_frozen({column["name"]: column["dtype"] for column in schema_config["columns"]}),
+            numerical_columns=tuple(schema_config.get("numerical_columns", [])),
+            numerical_set=frozenset(schema_config.get("numerical_columns", [])),
+            categorical_columns=categorical_columns,
+            categorical_set=frozenset(categorical_columns),
+            target_column=schema_config["target_column"],
+            drop_columns=drop_columns,
+            dtype_plan=_frozen(get_dtype_plan(schema_config)),
+            column_specs=_frozen(build_column_specs(schema_config)),
+            encoded_columns=encoded_columns,
+            encoded_column_set=frozenset(encoded_columns),
+            encoded_column_index=_frozen({column: i for i, column in enumerate(encoded_columns)}),
+            encoded_categorical_columns=tuple(column for column in categorical_columns
+                                              if column not in encoded_sources) + tuple(DUMMY_COLUMNS),
+            encoded_dtype_plan=_frozen(get_encoded_dtype_plan(schema_config)),
+            encoded_column_specs=_frozen(build_column_specs(schema_config, is_pre_encoded=True)),
+        )
+
+    def get_columns(self, is_pre_encoded: bool = False) -> Tuple[str, ...]:
+        return self.encoded_columns if is_pre_encoded else self.columns
+
+    def get_categorical_columns(self, is_pre_encoded: bool = False) -> Tuple[str, ...]:
+        return self.encoded_categorical_columns if is_pre_encoded else self.categorical_columns
+
+    def get_dtype_plan(self, is_pre_encoded: bool = False) -> Dict[str, str]:
+        """Mutable copy of the dtype plan, as `apply_dtype_plan` and the readers expect a dict."""
+        return dict(self.encoded_dtype_plan if is_pre_encoded else self.dtype_plan)
+
+    def get_column_specs(self, is_pre_encoded: bool = False) -> Mapping:
+        return self.encoded_column_specs if is_pre_encoded else self.column_specs
+
+
+# file path -> (mtime_ns, sha256, compiled schema)
+_SCHEMA_CACHE: Dict[str, Tuple[int, str, CompiledSchema]] = {}
+_SCHEMA_CACHE_LOCK = threading.Lock()
+
+
+def load_schema(file_path: Optional[str] = None) -> CompiledSchema:
+    """
+    Compiled schema of `file_path` (default: the project schema, else the packaged one), parsed once per
+    process. A changed mtime triggers a content hash; the file is parsed again only when the hash differs.
+    """
+    try:
+        file_path = os.path.abspath(file_path or get_schema_file_path())
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        with _SCHEMA_CACHE_LOCK:
+            cached = _SCHEMA_CACHE.get(file_path)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[2]
+
+            with open(file_path, "rb") as schema_file:
+                content = schema_file.read()
+            sha256 = hashlib.sha256(content).hexdigest()
+            if cached is not None and cached[1] == sha256:
+                schema = cached[2]
+            else:
+                schema = CompiledSchema.from_config(yaml.safe_load(content), file_path=file_path, sha256=sha256)
+                logging.info(f"Compiled schema {file_path} ({sha256[:12]})")
+            _SCHEMA_CACHE[file_path] = (mtime_ns, sha256, schema)
+            return schema
+    except Exception as e:
+        raise MyException(e, sys) from e
@@ -0,0 +1,110 @@
+import os
+import shutil
+import sys
+import time
+from typing import Dict, Optional
+
+from ..exception import MyException
+from ..logger import logging
+
+COMPLETE_MARKER = ".complete"
+
+
+class ArtifactCache:
+    """
+    Local cache of artifact files keyed by a fingerprint, bounded in size with LRU eviction.
+    Every entry is a directory named after its key; the directory mtime records its last use.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int, name: str = "cache"):
+        """
+        :param cache_dir: directory shared by all runs that use this cache
+        :param max_bytes: total size above which the least recently used entries are evicted
+        :param name: label used in log lines
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.name = name
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    @staticmethod
+    def _dir_size(dir_path: str) -> int:
+        return sum(
+            os.path.getsize(os.path.join(root, file_name))
+            for root, _, file_names in os.walk(dir_path) for file_name in file_names
+        )
+
+    @staticmethod
+    def link_or_copy(src: str, dst: str) -> None:
+        """Hard-links `src` to `dst` when both are on the same filesystem, copies otherwise."""
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        if os.path.exists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the entry directory for `key` and marks it as recently used, or None on a miss.
+        """
+        try:
+            entry_dir = self._entry_dir(key)
+            if not os.path.exists(os.path.join(entry_dir, COMPLETE_MARKER)):
+                logging.info(f"[{self.name}] miss for {key}")
+                return None
+            now = time.time()
+            os.utime(entry_dir, (now, now))
+            logging.info(f"[{self.name}] hit for {key}")
+            return entry_dir
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def put(self, key: str, files: Dict[str, str]) -> str:
+        """
+        Stores `files` (entry file name -> source path) under `key`, then evicts old entries.
+        The entry only becomes visible once all files are in place.
+        """
+        try:
+            entry_dir = self._entry_dir(key)
+            tmp_dir = os.path.join(self.cache_dir, f".{key}.{os.getpid()}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            for file_name, src in files.items():
+                self.link_or_copy(src, os.path.join(tmp_dir, file_name))
+            open(os.path.join(tmp_dir, COMPLETE_MARKER), "w").close()
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+            logging.info(f"[{self.name}] stored {key} ({self._dir_size(entry_dir) / 2 ** 20:.1f} MB)")
+            self.evict(keep=key)
+            return entry_dir
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Removes least recently used entries until the cache fits in `max_bytes`; `keep` is never removed.
+        """
+        try:
+            entries = []
+            for key in os.listdir(self.cache_dir):
+                entry_dir = self._entry_dir(key)
+                if key.startswith(".") or not os.path.isdir(entry_dir):
+                    continue
+                entries.append((os.path.getmtime(entry_dir), key, self._dir_size(entry_dir)))
+
+            total_bytes = sum(size for _, _, size in entries)
+            for _, key, size in sorted(entries):
+                if total_bytes <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+                total_bytes -= size
+                logging.info(f"[{self.name}] evicted {key} ({size / 2 ** 20:.1f} MB)")
+        except Exception as e:
+            raise MyException(e, sys) from e
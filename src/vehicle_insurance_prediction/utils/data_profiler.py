@@ -0,0 +1,130 @@
+import sys
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from ..constants.training_pipeline import GENDER_COLUMN, GENDER_MAPPING, DUMMY_COLUMNS
+from ..exception import MyException
+
+# number of most frequent values listed per categorical column in the report
+REPORTED_CATEGORIES = 20
+
+
+def build_column_specs(schema_config: dict, is_pre_encoded: bool = False) -> Dict[str, dict]:
+    """
+    Expectations per schema column used by `DataProfiler`: whether values must be numeric, whether the
+    column is categorical, and its allowed `range` or `categories` from the schema.
+    For pre-encoded data the one-hot encoded sources are replaced by their 0/1 dummy columns and the
+    gender by its codes.
+    """
+    categorical_columns = set(schema_config.get("categorical_columns", []))
+    categorical_columns.add(schema_config.get("target_column"))
+    specs = {}
+    for column in schema_config["columns"]:
+        specs[column["name"]] = {
+            "numeric": column["dtype"] != "object",
+            "categorical": column["name"] in categorical_columns,
+            "range": column.get("range"),
+            "categories": column.get("categories"),
+        }
+    if is_pre_encoded:
+        for source, _ in DUMMY_COLUMNS.values():
+            specs.pop(source, None)
+        specs[GENDER_COLUMN] = {"numeric": True, "categorical": True, "range": None,
+                                "categories": sorted(GENDER_MAPPING.values())}
+        for column in DUMMY_COLUMNS:
+            specs[column] = {"numeric": True, "categorical": True, "range": None, "categories": [0, 1]}
+    return specs
+
+
+class DataProfiler:
+    """
+    Single-pass profile of a dataset fed chunk by chunk: per column null rate, dtype conformance,
+    min/max/mean of numeric values, category frequencies and values outside the allowed range or
+    category set. Every statistic is a running sum, so memory does not grow with the number of rows.
+    """
+    def __init__(self, column_specs: Dict[str, dict]):
+        self.column_specs = column_specs
+        self.n_rows = 0
+        self.seen_columns = set()
+        self._stats = {
+            column: {"nulls": 0, "dtype_mismatches": 0, "out_of_range": 0, "count": 0, "sum": 0.0,
+                     "min": None, "max": None, "categories": Counter()}
+            for column in column_specs
+        }
+
+    def update(self, chunk: DataFrame) -> None:
+        try:
+            self.n_rows += len(chunk)
+            for column, spec in self.column_specs.items():
+                if column not in chunk.columns:
+                    continue
+                self.seen_columns.add(column)
+                stats = self._stats[column]
+                series = chunk[column]
+                nulls = series.isna().to_numpy()
+                stats["nulls"] += int(nulls.sum())
+
+                if spec["numeric"]:
+                    values = series if pd.api.types.is_numeric_dtype(series) else pd.to_numeric(
+                        series.astype("object"), errors="coerce")
+                    values = values.to_numpy(dtype="float64", na_value=np.nan)
+                    valid = ~np.isnan(values)
+                    stats["dtype_mismatches"] += int((~valid & ~nulls).sum())
+                    values = values[valid]
+                    if len(values):
+                        stats["count"] += len(values)
+                        stats["sum"] += float(values.sum())
+                        chunk_min, chunk_max = float(values.min()), float(values.max())
+                        stats["min"] = chunk_min if stats["min"] is None else min(stats["min"], chunk_min)
+                        stats["max"] = chunk_max if stats["max"] is None else max(stats["max"], chunk_max)
+                        if spec["range"] is not None:
+                            low, high = spec["range"]
+                            stats["out_of_range"] += int(((values < low) | (values > high)).sum())
+
+                if spec["categorical"]:
+                    counts = series.value_counts(dropna=True)
+                    counts = counts[counts > 0]
+                    stats["categories"].update({value.item() if hasattr(value, "item") else value: int(n)
+                                                for value, n in counts.items()})
+                    if spec["categories"] is not None:
+                        stats["out_of_range"] += int(counts[~counts.index.isin(spec["categories"])].sum())
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def result(self) -> dict:
+        """Profile of everything seen so far, as a JSON serializable dict."""
+        columns = {}
+        for column, stats in self._stats.items():
+            n_rows = max(self.n_rows, 1)
+            profile = {
+                "present": column in self.seen_columns,
+                "null_rate": round(stats["nulls"] / n_rows, 6),
+                "dtype_mismatch_rate": round(stats["dtype_mismatches"] / n_rows, 6),
+                "out_of_range_rate": round(stats["out_of_range"] / n_rows, 6),
+            }
+            if self.column_specs[column]["numeric"]:
+                profile["min"] = stats["min"]
+                profile["max"] = stats["max"]
+                profile["mean"] = stats["sum"] / stats["count"] if stats["count"] else None
+            if self.column_specs[column]["categorical"]:
+                profile["n_categories"] = len(stats["categories"])
+                profile["categories"] = {str(value): n for value, n in stats["categories"].most_common(REPORTED_CATEGORIES)}
+            columns[column] = profile
+        return {"n_rows": self.n_rows, "columns": columns}
+
+    def check(self, max_null_rate: float, max_dtype_mismatch_rate: float, max_out_of_range_rate: float) -> List[str]:
+        """Messages for every column whose profile breaks one of the thresholds."""
+        violations = []
+        for column, profile in self.result()["columns"].items():
+            if not profile["present"]:
+                violations.append(f"{column}: missing")
+                continue
+            for name, limit in (("null_rate", max_null_rate), ("dtype_mismatch_rate", max_dtype_mismatch_rate),
+                                ("out_of_range_rate", max_out_of_range_rate)):
+                if profile[name] > limit:
+                    violations.append(f"{column}: {name} {profile[name]:.4%} above {limit:.4%}")
+        return violations
@@ -0,0 +1,257 @@
+import json
+import math
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from .main_utils import iter_dataframe_chunks
+from ..constants.training_pipeline import ARTIFACT_CHUNK_SIZE
+from ..exception import MyException
+from ..logger import logging
+
+# accuracy of the numeric quantile sketches: the rank error is about 1.7 / k, memory about 3 * k values per column
+DRIFT_SKETCH_K = 200
+# equal-mass bins of the reference distribution the PSI of a numeric column is computed over
+DRIFT_PSI_BINS = 10
+# floor of bin / category shares, so empty bins do not make the PSI infinite
+PSI_EPSILON = 1e-4
+
+
+def _category_key(value) -> str:
+    # an int column holding NaN arrives as float, 1.0 and 1 must share a key
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _psi(actual: np.ndarray, expected: np.ndarray) -> float:
+    actual = np.clip(actual / max(actual.sum(), 1), PSI_EPSILON, None)
+    expected = np.clip(expected / max(expected.sum(), 1), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class KllSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty) of a stream of numbers. An item at level h stands for
+    2**h values; a level over its capacity is sorted and every other item, from a random offset, moves up
+    one level. Memory stays about 3 * k items whatever the number of values, and two sketches merge by
+    concatenating their levels, so chunk sketches built in parallel combine into the sketch of all the data.
+    """
+    def __init__(self, k: int = DRIFT_SKETCH_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        return max(2, int(math.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1))))
+
+    def _compress(self) -> None:
+        while sum(map(len, self.levels)) > sum(self._capacity(level) for level in range(len(self.levels))):
+            level = next(level for level, items in enumerate(self.levels) if len(items) > self._capacity(level))
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # an odd item stays behind, so the total weight stays exactly n
+            kept, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+            self.levels[level] = kept
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[self._rng.integers(2)::2]])
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+
+    def merge(self, other: "KllSketch") -> "KllSketch":
+        self.levels += [np.empty(0)] * (len(other.levels) - len(self.levels))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _sorted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def cdf(self, points: np.ndarray) -> np.ndarray:
+        """Estimated share of the values <= each of `points`."""
+        items, cumulative = self._sorted_items()
+        cumulative = np.concatenate([[0.0], cumulative])
+        return cumulative[np.searchsorted(items, points, side="right")] / max(cumulative[-1], 1.0)
+
+    def quantiles(self, fractions: np.ndarray) -> np.ndarray:
+        items, cumulative = self._sorted_items()
+        if not len(items):
+            return np.full(len(fractions), np.nan)
+        ranks = np.asarray(fractions, dtype=np.float64) * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)]
+
+    def values(self) -> np.ndarray:
+        return np.concatenate(self.levels)
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "n": self.n, "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, content: dict) -> "KllSketch":
+        sketch = cls(content["k"])
+        sketch.n = content["n"]
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in content["levels"]] or [np.empty(0)]
+        return sketch
+
+
+class DriftSketch:
+    """
+    Mergeable summary of a dataset for drift detection: a KLL quantile sketch of every numeric column and a
+    frequency table of every categorical column. Chunk sketches merge, so they can be built in parallel, and
+    the sketch of the production training data can be compared with a new one without reloading either dataset.
+    Category counts merge exactly; numeric quantiles are estimates with a rank error of about 1.7 / k.
+    """
+    def __init__(self, column_specs: Dict[str, dict], k: int = DRIFT_SKETCH_K):
+        self.n_rows = 0
+        self.numeric: Dict[str, KllSketch] = {}
+        self.frequencies: Dict[str, Counter] = {}
+        for column, spec in column_specs.items():
+            if spec["categorical"]:
+                self.frequencies[column] = Counter()
+            elif spec["numeric"]:
+                self.numeric[column] = KllSketch(k)
+
+    @classmethod
+    def from_chunk(cls, column_specs: Dict[str, dict], chunk: DataFrame, k: int = DRIFT_SKETCH_K) -> "DriftSketch":
+        sketch = cls(column_specs, k)
+        sketch.update(chunk)
+        return sketch
+
+    def update(self, chunk: DataFrame) -> None:
+        try:
+            self.n_rows += len(chunk)
+            for column, quantile_sketch in self.numeric.items():
+                if column not in chunk.columns:
+                    continue
+                quantile_sketch.update(pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype="float64",
+                                                                                              na_value=np.nan))
+            for column, frequencies in self.frequencies.items():
+                if column not in chunk.columns:
+                    continue
+                for value, n in chunk[column].value_counts(dropna=True).items():
+                    if n:
+                        frequencies[_category_key(value)] += int(n)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def merge(self, other: "DriftSketch") -> "DriftSketch":
+        self.n_rows += other.n_rows
+        for column, quantile_sketch in other.numeric.items():
+            if column not in self.numeric:
+                self.numeric[column] = KllSketch(quantile_sketch.k)
+            self.numeric[column].merge(quantile_sketch)
+        for column, frequencies in other.frequencies.items():
+            self.frequencies.setdefault(column, Counter()).update(frequencies)
+        return self
+
+    def drift(self, reference: "DriftSketch") -> Dict[str, dict]:
+        """
+        Drift of this sketch against `reference` per shared column: population stability index for every
+        column, over `DRIFT_PSI_BINS` equal-mass bins of the reference for numeric columns, and for numeric
+        columns the Kolmogorov-Smirnov distance of the two estimated distributions.
+        """
+        scores = {}
+        for column, quantile_sketch in self.numeric.items():
+            if column not in reference.numeric:
+                continue
+            expected_sketch = reference.numeric[column]
+            if not quantile_sketch.n or not expected_sketch.n:
+                scores[column] = {"psi": None, "ks": None, "comparable": False}
+                continue
+            edges = np.unique(expected_sketch.quantiles(np.linspace(0, 1, DRIFT_PSI_BINS + 1)[1:-1]))
+            actual = np.diff(np.concatenate([[0.0], quantile_sketch.cdf(edges), [1.0]]))
+            expected = np.diff(np.concatenate([[0.0], expected_sketch.cdf(edges), [1.0]]))
+            points = np.concatenate([quantile_sketch.values(), expected_sketch.values()])
+            ks = np.abs(quantile_sketch.cdf(points) - expected_sketch.cdf(points)).max()
+            scores[column] = {"psi": round(_psi(actual, expected), 6), "ks": round(float(ks), 6), "comparable": True}
+        for column, frequencies in self.frequencies.items():
+            if column not in reference.frequencies:
+                continue
+            categories = sorted(set(frequencies) | set(reference.frequencies[column]))
+            actual = np.array([frequencies[category] for category in categories], dtype=np.float64)
+            expected = np.array([reference.frequencies[column][category] for category in categories], dtype=np.float64)
+            scores[column] = {"psi": round(_psi(actual, expected), 6), "ks": None, "comparable": True}
+        return scores
+
+    def to_dict(self) -> dict:
+        return {
+            "n_rows": self.n_rows,
+            "numeric": {column: quantile_sketch.to_dict() for column, quantile_sketch in self.numeric.items()},
+            "categorical": {column: dict(frequencies) for column, frequencies in self.frequencies.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, content: dict) -> "DriftSketch":
+        sketch = cls({})
+        sketch.n_rows = content["n_rows"]
+        for column, quantile_sketch in content["numeric"].items():
+            if "levels" not in quantile_sketch:
+                # fixed-range histograms of older sketches cannot be compared with quantile sketches
+                logging.warning(f"Drift sketch of {column} has an old format, its numeric drift is not scored")
+                continue
+            sketch.numeric[column] = KllSketch.from_dict(quantile_sketch)
+        for column, frequencies in content["categorical"].items():
+            sketch.frequencies[column] = Counter(frequencies)
+        return sketch
+
+    def save(self, file_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            tmp_file_path = os.path.join(os.path.dirname(file_path), "." + os.path.basename(file_path))
+            with open(tmp_file_path, "w") as sketch_file:
+                json.dump(self.to_dict(), sketch_file)
+            os.replace(tmp_file_path, file_path)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional["DriftSketch"]:
+        """Sketch stored at `file_path`, or None when there is none."""
+        try:
+            if not os.path.exists(file_path):
+                return None
+            with open(file_path) as sketch_file:
+                return cls.from_dict(json.load(sketch_file))
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+def build_drift_sketch(file_path: str, column_specs: Dict[str, dict], chunk_size: int = ARTIFACT_CHUNK_SIZE,
+                       n_workers: int = 4) -> DriftSketch:
+    """
+    Streams a csv, parquet or feather file into a DriftSketch. Chunks are sketched on `n_workers`
+    threads while the next ones are read, and the chunk sketches are merged as they complete.
+    """
+    try:
+        sketch = DriftSketch(column_specs)
+        pending = []
+        with ThreadPoolExecutor(max_workers=max(1, n_workers)) as executor:
+            for chunk in iter_dataframe_chunks(file_path, chunk_size=chunk_size):
+                pending.append(executor.submit(DriftSketch.from_chunk, column_specs, chunk))
+                # bound the chunks held in memory to two per worker
+                if len(pending) >= 2 * max(1, n_workers):
+                    sketch.merge(pending.pop(0).result())
+            for future in pending:
+                sketch.merge(future.result())
+        logging.info(f"Built drift sketch of {sketch.n_rows} rows from {file_path}")
+        return sketch
+    except Exception as e:
+        raise MyException(e, sys) from e
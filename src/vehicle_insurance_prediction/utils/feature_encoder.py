@@ -0,0 +1,94 @@
+import sys
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.pipeline import Pipeline
+
+from ..constants.training_pipeline import GENDER_COLUMN, GENDER_MAPPING, DUMMY_COLUMNS
+from ..exception import MyException
+
+
+class RawFeatureEncoder(BaseEstimator, TransformerMixin):
+    """
+    Encodes raw records in one pass: gender mapped to its code, one-hot dummies from fixed vocabularies
+    and dropped columns left out, written column by column into one preallocated float array.
+
+    The output layout is fixed at fit time: the input columns that are neither dropped nor one-hot
+    encoded, in input order, then the dummy columns. It is the layout of `pd.get_dummies(drop_first=True)`
+    on complete data, but does not depend on which categories a batch contains.
+    Already encoded input (gender codes, dummy columns) passes through unchanged, so the same encoder
+    serves raw records and pre-encoded files.
+    """
+    def __init__(self, gender_mapping: Optional[Dict[str, int]] = None,
+                 dummy_columns: Optional[Dict[str, Tuple[str, str]]] = None,
+                 drop_columns: Sequence[str] = ()):
+        self.gender_mapping = gender_mapping
+        self.dummy_columns = dummy_columns
+        self.drop_columns = drop_columns
+
+    def _vocabularies(self) -> Tuple[Dict[str, int], Dict[str, Tuple[str, str]]]:
+        return (GENDER_MAPPING if self.gender_mapping is None else self.gender_mapping,
+                DUMMY_COLUMNS if self.dummy_columns is None else self.dummy_columns)
+
+    def fit(self, X: DataFrame, y=None):
+        try:
+            gender_mapping, dummy_columns = self._vocabularies()
+            encoded_sources = {source for source, _ in dummy_columns.values()}
+            skipped = set(self.drop_columns) | encoded_sources | set(dummy_columns)
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+            self.n_features_in_ = len(self.feature_names_in_)
+            passthrough = [column for column in X.columns if column not in skipped]
+            self.feature_names_out_ = np.asarray(passthrough + list(dummy_columns), dtype=object)
+            self.gender_categories_ = np.asarray(list(gender_mapping), dtype=object)
+            self.gender_codes_ = np.asarray(list(gender_mapping.values()), dtype=np.float64)
+            return self
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _encode_gender(self, series: pd.Series) -> np.ndarray:
+        if pd.api.types.is_numeric_dtype(series):
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        codes = pd.Categorical(series, categories=self.gender_categories_).codes
+        unknown_mask = (codes < 0) & series.notna().to_numpy()
+        if unknown_mask.any():
+            unknown = sorted(set(series[unknown_mask].astype(str)))
+            raise ValueError(f"Unknown {GENDER_COLUMN} values {unknown}, expected {list(self.gender_categories_)}")
+        # missing values stay NaN like in the other columns; the preprocessing pipeline's imputer fills them
+        return np.where(codes >= 0, self.gender_codes_[codes], np.nan)
+
+    def transform(self, X: DataFrame) -> DataFrame:
+        try:
+            _, dummy_columns = self._vocabularies()
+            out = np.empty((len(X), len(self.feature_names_out_)), dtype=np.float64)
+            for i, column in enumerate(self.feature_names_out_):
+                if column == GENDER_COLUMN:
+                    out[:, i] = self._encode_gender(X[column])
+                elif column in dummy_columns and column not in X.columns:
+                    source, value = dummy_columns[column]
+                    out[:, i] = (X[source] == value).to_numpy(dtype=np.float64)
+                else:
+                    out[:, i] = X[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            # the frame wraps the array without copying, the scalers downstream select columns by name
+            return DataFrame(out, columns=list(self.feature_names_out_), index=X.index, copy=False)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return self.feature_names_out_.copy()
+
+
+def accepts_raw_records(model) -> bool:
+    """
+    True when the preprocessing of a MyModel starts with a RawFeatureEncoder. Models saved before the
+    encoder was part of the preprocessing pipeline expect already encoded features.
+    """
+    preprocessing_object = getattr(model, "preprocessing_object", None)
+    return isinstance(preprocessing_object, Pipeline) and isinstance(preprocessing_object.steps[0][1], RawFeatureEncoder)
+
+
+def encode_raw_features(dataframe: DataFrame, drop_columns: Sequence[str] = ()) -> DataFrame:
+    """Encoded feature frame of raw (or pre-encoded) records, as the pre-encoder pipelines expect it."""
+    return RawFeatureEncoder(drop_columns=drop_columns).fit_transform(dataframe)
@@ -0,0 +1,152 @@
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.metrics import get_scorer
+
+from .main_utils import load_feature_target_arrays
+from .model_backends import get_model_backend
+from ..exception import MyException
+from ..logger import logging
+
+# memory-mapped search arrays of a worker, opened once per process
+_worker_arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def _init_worker(features_file_path: str, target_file_path: str) -> None:
+    global _worker_arrays
+    _worker_arrays = load_feature_target_arrays(features_file_path, target_file_path, mmap_mode="r")
+
+
+def _run_trial(model_class: str, params: dict, n_jobs: int, train_rows: np.ndarray, validation_rows: np.ndarray,
+               scoring: str) -> Tuple[float, float]:
+    x, y = _worker_arrays
+    backend = get_model_backend(model_class)
+    model = backend.build(params, n_jobs)
+    started = time.perf_counter()
+    backend.fit(model, x[train_rows], y[train_rows], n_jobs)
+    fit_seconds = time.perf_counter() - started
+    return float(get_scorer(scoring)(model, x[validation_rows], y[validation_rows])), fit_seconds
+
+
+def sample_params(search_space: Dict[str, dict], rng: np.random.Generator) -> dict:
+    """
+    Draws one configuration from a search space of
+    `{type: int, low, high, step, log}`, `{type: float, low, high, log}` and `{type: choice, values}` entries.
+    """
+    params = {}
+    for name, spec in search_space.items():
+        kind = spec["type"]
+        if kind == "choice":
+            params[name] = spec["values"][rng.integers(len(spec["values"]))]
+        elif kind in ("int", "float"):
+            low, high = spec["low"], spec["high"]
+            if spec.get("log", False):
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            else:
+                value = rng.uniform(low, high)
+            if kind == "int":
+                step = spec.get("step", 1)
+                value = min(high, low + step * int(round((value - low) / step)))
+            params[name] = int(value) if kind == "int" else float(value)
+        else:
+            raise ValueError(f"Unknown search space type {kind!r} for {name}")
+    return params
+
+
+class SuccessiveHalvingSearch:
+    """
+    Successive-halving search: `n_trials` sampled configurations are trained on `min_rows` training rows,
+    the best 1/`reduction_factor` of them move on to `reduction_factor` times more rows, and the rest are
+    stopped, until one configuration is left or the rows run out.
+
+    Trials of a rung run in parallel on a process pool. Workers open the arrays memory-mapped, so they
+    share the page cache instead of holding a copy each, and receive only row indices.
+    Every trial is scored on the same stratified `validation_fraction` of the rows, which no trial trains on.
+    The arrays must not be resampled: validation rows would otherwise include synthetic samples and the
+    balanced class ratio instead of the data the model will see.
+    """
+    def __init__(self, model_class: str, params: dict, search_space: Dict[str, dict], n_trials: int = 27,
+                 reduction_factor: int = 3, min_rows: int = 20_000, max_rows: Optional[int] = None,
+                 validation_fraction: float = 0.2, scoring: str = "f1", n_workers: int = 1, n_jobs: int = 1,
+                 random_state: int = 42):
+        get_model_backend(model_class)
+        self.model_class = model_class
+        self.params = params
+        self.search_space = search_space
+        self.n_trials = n_trials
+        self.reduction_factor = reduction_factor
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.validation_fraction = validation_fraction
+        self.scoring = scoring
+        self.n_workers = n_workers
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def _split_rows(self, y: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Stratified validation rows and a shuffled order of the remaining rows."""
+        validation_rows, train_rows = [], []
+        for label in np.unique(y):
+            rows = rng.permutation(np.flatnonzero(y == label))
+            n_validation = max(1, int(round(len(rows) * self.validation_fraction)))
+            validation_rows.append(rows[:n_validation])
+            train_rows.append(rows[n_validation:])
+        # rungs train on growing prefixes of one permutation, so every rung's rows contain the previous ones
+        return np.sort(np.concatenate(validation_rows)), rng.permutation(np.concatenate(train_rows))
+
+    def search(self, features_file_path: str, target_file_path: str = "") -> Tuple[dict, List[dict]]:
+        """
+        Runs the search on unresampled transformed training arrays.
+        An empty target path means the target is the last column of the features array.
+        Returns the best parameters (fixed parameters included) and the history of every trial and rung.
+        """
+        try:
+            rng = np.random.default_rng(self.random_state)
+            _, y = load_feature_target_arrays(features_file_path, target_file_path, mmap_mode="r")
+            validation_rows, train_order = self._split_rows(np.asarray(y), rng)
+            max_rows = len(train_order) if self.max_rows is None else min(self.max_rows, len(train_order))
+            trials = {trial_id: {**self.params, **sample_params(self.search_space, rng)}
+                      for trial_id in range(self.n_trials)}
+            n_workers = max(1, min(self.n_workers, self.n_trials))
+            # a trial's threads share what the trial workers leave of the CPUs
+            trial_n_jobs = max(1, self.n_jobs // n_workers)
+            logging.info(f"Successive halving over {self.n_trials} trials on {n_workers} workers, "
+                         f"{len(validation_rows)} validation rows")
+
+            history, rung, n_rows = [], 0, min(self.min_rows, max_rows)
+            survivors = list(trials)
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(features_file_path, target_file_path)) as executor:
+                while True:
+                    train_rows = np.sort(train_order[:n_rows])
+                    futures = {trial_id: executor.submit(_run_trial, self.model_class, trials[trial_id], trial_n_jobs,
+                                                         train_rows, validation_rows, self.scoring)
+                               for trial_id in survivors}
+                    scores, rung_history = {}, {}
+                    for trial_id, future in futures.items():
+                        scores[trial_id], fit_seconds = future.result()
+                        rung_history[trial_id] = {"trial": trial_id, "rung": rung, "n_rows": int(n_rows),
+                                                  "params": trials[trial_id], "score": scores[trial_id],
+                                                  "fit_seconds": round(fit_seconds, 3)}
+                    ranked = sorted(survivors, key=lambda trial_id: scores[trial_id], reverse=True)
+                    logging.info(f"Rung {rung}: {len(survivors)} trials on {n_rows} rows, "
+                                 f"best {self.scoring} {scores[ranked[0]]:.4f}")
+                    done = len(ranked) == 1 or n_rows >= max_rows
+                    survivors = ranked[:1] if done else ranked[:max(1, len(ranked) // self.reduction_factor)]
+                    for trial_id in ranked:
+                        status = "best" if done else "promoted"
+                        rung_history[trial_id]["status"] = status if trial_id in survivors else "stopped"
+                        history.append(rung_history[trial_id])
+                    if done:
+                        break
+                    rung, n_rows = rung + 1, min(n_rows * self.reduction_factor, max_rows)
+
+            best_trial = survivors[0]
+            logging.info(f"Best trial {best_trial}: {trials[best_trial]}")
+            return trials[best_trial], history
+        except Exception as e:
+            raise MyException(e, sys) from e
@@ -1,11 +1,19 @@
+import hashlib
 import os
 import sys
 
 import numpy as np
+import pandas as pd
 import pickle
 import yaml
 from pandas import DataFrame
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from ..constants.training_pipeline import (
+    ARTIFACT_FILE_EXTENSIONS, ARTIFACT_CHUNK_SIZE, DATA_INGESTION_ARTIFACT_COMPRESSION,
+    SCHEMA_FILE_PATH, PACKAGED_SCHEMA_FILE_PATH, GENDER_COLUMN, DUMMY_COLUMNS,
+    MODEL_TRAINER_MODEL_CONFIG_FILE_PATH, PACKAGED_MODEL_CONFIG_FILE_PATH
+)
 from ..exception import MyException
 from ..logger import logging
 
@@ -44,34 +52,439 @@ def load_object(file_path: str) -> object:
     except Exception as e:
         raise MyException(e, sys) from e
 
-def save_numpy_array_data(file_path: str, array: np.array):
+def save_numpy_array_data(file_path: str, array: np.array, dtype: Optional[str] = None):
     """
     Save numpy array data to file
     file_path: str location of file to save
     array: np.array data to save
+    dtype: optional dtype the array is stored as, e.g. float32 features or an int8 target
     """
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
+        if dtype is not None:
+            array = np.asarray(array).astype(dtype, copy=False)
         with open(file_path, 'wb') as file_obj:
-            np.save(file_obj, array)
+            # C order, so a memory-mapped load hands estimators a contiguous block they do not copy
+            np.save(file_obj, np.ascontiguousarray(array))
     except Exception as e:
         raise MyException(e, sys) from e
 
 
-def load_numpy_array_data(file_path: str) -> np.array:
+def load_numpy_array_data(file_path: str, mmap_mode: Optional[str] = None) -> np.array:
     """
     load numpy array data from file
     file_path: str location of file to load
+    mmap_mode: optional np.load memory-map mode ("r" shares the page cache instead of allocating a copy)
     return: np.array data loaded
     """
     try:
-        with open(file_path, 'rb') as file_obj:
-            return np.load(file_obj)
+        return np.load(file_path, mmap_mode=mmap_mode)
     except Exception as e:
         raise MyException(e, sys) from e
 
 
+def load_feature_target_arrays(features_file_path: str, target_file_path: Optional[str] = None,
+                               mmap_mode: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Features and target of a transformed split. Without a target file the split is a legacy array with
+    the target glued on as its last column.
+    """
+    features = load_numpy_array_data(features_file_path, mmap_mode=mmap_mode)
+    if not target_file_path:
+        return features[:, :-1], features[:, -1]
+    return features, load_numpy_array_data(target_file_path, mmap_mode=mmap_mode)
+
+
+def file_sha256(file_path: str, block_size: int = 2 ** 20) -> str:
+    """
+    Hex sha256 of a file's content, read in blocks so large artifacts are never loaded whole.
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file_obj:
+            for block in iter(lambda: file_obj.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def _read_cgroup_file(file_path: str) -> Optional[str]:
+    try:
+        with open(file_path) as cgroup_file:
+            return cgroup_file.read().strip()
+    except OSError:
+        return None
+
+
+def get_available_cpus() -> int:
+    """
+    Number of CPUs this process may actually use: the smallest of its CPU affinity and the container's
+    CFS quota (cgroup v2 `cpu.max`, or v1 `cpu.cfs_quota_us` / `cpu.cfs_period_us`), rounded up.
+    `os.cpu_count()` reports the host's cores, which oversubscribes a CPU-limited container.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+        quota_period = None
+        cpu_max = _read_cgroup_file("/sys/fs/cgroup/cpu.max")
+        if cpu_max is not None:
+            quota, period = (cpu_max.split() + ["100000"])[:2]
+            if quota != "max":
+                quota_period = int(quota), int(period)
+        else:
+            quota = _read_cgroup_file("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+            period = _read_cgroup_file("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+            if quota is not None and period is not None and int(quota) > 0:
+                quota_period = int(quota), int(period)
+        if quota_period is not None and quota_period[1] > 0:
+            cpus = min(cpus, -(-quota_period[0] // quota_period[1]))
+        return max(1, cpus)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def get_schema_file_path() -> str:
+    """
+    Returns the project schema file if it exists, else the schema packaged with the library.
+    """
+    return SCHEMA_FILE_PATH if os.path.exists(SCHEMA_FILE_PATH) else PACKAGED_SCHEMA_FILE_PATH
+
+
+def get_model_config_file_path() -> str:
+    """
+    Returns the project model.yaml if it exists, else the model configuration packaged with the library.
+    """
+    if os.path.exists(MODEL_TRAINER_MODEL_CONFIG_FILE_PATH):
+        return MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
+    return PACKAGED_MODEL_CONFIG_FILE_PATH
+
+
+def get_dtype_plan(schema_config: dict) -> Dict[str, str]:
+    """
+    Derives the compact in-memory dtype of every schema column.
+    An explicit `compact_dtype` in the schema wins; otherwise object columns become categoricals,
+    int64 categorical/target columns (flags and codes) int8, other int64 columns int32 and
+    float64 columns float32.
+    Categoricals with `categories` in the schema get a fixed, sorted `pd.CategoricalDtype`, so every
+    batch of a file carries the same dictionary whatever values it happens to contain.
+    Integer feature columns may hold "na" and are planned as nullable integers ("Int16"), so their
+    dtype does not depend on whether a batch contains a missing value; the target stays non-nullable.
+    """
+    target_column = schema_config.get("target_column")
+    categorical_columns = set(schema_config.get("categorical_columns", []))
+    categorical_columns.add(schema_config.get("target_column"))
+    dtype_plan = {}
+    for column in schema_config.get("columns", []):
+        name, dtype = column["name"], column["dtype"]
+        if column.get("compact_dtype"):
+            dtype_plan[name] = column["compact_dtype"]
+        elif dtype == "object":
+            dtype_plan[name] = "category"
+        elif dtype.startswith("int"):
+            dtype_plan[name] = "int8" if name in categorical_columns else "int32"
+        elif dtype.startswith("float"):
+            dtype_plan[name] = "float32"
+        if dtype_plan.get(name) == "category" and column.get("categories"):
+            dtype_plan[name] = pd.CategoricalDtype(sorted(column["categories"]))
+        elif _is_integer_plan(dtype_plan.get(name)) and name != target_column:
+            dtype_plan[name] = dtype_plan[name].capitalize()
+    return dtype_plan
+
+
+def _is_integer_plan(dtype) -> bool:
+    """True for planned numpy ("int16") and nullable ("Int16") integer dtypes."""
+    return isinstance(dtype, str) and dtype.lower().startswith("int")
+
+
+def apply_dtype_plan(dataframe: DataFrame, dtype_plan: Dict[str, str]) -> DataFrame:
+    """
+    Casts the columns of `dataframe` that appear in `dtype_plan`.
+    Categories are kept sorted so dummy columns come out in the same order as for object columns;
+    values outside the fixed categories of a planned `pd.CategoricalDtype` become NaN and are logged.
+    Missing values in nullable integer columns become <NA>, in non-nullable ones they raise, as do
+    values outside the planned integer range.
+    """
+    try:
+        dataframe = dataframe.copy(deep=False)
+        for column, dtype in dtype_plan.items():
+            if column not in dataframe.columns:
+                continue
+            series = dataframe[column]
+            if isinstance(dtype, pd.CategoricalDtype):
+                # unordered categorical dtypes compare equal whatever their category order, so compare lists
+                is_categorical = isinstance(series.dtype, pd.CategoricalDtype)
+                if not is_categorical or list(series.cat.categories) != list(dtype.categories):
+                    cast = series.cat.set_categories(dtype.categories) if is_categorical else series.astype(dtype)
+                    unknown = int((cast.isna() & series.notna()).sum())
+                    if unknown:
+                        logging.warning(f"{unknown} values of '{column}' outside the schema categories "
+                                        f"{list(dtype.categories)} set to NaN")
+                    series = cast
+            elif dtype == "category":
+                if not isinstance(series.dtype, pd.CategoricalDtype):
+                    series = series.astype("category")
+                categories = sorted(series.cat.categories)
+                if list(series.cat.categories) != categories:
+                    series = series.cat.reorder_categories(categories)
+            elif _is_integer_plan(dtype):
+                series = pd.to_numeric(series, errors="coerce")
+                if dtype.islower() and series.isna().any():
+                    raise ValueError(f"Column '{column}' has missing values but is planned as non-nullable {dtype}")
+                limits = np.iinfo(dtype.lower())
+                if series.notna().any() and (series.min() < limits.min or series.max() > limits.max):
+                    raise ValueError(f"Column '{column}' has values outside the {dtype} range of the dtype plan")
+                series = series.astype(dtype)
+            else:
+                series = pd.to_numeric(series, errors="coerce").astype(dtype)
+            dataframe[column] = series
+        return dataframe
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def get_encoded_columns(schema_config: dict) -> List[str]:
+    """
+    Columns of pre-encoded data in the order the pandas encoders produce them: the schema columns
+    that are not one-hot encoded, then the dummy columns, then the target.
+    """
+    encoded_sources = {source for source, _ in DUMMY_COLUMNS.values()}
+    target_column = schema_config["target_column"]
+    columns = [column["name"] for column in schema_config["columns"]
+               if column["name"] not in encoded_sources and column["name"] != target_column]
+    return columns + list(DUMMY_COLUMNS) + [target_column]
+
+
+def get_encoded_dtype_plan(schema_config: dict) -> Dict[str, str]:
+    """
+    Compact dtypes of pre-encoded data: the raw plan with the gender code as nullable Int8 (the pushdown
+    nulls a missing gender) and the dummy flags, which are never null, as int8.
+    """
+    encoded_sources = {source for source, _ in DUMMY_COLUMNS.values()}
+    dtype_plan = {column: dtype for column, dtype in get_dtype_plan(schema_config).items() if column not in encoded_sources}
+    dtype_plan[GENDER_COLUMN] = "Int8"
+    dtype_plan.update({column: "int8" for column in DUMMY_COLUMNS})
+    return dtype_plan
+
+
+def dataframe_memory_mb(dataframe: DataFrame) -> float:
+    return dataframe.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def log_memory_usage(stage: str, dataframe: DataFrame, before_mb: float = None) -> None:
+    """
+    Logs the in-memory size of a DataFrame for a pipeline stage, with the size before the dtype plan if known.
+    """
+    after_mb = dataframe_memory_mb(dataframe)
+    if before_mb is None:
+        logging.info(f"[{stage}] memory usage: {after_mb:.1f} MB for {dataframe.shape}")
+    else:
+        logging.info(f"[{stage}] memory usage: {before_mb:.1f} MB -> {after_mb:.1f} MB for {dataframe.shape}")
+
+
+def get_file_format(file_path: str) -> str:
+    """
+    Returns the artifact format (csv, parquet or feather) of a file from its extension.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    for file_format, format_extension in ARTIFACT_FILE_EXTENSIONS.items():
+        if extension == format_extension:
+            return file_format
+    raise ValueError(f"Unsupported artifact file extension '{extension}' for {file_path}")
+
+
+def _csv_read_dtypes(dtype_plan: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    # integer columns may hold "na", they are cast after parsing by apply_dtype_plan
+    if not dtype_plan:
+        return None
+    return {column: dtype for column, dtype in dtype_plan.items() if not _is_integer_plan(dtype)}
+
+
+def read_dataframe(file_path: str, columns: Optional[List[str]] = None,
+                   dtype_plan: Optional[Dict[str, str]] = None) -> DataFrame:
+    """
+    Shared loader for every tabular artifact of the pipeline.
+    file_path: str location of a csv, parquet or feather file
+    columns: optional list of columns to read, columnar formats skip the others on disk
+    dtype_plan: optional compact dtypes (see get_dtype_plan) applied while loading
+    return: DataFrame with the requested columns in the requested order
+    """
+    try:
+        file_format = get_file_format(file_path)
+        if file_format == "parquet":
+            dataframe = pd.read_parquet(file_path, columns=columns)
+        elif file_format == "feather":
+            dataframe = pd.read_feather(file_path, columns=columns)
+        else:
+            dataframe = pd.read_csv(file_path, usecols=columns, dtype=_csv_read_dtypes(dtype_plan))
+        dataframe = dataframe[columns] if columns else dataframe
+        return apply_dtype_plan(dataframe, dtype_plan) if dtype_plan else dataframe
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def iter_dataframe_chunks(file_path: str, chunk_size: int = ARTIFACT_CHUNK_SIZE,
+                          columns: Optional[List[str]] = None,
+                          dtype_plan: Optional[Dict[str, str]] = None) -> Iterator[DataFrame]:
+    """
+    Streams a csv, parquet or feather file as DataFrames of about `chunk_size` rows.
+    Columnar files are read one row group / record batch at a time, which DataFrameWriter
+    keeps at ARTIFACT_CHUNK_SIZE rows.
+    """
+    try:
+        file_format = get_file_format(file_path)
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            chunks = (batch.to_pandas() for batch in
+                      pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size, columns=columns))
+        elif file_format == "feather":
+            import pyarrow as pa
+            reader = pa.ipc.open_file(pa.memory_map(file_path))
+            chunks = ((reader.get_batch(i).select(columns) if columns else reader.get_batch(i)).to_pandas()
+                      for i in range(reader.num_record_batches))
+        else:
+            chunks = (chunk[columns] if columns else chunk for chunk in
+                      pd.read_csv(file_path, usecols=columns, chunksize=chunk_size, dtype=_csv_read_dtypes(dtype_plan)))
+        for chunk in chunks:
+            yield apply_dtype_plan(chunk, dtype_plan) if dtype_plan else chunk
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def count_dataframe_rows(file_path: str) -> int:
+    """
+    Number of rows of a csv, parquet or feather file; columnar files answer from their metadata.
+    """
+    try:
+        file_format = get_file_format(file_path)
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(file_path).metadata.num_rows
+        if file_format == "feather":
+            import pyarrow as pa
+            reader = pa.ipc.open_file(pa.memory_map(file_path))
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        columns = read_dataframe_columns(file_path)[:1]
+        return sum(len(chunk) for chunk in pd.read_csv(file_path, usecols=columns, chunksize=ARTIFACT_CHUNK_SIZE))
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def read_dataframe_columns(file_path: str) -> List[str]:
+    """
+    Column names of a csv, parquet or feather file, read from the header or file metadata only.
+    """
+    try:
+        file_format = get_file_format(file_path)
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            return list(pq.read_schema(file_path).names)
+        if file_format == "feather":
+            import pyarrow as pa
+            return list(pa.ipc.open_file(pa.memory_map(file_path)).schema.names)
+        return list(pd.read_csv(file_path, nrows=0).columns)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def sample_dataframe(file_path: str, n_rows: int, columns: Optional[List[str]] = None) -> DataFrame:
+    """
+    Reads about `n_rows` rows of a csv, parquet or feather file without scanning the rest of it.
+    Columnar files contribute evenly spaced row groups / record batches, so the sample spans the
+    whole file; csv files can only be sampled from the top.
+    """
+    try:
+        file_format = get_file_format(file_path)
+        if file_format == "csv":
+            return pd.read_csv(file_path, usecols=columns, nrows=n_rows)
+        import pyarrow as pa
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            parquet_file = pq.ParquetFile(file_path)
+            group_rows = [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)]
+        else:
+            reader = pa.ipc.open_file(pa.memory_map(file_path))
+            group_rows = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+        if not group_rows:
+            return read_dataframe(file_path, columns=columns)
+
+        average_rows = max(1, sum(group_rows) // len(group_rows))
+        n_sampled = min(len(group_rows), max(1, -(-n_rows // average_rows)))
+        groups = np.unique(np.linspace(0, len(group_rows) - 1, n_sampled).astype(int)).tolist()
+        if file_format == "parquet":
+            table = parquet_file.read_row_groups(groups, columns=columns)
+        else:
+            table = pa.Table.from_batches([reader.get_batch(i) for i in groups])
+            table = table.select(columns) if columns else table
+        return table.slice(0, n_rows).to_pandas()
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def write_dataframe(file_path: str, dataframe: DataFrame) -> None:
+    """
+    Writes a DataFrame as csv, parquet or feather depending on the file extension.
+    """
+    with DataFrameWriter(file_path) as writer:
+        writer.write(dataframe)
+
+
+class DataFrameWriter:
+    """
+    Appends DataFrames to a single csv, parquet or feather file so large artifacts can be written
+    batch by batch. Columnar files are typed and compressed; the schema of the first batch is
+    enforced on every following one.
+    """
+    def __init__(self, file_path: str, file_format: str = None, compression: str = DATA_INGESTION_ARTIFACT_COMPRESSION,
+                 chunk_size: int = ARTIFACT_CHUNK_SIZE):
+        self.file_path = file_path
+        self.file_format = file_format or get_file_format(file_path)
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.n_rows = 0
+        self._writer = None
+        self._schema = None
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+
+    def write(self, dataframe: DataFrame) -> None:
+        try:
+            if dataframe.empty:
+                # an empty first batch would fix object columns to the null type in the file schema
+                return
+            if self.file_format == "csv":
+                dataframe.to_csv(self.file_path, mode="a" if self.n_rows else "w", index=False, header=not self.n_rows)
+            else:
+                import pyarrow as pa
+
+                table = pa.Table.from_pandas(dataframe, schema=self._schema, preserve_index=False)
+                if self._writer is None:
+                    self._schema = table.schema
+                    if self.file_format == "parquet":
+                        import pyarrow.parquet as pq
+                        self._writer = pq.ParquetWriter(self.file_path, table.schema, compression=self.compression)
+                    else:
+                        self._writer = pa.ipc.new_file(self.file_path, table.schema,
+                                                       options=pa.ipc.IpcWriteOptions(compression=self.compression))
+                if self.file_format == "parquet":
+                    self._writer.write_table(table, row_group_size=self.chunk_size)
+                else:
+                    self._writer.write_table(table, max_chunksize=self.chunk_size)
+            self.n_rows += len(dataframe)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 def save_object(file_path: str, obj: object) -> None:
     logging.info("Entered the save_object method of utils")
 
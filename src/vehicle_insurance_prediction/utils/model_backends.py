@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from typing import Dict, Type
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from threadpoolctl import threadpool_limits
+
+from ..constants.training_pipeline import (
+    MODEL_TRAINER_N_ESTIMATORS, MODEL_TRAINER_MIN_SAMPLES_SPLIT, MODEL_TRAINER_MIN_SAMPLES_LEAF,
+    MIN_SAMPLES_SPLIT_MAX_DEPTH, MIN_SAMPLES_SPLIT_CRITERION, MIN_SAMPLES_SPLIT_RANDOM_STATE,
+    MODEL_TRAINER_HGB_MAX_ITER, MODEL_TRAINER_HGB_LEARNING_RATE, MODEL_TRAINER_HGB_MAX_LEAF_NODES,
+    MODEL_TRAINER_HGB_EARLY_STOPPING, MODEL_TRAINER_HGB_N_ITER_NO_CHANGE, MODEL_TRAINER_HGB_VALIDATION_FRACTION
+)
+
+
+@dataclass(frozen=True)
+class ModelBackend:
+    """
+    An estimator ModelTrainer can train: its class, its default parameters and how its parallelism is set.
+    Estimators without an `n_jobs` parameter parallelise with OpenMP, whose thread count is limited around `fit`.
+    """
+    estimator_class: Type
+    default_params: Dict[str, object]
+    accepts_n_jobs: bool
+
+    def build(self, params: dict, n_jobs: int):
+        params = {**self.default_params, **params}
+        if self.accepts_n_jobs:
+            params["n_jobs"] = n_jobs
+        return self.estimator_class(**params)
+
+    def fit(self, model, x: np.ndarray, y: np.ndarray, n_jobs: int):
+        if self.accepts_n_jobs:
+            return model.fit(x, y)
+        with threadpool_limits(limits=n_jobs, user_api="openmp"):
+            return model.fit(x, y)
+
+    def for_serving(self, model):
+        """Resets the training worker count, so the saved model does not carry the training host's CPU count."""
+        if self.accepts_n_jobs:
+            model.set_params(n_jobs=None)
+        return model
+
+
+MODEL_BACKENDS: Dict[str, ModelBackend] = {
+    "RandomForestClassifier": ModelBackend(
+        estimator_class=RandomForestClassifier,
+        default_params={
+            "n_estimators": MODEL_TRAINER_N_ESTIMATORS,
+            "min_samples_split": MODEL_TRAINER_MIN_SAMPLES_SPLIT,
+            "min_samples_leaf": MODEL_TRAINER_MIN_SAMPLES_LEAF,
+            "max_depth": MIN_SAMPLES_SPLIT_MAX_DEPTH,
+            "criterion": MIN_SAMPLES_SPLIT_CRITERION,
+            "random_state": MIN_SAMPLES_SPLIT_RANDOM_STATE,
+        },
+        accepts_n_jobs=True,
+    ),
+    # bins the features into at most 255 values and stops adding trees once the held-out loss stalls
+    "HistGradientBoostingClassifier": ModelBackend(
+        estimator_class=HistGradientBoostingClassifier,
+        default_params={
+            "max_iter": MODEL_TRAINER_HGB_MAX_ITER,
+            "learning_rate": MODEL_TRAINER_HGB_LEARNING_RATE,
+            "max_leaf_nodes": MODEL_TRAINER_HGB_MAX_LEAF_NODES,
+            "early_stopping": MODEL_TRAINER_HGB_EARLY_STOPPING,
+            "n_iter_no_change": MODEL_TRAINER_HGB_N_ITER_NO_CHANGE,
+            "validation_fraction": MODEL_TRAINER_HGB_VALIDATION_FRACTION,
+            "random_state": MIN_SAMPLES_SPLIT_RANDOM_STATE,
+        },
+        accepts_n_jobs=False,
+    ),
+}
+
+
+def get_model_backend(model_class: str) -> ModelBackend:
+    if model_class not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model class {model_class!r}, expected one of {sorted(MODEL_BACKENDS)}")
+    return MODEL_BACKENDS[model_class]
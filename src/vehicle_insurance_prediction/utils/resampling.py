@@ -0,0 +1,95 @@
+import sys
+from typing import Optional, Tuple
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+from ..exception import MyException
+from ..logger import logging
+
+
+class ScalableResampler:
+    """
+    SMOTE oversampling of the minority class followed by edited-nearest-neighbours cleaning, the
+    combination SMOTEENN(sampling_strategy="minority") applies, built for large splits:
+
+    * neighbour queries run in chunks of `chunk_size` rows on `n_jobs` workers, so memory stays bounded
+    * `approximate=True` searches neighbours only within random blocks of `block_size` rows, which makes
+      both passes near-linear in the number of rows at the cost of slightly farther neighbours
+    * `max_synthetic_rows` caps the number of synthetic minority rows
+
+    Like imblearn, the cleaning drops every row whose `enn_neighbors` nearest neighbours do not all share its label.
+    """
+    def __init__(self, k_neighbors: int = 5, enn_neighbors: int = 3, n_jobs: int = -1, chunk_size: int = 100_000,
+                 approximate: bool = False, block_size: int = 50_000, max_synthetic_rows: Optional[int] = None,
+                 random_state: int = 42):
+        self.k_neighbors = k_neighbors
+        self.enn_neighbors = enn_neighbors
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.approximate = approximate
+        self.block_size = block_size
+        self.max_synthetic_rows = max_synthetic_rows
+        self.random_state = random_state
+
+    def _exact_self_neighbors(self, X: np.ndarray, k: int) -> np.ndarray:
+        nn = NearestNeighbors(n_neighbors=k + 1, n_jobs=self.n_jobs).fit(X)
+        neighbors = np.empty((len(X), k), dtype=np.int64)
+        for start in range(0, len(X), self.chunk_size):
+            stop = min(start + self.chunk_size, len(X))
+            # the first neighbour of a row is the row itself
+            neighbors[start:stop] = nn.kneighbors(X[start:stop], return_distance=False)[:, 1:]
+        return neighbors
+
+    def _self_neighbors(self, X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+        """Indices of the `k` nearest other rows of every row of X."""
+        if not self.approximate or len(X) <= self.block_size:
+            return self._exact_self_neighbors(X, k)
+        neighbors = np.empty((len(X), k), dtype=np.int64)
+        order = rng.permutation(len(X))
+        n_blocks = -(-len(X) // self.block_size)
+        for block in np.array_split(order, n_blocks):
+            neighbors[block] = block[self._exact_self_neighbors(X[block], min(k, len(block) - 1))]
+        return neighbors
+
+    def _oversample(self, X: np.ndarray, y: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        classes, counts = np.unique(y, return_counts=True)
+        minority = classes[np.argmin(counts)]
+        n_synthetic = int(counts.max() - counts.min())
+        if self.max_synthetic_rows is not None:
+            n_synthetic = min(n_synthetic, self.max_synthetic_rows)
+        X_minority = X[y == minority]
+        if n_synthetic <= 0 or len(X_minority) < 2:
+            return X, y
+
+        k = min(self.k_neighbors, len(X_minority) - 1)
+        neighbors = self._self_neighbors(X_minority, k, rng)
+        X_synthetic = np.empty((n_synthetic, X.shape[1]), dtype=X.dtype)
+        for start in range(0, n_synthetic, self.chunk_size):
+            stop = min(start + self.chunk_size, n_synthetic)
+            rows = rng.integers(0, len(X_minority), stop - start)
+            partners = neighbors[rows, rng.integers(0, k, stop - start)]
+            gaps = rng.random((stop - start, 1)).astype(X.dtype)
+            X_synthetic[start:stop] = X_minority[rows] + gaps * (X_minority[partners] - X_minority[rows])
+        logging.info(f"SMOTE: {n_synthetic} synthetic rows of class {minority} from {len(X_minority)} rows")
+        return np.concatenate([X, X_synthetic]), np.concatenate([y, np.full(n_synthetic, minority, dtype=y.dtype)])
+
+    def _clean(self, X: np.ndarray, y: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        if len(X) <= self.enn_neighbors:
+            return X, y
+        neighbors = self._self_neighbors(X, self.enn_neighbors, rng)
+        keep = np.ones(len(X), dtype=bool)
+        for start in range(0, len(X), self.chunk_size):
+            stop = min(start + self.chunk_size, len(X))
+            keep[start:stop] = (y[neighbors[start:stop]] == y[start:stop, None]).all(axis=1)
+        logging.info(f"ENN: dropped {int((~keep).sum())} of {len(X)} rows")
+        return X[keep], y[keep]
+
+    def fit_resample(self, X, y) -> Tuple[np.ndarray, np.ndarray]:
+        try:
+            rng = np.random.default_rng(self.random_state)
+            X, y = np.asarray(X), np.asarray(y)
+            X, y = self._oversample(X, y, rng)
+            return self._clean(X, y, rng)
+        except Exception as e:
+            raise MyException(e, sys) from e
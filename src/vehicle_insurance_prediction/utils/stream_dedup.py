@@ -0,0 +1,145 @@
+import os
+import sys
+from typing import List
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from ..exception import MyException
+from ..logger import logging
+
+# seen-hash runs are merged into one sorted array once there are more than this many
+MAX_HASH_RUNS = 8
+
+
+class StreamDeduplicator:
+    """
+    Drops rows whose key columns repeat a row already seen, batch by batch.
+
+    Every row is reduced to a 64-bit hash of its key columns. A Bloom filter answers "never seen"
+    for almost all new rows without touching the exact store; only Bloom positives are confirmed
+    against the sorted arrays of hashes kept so far, so a Bloom false positive alone never drops a row.
+    Rows are compared by hash, not by value: two different rows with the same 64-bit hash count as
+    duplicates and the later one is dropped (about n^2 / 2^65 expected collisions for n distinct rows).
+
+    Memory is not bounded: besides the fixed-size filter, 8 bytes per distinct row ever seen are kept
+    for the lifetime of the deduplicator, and in its saved state across runs.
+    """
+    def __init__(self, key_columns: List[str], expected_rows: int, false_positive_rate: float = 0.001,
+                 hash_key: str = "vehicle_ins_dup1"):
+        """
+        :param key_columns: columns that identify a record, e.g. all feature and target columns or just `id`
+        :param expected_rows: number of distinct rows the Bloom filter is sized for
+        :param false_positive_rate: Bloom filter false positive rate at `expected_rows`
+        :param hash_key: 16 character key of the row hash
+        """
+        self.key_columns = list(key_columns)
+        self.hash_key = hash_key
+        self.n_bits = max(64, int(-expected_rows * np.log(false_positive_rate) / np.log(2) ** 2))
+        self.n_hashes = max(1, int(round(self.n_bits / expected_rows * np.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+        self.hash_runs: List[np.ndarray] = []
+        self.n_rows_seen = 0
+        self.n_duplicates = 0
+
+    @property
+    def dedup_ratio(self) -> float:
+        return self.n_duplicates / self.n_rows_seen if self.n_rows_seen else 0.0
+
+    def _row_hashes(self, dataframe: DataFrame) -> np.ndarray:
+        keys = dataframe[self.key_columns].copy(deep=False)
+        for column in self.key_columns:
+            # the same value must hash the same whether it arrived as int, float or a compact dtype
+            if pd.api.types.is_numeric_dtype(keys[column]) and not pd.api.types.is_bool_dtype(keys[column]):
+                keys[column] = keys[column].to_numpy(dtype="float64", na_value=np.nan)
+        return pd.util.hash_pandas_object(keys, index=False, hash_key=self.hash_key).to_numpy(dtype=np.uint64)
+
+    def _bit_positions(self, hashes: np.ndarray) -> np.ndarray:
+        # double hashing: position_i = h1 + i * h2, with h1/h2 the halves of the 64-bit row hash
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.n_bits)
+
+    def _maybe_seen(self, positions: np.ndarray) -> np.ndarray:
+        bit_set = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return bit_set.all(axis=1)
+
+    def _is_seen(self, hashes: np.ndarray) -> np.ndarray:
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self.hash_runs:
+            idx = np.searchsorted(run, hashes)
+            seen |= run[np.minimum(idx, len(run) - 1)] == hashes
+        return seen
+
+    def _add(self, hashes: np.ndarray, positions: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        flat = positions.ravel()
+        np.bitwise_or.at(self.bits, flat >> np.uint64(3), np.left_shift(1, flat & np.uint64(7)).astype(np.uint8))
+        self.hash_runs.append(np.sort(hashes))
+        if len(self.hash_runs) > MAX_HASH_RUNS:
+            self.hash_runs = [np.sort(np.concatenate(self.hash_runs))]
+
+    def filter(self, dataframe: DataFrame) -> DataFrame:
+        """Returns `dataframe` without the rows already seen in this or any earlier batch."""
+        try:
+            if dataframe.empty:
+                return dataframe
+            hashes = self._row_hashes(dataframe)
+            duplicate = pd.Series(hashes).duplicated().to_numpy()
+            positions = self._bit_positions(hashes)
+            candidates = np.flatnonzero(self._maybe_seen(positions) & ~duplicate)
+            if len(candidates):
+                duplicate[candidates[self._is_seen(hashes[candidates])]] = True
+
+            keep = ~duplicate
+            self._add(hashes[keep], positions[keep])
+            self.n_rows_seen += len(dataframe)
+            self.n_duplicates += int(duplicate.sum())
+            return dataframe[keep] if duplicate.any() else dataframe
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def save(self, file_path: str) -> None:
+        """Persists the filter and the seen hashes, so a later run keeps deduplicating against them."""
+        try:
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            tmp_file_path = os.path.join(os.path.dirname(file_path), "." + os.path.basename(file_path))
+            hashes = np.sort(np.concatenate(self.hash_runs)) if self.hash_runs else np.empty(0, dtype=np.uint64)
+            with open(tmp_file_path, "wb") as state_file:
+                np.savez(state_file, bits=self.bits, hashes=hashes, n_hashes=self.n_hashes,
+                         n_bits=self.n_bits, key_columns=np.array(self.key_columns))
+            os.replace(tmp_file_path, file_path)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @classmethod
+    def load(cls, file_path: str, key_columns: List[str], expected_rows: int,
+             false_positive_rate: float = 0.001) -> "StreamDeduplicator":
+        """Restores the state written by `save`, or starts empty when there is none."""
+        try:
+            deduplicator = cls(key_columns, expected_rows, false_positive_rate)
+            if not os.path.exists(file_path):
+                return deduplicator
+            with np.load(file_path) as state:
+                if list(state["key_columns"]) != deduplicator.key_columns:
+                    raise ValueError(f"Dedup state in {file_path} is keyed on {list(state['key_columns'])}, "
+                                     f"expected {deduplicator.key_columns}.")
+                deduplicator.bits = state["bits"]
+                deduplicator.n_bits = int(state["n_bits"])
+                deduplicator.n_hashes = int(state["n_hashes"])
+                deduplicator.hash_runs = [state["hashes"]] if len(state["hashes"]) else []
+            logging.info(f"Loaded dedup state of {sum(len(run) for run in deduplicator.hash_runs)} rows from {file_path}")
+            return deduplicator
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def report(self) -> dict:
+        return {
+            "key_columns": self.key_columns,
+            "rows_seen": self.n_rows_seen,
+            "duplicates_dropped": self.n_duplicates,
+            "dedup_ratio": round(self.dedup_ratio, 6),
+        }
@@ -0,0 +1,68 @@
+"""
+The artifact cache must evict the least recently used entries once it grows past its size limit,
+count a hit as a use, and never evict the entry it has just stored.
+
+Usage:
+    python -m pytest tests
+"""
+import os
+
+from vehicle_insurance_prediction.utils.artifact_cache import ArtifactCache
+
+FILE_BYTES = 100
+
+
+def _source_file(tmp_path, name):
+    file_path = tmp_path / "sources" / name
+    file_path.parent.mkdir(exist_ok=True)
+    file_path.write_bytes(name.encode().ljust(FILE_BYTES, b"."))
+    return str(file_path)
+
+
+def _put(cache, tmp_path, key, mtime=None):
+    entry_dir = cache.put(key, {"data.bin": _source_file(tmp_path, key)})
+    if mtime is not None:
+        os.utime(entry_dir, (mtime, mtime))
+    return entry_dir
+
+
+def test_hit_returns_the_stored_files(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=10 * FILE_BYTES)
+    _put(cache, tmp_path, "a")
+
+    entry_dir = cache.get("a")
+
+    assert entry_dir is not None
+    with open(os.path.join(entry_dir, "data.bin"), "rb") as data_file:
+        assert data_file.read() == b"a".ljust(FILE_BYTES, b".")
+    assert cache.get("b") is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=2 * FILE_BYTES + FILE_BYTES // 2)
+    _put(cache, tmp_path, "a", mtime=1_000)
+    _put(cache, tmp_path, "b", mtime=2_000)
+
+    # reading "a" makes "b" the least recently used entry
+    assert cache.get("a") is not None
+    _put(cache, tmp_path, "c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_new_entry_is_kept_even_when_over_the_limit(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=FILE_BYTES // 2)
+    _put(cache, tmp_path, "a", mtime=1_000)
+    _put(cache, tmp_path, "b")
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_incomplete_entry_is_a_miss(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=10 * FILE_BYTES)
+    os.makedirs(os.path.join(cache.cache_dir, "a"))
+
+    assert cache.get("a") is None
@@ -0,0 +1,71 @@
+"""
+Fitting the preprocessor block by block must give the scalers the statistics of an in-memory fit on
+the whole train file, and the same transformed features.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from vehicle_insurance_prediction.components.data_transformation import DataTransformation
+from vehicle_insurance_prediction.constants.training_pipeline import TARGET_COLUMN
+from vehicle_insurance_prediction.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
+from vehicle_insurance_prediction.entity.config_entity import DataTransformationConfig, TrainingPipelineConfig
+
+N_ROWS = 10_000
+
+
+@pytest.fixture(scope="module")
+def train_file_path(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Gender": rng.choice(["Male", "Female"], N_ROWS),
+        "Age": rng.integers(20, 86, N_ROWS),
+        "Driving_License": rng.integers(0, 2, N_ROWS),
+        "Region_Code": rng.integers(0, 53, N_ROWS).astype(float),
+        "Previously_Insured": rng.integers(0, 2, N_ROWS),
+        "Vehicle_Age": rng.choice(["< 1 Year", "1-2 Year", "> 2 Years"], N_ROWS),
+        "Vehicle_Damage": rng.choice(["Yes", "No"], N_ROWS),
+        "Annual_Premium": rng.lognormal(10.3, 0.4, N_ROWS),
+        "Policy_Sales_Channel": rng.integers(1, 164, N_ROWS).astype(float),
+        "Vintage": rng.integers(10, 300, N_ROWS),
+        "Response": rng.integers(0, 2, N_ROWS),
+    })
+    # sorted so the first block is not representative of the whole file
+    df = df.sort_values("Annual_Premium", ignore_index=True)
+    file_path = tmp_path_factory.mktemp("ingested") / "train.csv"
+    df.to_csv(file_path, index=False)
+    return str(file_path)
+
+
+def _data_transformation(train_file_path, chunk_size):
+    config = DataTransformationConfig(TrainingPipelineConfig())
+    config.chunk_size = chunk_size
+    data_ingestion_artifact = DataIngestionArtifact(feature_store_file_path=train_file_path,
+                                                    trained_file_path=train_file_path, test_file_path=train_file_path)
+    data_validation_artifact = DataValidationArtifact(validation_status=True, message="",
+                                                      validation_report_file_path="")
+    return DataTransformation(data_ingestion_artifact, config, data_validation_artifact)
+
+
+def test_chunked_fit_matches_in_memory_fit(train_file_path):
+    in_memory = _data_transformation(train_file_path, chunk_size=N_ROWS)
+    in_memory_preprocessor = in_memory.get_data_transformer_object()
+    x_in_memory, _, _, _ = in_memory.transform_in_memory(in_memory_preprocessor)
+
+    chunked = _data_transformation(train_file_path, chunk_size=1_234)
+    chunked_preprocessor = chunked.fit_preprocessor_in_chunks(chunked.get_data_transformer_object())
+
+    expected = in_memory_preprocessor.named_steps["Preprocessor"].named_transformers_
+    actual = chunked_preprocessor.named_steps["Preprocessor"].named_transformers_
+    np.testing.assert_allclose(actual["StandardScaler"].mean_, expected["StandardScaler"].mean_, rtol=1e-9)
+    np.testing.assert_allclose(actual["StandardScaler"].var_, expected["StandardScaler"].var_, rtol=1e-9)
+    assert actual["StandardScaler"].n_samples_seen_ == expected["StandardScaler"].n_samples_seen_ == N_ROWS
+    np.testing.assert_array_equal(actual["MinMaxScaler"].data_min_, expected["MinMaxScaler"].data_min_)
+    np.testing.assert_array_equal(actual["MinMaxScaler"].data_max_, expected["MinMaxScaler"].data_max_)
+
+    train_df = chunked.read_data(train_file_path, columns=chunked._input_columns, dtype_plan=chunked._dtype_plan)
+    features = train_df.drop(columns=[TARGET_COLUMN])
+    np.testing.assert_allclose(chunked_preprocessor.transform(features), x_in_memory, rtol=1e-9, atol=1e-12)
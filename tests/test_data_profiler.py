@@ -0,0 +1,97 @@
+"""
+The single-pass profiler must give the same profile however the data is chunked, match the
+statistics pandas computes on the whole frame, and count nulls, dtype mismatches and values outside
+the schema range or categories.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
+from vehicle_insurance_prediction.utils.data_profiler import DataProfiler
+
+N_ROWS = 5_000
+
+
+@pytest.fixture(scope="module")
+def column_specs():
+    return load_schema().column_specs
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Gender": rng.choice(["Male", "Female"], N_ROWS),
+        "Age": rng.integers(18, 86, N_ROWS),
+        "Driving_License": rng.integers(0, 2, N_ROWS),
+        "Region_Code": rng.integers(0, 53, N_ROWS).astype(float),
+        "Previously_Insured": rng.integers(0, 2, N_ROWS),
+        "Vehicle_Age": rng.choice(["< 1 Year", "1-2 Year", "> 2 Years"], N_ROWS),
+        "Vehicle_Damage": rng.choice(["Yes", "No"], N_ROWS),
+        "Annual_Premium": rng.uniform(2_630, 100_000, N_ROWS),
+        "Policy_Sales_Channel": rng.integers(1, 164, N_ROWS).astype(float),
+        "Vintage": rng.integers(10, 300, N_ROWS),
+        "Response": rng.integers(0, 2, N_ROWS),
+    })
+    df.loc[:49, "Region_Code"] = np.nan
+    df["Age"] = df["Age"].astype(object)
+    df.loc[50:59, "Age"] = "abc"
+    df.loc[60:64, "Vintage"] = 400
+    df.loc[65:69, "Vehicle_Age"] = "> 5 Years"
+    return df
+
+
+def _profile(column_specs, chunks):
+    profiler = DataProfiler(column_specs)
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler
+
+
+def test_profile_does_not_depend_on_chunking(column_specs, frame):
+    whole = _profile(column_specs, [frame]).result()
+    chunked = _profile(column_specs, [frame.iloc[start:start + 777] for start in range(0, N_ROWS, 777)]).result()
+
+    assert chunked["n_rows"] == whole["n_rows"] == N_ROWS
+    for column, profile in whole["columns"].items():
+        for name, value in profile.items():
+            if name == "mean" and value is not None:
+                assert chunked["columns"][column][name] == pytest.approx(value)
+            else:
+                assert chunked["columns"][column][name] == value, (column, name)
+
+
+def test_statistics_match_pandas(column_specs, frame):
+    columns = _profile(column_specs, [frame]).result()["columns"]
+
+    premium = frame["Annual_Premium"]
+    assert columns["Annual_Premium"]["min"] == premium.min()
+    assert columns["Annual_Premium"]["max"] == premium.max()
+    assert columns["Annual_Premium"]["mean"] == pytest.approx(premium.mean())
+    assert columns["Region_Code"]["mean"] == pytest.approx(frame["Region_Code"].mean())
+    assert columns["Gender"]["categories"] == {value: int(n) for value, n in frame["Gender"].value_counts().items()}
+
+
+def test_counts_data_quality_problems(column_specs, frame):
+    columns = _profile(column_specs, [frame]).result()["columns"]
+
+    assert columns["Region_Code"]["null_rate"] == pytest.approx(50 / N_ROWS)
+    assert columns["Age"]["dtype_mismatch_rate"] == pytest.approx(10 / N_ROWS)
+    assert columns["Vintage"]["out_of_range_rate"] == pytest.approx(5 / N_ROWS)
+    assert columns["Vehicle_Age"]["out_of_range_rate"] == pytest.approx(5 / N_ROWS)
+    assert columns["Annual_Premium"]["null_rate"] == columns["Annual_Premium"]["out_of_range_rate"] == 0
+
+
+def test_check_reports_missing_columns_and_broken_thresholds(column_specs, frame):
+    profiler = _profile(column_specs, [frame.drop(columns=["Vintage"])])
+
+    violations = profiler.check(max_null_rate=0.005, max_dtype_mismatch_rate=0.0, max_out_of_range_rate=0.01)
+
+    assert "Vintage: missing" in violations
+    assert any(violation.startswith("Region_Code: null_rate") for violation in violations)
+    assert any(violation.startswith("Age: dtype_mismatch_rate") for violation in violations)
+    assert not any(violation.startswith("Annual_Premium") for violation in violations)
@@ -0,0 +1,97 @@
+"""
+Merging drift sketches of chunks must give the sketch of the concatenated data: category counts and
+row counts exactly, numeric quantiles within the rank error of the KLL sketch.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
+from vehicle_insurance_prediction.utils.drift_sketch import DriftSketch, KllSketch
+
+N_ROWS = 200_000
+# rank error allowed for k=200; the expected error is well below 1%
+RANK_TOLERANCE = 0.01
+FRACTIONS = np.linspace(0.01, 0.99, 99)
+
+
+def _rank_errors(sketch, values):
+    values = np.sort(values[~np.isnan(values)])
+    ranks = np.searchsorted(values, sketch.quantiles(FRACTIONS), side="right") / len(values)
+    return np.abs(ranks - FRACTIONS)
+
+
+def _frame(rng, n_rows, premium_shift=0.0):
+    df = pd.DataFrame({
+        "Gender": rng.choice(["Male", "Female"], n_rows, p=[0.54, 0.46]),
+        "Age": rng.integers(20, 86, n_rows),
+        "Vehicle_Damage": rng.choice(["Yes", "No"], n_rows),
+        "Annual_Premium": rng.lognormal(10.3, 0.4, n_rows) + premium_shift,
+        "Response": rng.integers(0, 2, n_rows),
+    })
+    df.loc[df.sample(frac=0.01, random_state=0).index, "Annual_Premium"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def column_specs():
+    specs = load_schema().column_specs
+    return {column: specs[column] for column in ("Gender", "Age", "Vehicle_Damage", "Annual_Premium", "Response")}
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return _frame(np.random.default_rng(0), N_ROWS)
+
+
+def test_kll_merge_keeps_the_weight_and_the_rank_error():
+    values = np.random.default_rng(1).normal(size=N_ROWS)
+    merged = KllSketch(seed=0)
+    for i, chunk in enumerate(np.array_split(values, 16)):
+        chunk_sketch = KllSketch(seed=i + 1)
+        chunk_sketch.update(chunk)
+        merged.merge(chunk_sketch)
+
+    assert merged.n == N_ROWS
+    assert merged._sorted_items()[1][-1] == N_ROWS
+    assert len(merged.values()) < 5 * merged.k
+    assert _rank_errors(merged, values).max() < RANK_TOLERANCE
+
+
+def test_merged_sketch_equals_sketch_of_concatenated_data(column_specs, frame):
+    whole = DriftSketch.from_chunk(column_specs, frame)
+    merged = DriftSketch(column_specs)
+    for start in range(0, N_ROWS, 30_000):
+        merged.merge(DriftSketch.from_chunk(column_specs, frame.iloc[start:start + 30_000]))
+
+    assert merged.n_rows == whole.n_rows == N_ROWS
+    assert merged.frequencies == whole.frequencies
+    for column in ("Age", "Annual_Premium"):
+        values = frame[column].to_numpy(dtype=np.float64)
+        assert merged.numeric[column].n == whole.numeric[column].n == int(np.isfinite(values).sum())
+        assert _rank_errors(merged.numeric[column], values).max() < RANK_TOLERANCE
+    scores = merged.drift(whole)
+    assert scores["Annual_Premium"]["psi"] < 0.01
+    assert scores["Annual_Premium"]["ks"] < 2 * RANK_TOLERANCE
+    assert scores["Gender"]["psi"] == 0
+
+
+def test_drift_flags_a_shifted_column(column_specs, frame):
+    reference = DriftSketch.from_chunk(column_specs, frame)
+    shifted = DriftSketch.from_chunk(column_specs, _frame(np.random.default_rng(2), 50_000, premium_shift=15_000))
+
+    scores = shifted.drift(reference)
+
+    assert scores["Annual_Premium"]["psi"] > 0.2
+    assert scores["Age"]["psi"] < 0.05
+
+
+def test_serialized_sketch_scores_like_the_original(column_specs, frame):
+    sketch = DriftSketch.from_chunk(column_specs, frame)
+    restored = DriftSketch.from_dict(sketch.to_dict())
+    current = DriftSketch.from_chunk(column_specs, _frame(np.random.default_rng(3), 50_000))
+
+    assert current.drift(restored) == current.drift(sketch)
@@ -0,0 +1,70 @@
+"""
+The compact dtype plan must give every batch of a file the same dtypes, whether or not the batch
+contains missing values or every category, and must not change the values it casts.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
+from vehicle_insurance_prediction.exception import MyException
+from vehicle_insurance_prediction.utils.main_utils import apply_dtype_plan
+
+
+@pytest.fixture(scope="module")
+def dtype_plan():
+    return load_schema().get_dtype_plan()
+
+
+def _batch(**overrides):
+    batch = pd.DataFrame({
+        "Gender": ["Male", "Female"], "Age": [44, 76], "Driving_License": [1, 1], "Region_Code": [28.0, 3.0],
+        "Previously_Insured": [0, 1], "Vehicle_Age": ["> 2 Years", "1-2 Year"], "Vehicle_Damage": ["Yes", "No"],
+        "Annual_Premium": [40454.0, 33536.0], "Policy_Sales_Channel": [26.0, 152.0], "Vintage": [217, 183],
+        "Response": [1, 0],
+    })
+    for column, values in overrides.items():
+        batch[column] = values
+    return batch
+
+
+def test_dtypes_do_not_depend_on_the_batch(dtype_plan):
+    complete = apply_dtype_plan(_batch(), dtype_plan)
+    with_missing = apply_dtype_plan(_batch(Age=[44, np.nan], Gender=["Male", None]), dtype_plan)
+    one_category = apply_dtype_plan(_batch(Vehicle_Damage=["No", "No"]), dtype_plan)
+
+    assert complete.dtypes.to_dict() == with_missing.dtypes.to_dict() == one_category.dtypes.to_dict()
+    assert list(one_category["Vehicle_Damage"].cat.categories) == list(complete["Vehicle_Damage"].cat.categories)
+
+
+def test_values_survive_the_cast(dtype_plan):
+    batch = _batch(Age=[44, np.nan])
+    planned = apply_dtype_plan(batch, dtype_plan)
+
+    for column in batch.columns:
+        if batch[column].dtype == object:
+            assert planned[column].astype(object).where(planned[column].notna(), None).tolist() == \
+                batch[column].where(batch[column].notna(), None).tolist()
+        else:
+            np.testing.assert_allclose(planned[column].to_numpy(dtype=np.float64, na_value=np.nan),
+                                       batch[column].to_numpy(dtype=np.float64), rtol=1e-6)
+
+
+def test_unknown_category_becomes_missing(dtype_plan):
+    planned = apply_dtype_plan(_batch(Gender=["Male", "Other"]), dtype_plan)
+
+    assert planned["Gender"].tolist()[0] == "Male"
+    assert pd.isna(planned["Gender"].tolist()[1])
+
+
+def test_missing_target_is_rejected(dtype_plan):
+    with pytest.raises(MyException):
+        apply_dtype_plan(_batch(Response=[1, np.nan]), dtype_plan)
+
+
+def test_out_of_range_integer_is_rejected(dtype_plan):
+    with pytest.raises(MyException):
+        apply_dtype_plan(_batch(Age=[44, 40_000]), dtype_plan)
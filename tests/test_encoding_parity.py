@@ -0,0 +1,105 @@
+"""
+The encoding pushdown must produce the same features as RawFeatureEncoder does on the same documents.
+
+The stages of Proj1Data.build_encoding_stages are evaluated in Python on fixture documents, so no
+MongoDB is needed. The fixtures hold every vocabulary value, and "na" in each field on its own and in
+all fields at once.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
+from vehicle_insurance_prediction.utils.feature_encoder import RawFeatureEncoder
+
+DOCUMENTS = [
+    {"id": 1, "Gender": "Male", "Age": 44, "Driving_License": 1, "Region_Code": 28.0, "Previously_Insured": 0,
+     "Vehicle_Age": "> 2 Years", "Vehicle_Damage": "Yes", "Annual_Premium": 40454.0,
+     "Policy_Sales_Channel": 26.0, "Vintage": 217, "Response": 1},
+    {"id": 2, "Gender": "Female", "Age": 76, "Driving_License": 1, "Region_Code": 3.0, "Previously_Insured": 0,
+     "Vehicle_Age": "1-2 Year", "Vehicle_Damage": "No", "Annual_Premium": 33536.0,
+     "Policy_Sales_Channel": 26.0, "Vintage": 183, "Response": 0},
+    {"id": 3, "Gender": "Female", "Age": 21, "Driving_License": 0, "Region_Code": 11.0, "Previously_Insured": 1,
+     "Vehicle_Age": "< 1 Year", "Vehicle_Damage": "No", "Annual_Premium": 2630.0,
+     "Policy_Sales_Channel": 152.0, "Vintage": 27, "Response": 0},
+]
+
+
+def _evaluate(expression, document):
+    """Evaluates the aggregation expressions build_encoding_stages emits against one document."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return document.get(expression[1:])
+    if not isinstance(expression, dict):
+        return expression
+    (operator, argument), = expression.items()
+    if operator == "$eq":
+        left, right = (_evaluate(operand, document) for operand in argument)
+        return left == right
+    if operator == "$cond":
+        condition, then, otherwise = argument
+        return _evaluate(then if _evaluate(condition, document) else otherwise, document)
+    if operator == "$switch":
+        for branch in argument["branches"]:
+            if _evaluate(branch["case"], document):
+                return _evaluate(branch["then"], document)
+        return _evaluate(argument.get("default"), document)
+    raise NotImplementedError(f"Operator {operator} is not evaluated by this test")
+
+
+def _run_stages(stages, documents):
+    for stage in stages:
+        (name, projection), = stage.items()
+        if name != "$project":
+            raise NotImplementedError(f"Stage {name} is not evaluated by this test")
+        documents = [
+            {field: document.get(field) if spec == 1 else _evaluate(spec, document)
+             for field, spec in projection.items() if spec != 0}
+            for document in documents
+        ]
+    return documents
+
+
+def _fixture_documents():
+    documents = list(DOCUMENTS)
+    # "na" in each field on its own, then in every field at once
+    documents += [{**DOCUMENTS[0], field: "na"} for field in DOCUMENTS[0]]
+    documents.append({field: "na" for field in DOCUMENTS[0]})
+    return documents
+
+
+@pytest.fixture(scope="module")
+def schema():
+    return load_schema()
+
+
+def test_pushdown_matches_raw_feature_encoder(schema):
+    documents = _fixture_documents()
+
+    raw_df = Proj1Data._documents_to_frame(documents, ["id", *schema.columns])
+    features_df = raw_df.drop(columns=[schema.target_column])
+    encoder = RawFeatureEncoder(drop_columns=schema.drop_columns).fit(features_df)
+    expected = encoder.transform(features_df)
+
+    columns = list(schema.encoded_columns)
+    numeric_columns = [column for column in schema.columns if schema.dtypes[column] != "object"]
+    stages = Proj1Data.build_encoding_stages(columns, numeric_columns)
+    pushed_df = Proj1Data._documents_to_frame(_run_stages(stages, documents), columns, replace_na=False)
+
+    assert list(encoder.feature_names_out_) == [column for column in columns if column != schema.target_column]
+    np.testing.assert_array_equal(
+        pushed_df[list(encoder.feature_names_out_)].to_numpy(dtype=np.float64, na_value=np.nan),
+        expected.to_numpy(dtype=np.float64),
+    )
+
+
+def test_pushdown_nulls_na_target(schema):
+    columns = list(schema.encoded_columns)
+    numeric_columns = [column for column in schema.columns if schema.dtypes[column] != "object"]
+    pushed = _run_stages(Proj1Data.build_encoding_stages(columns, numeric_columns), _fixture_documents())
+
+    assert [document[schema.target_column] for document in pushed[:len(DOCUMENTS)]] == \
+        [document[schema.target_column] for document in DOCUMENTS]
+    assert pushed[-1][schema.target_column] is None
@@ -0,0 +1,79 @@
+"""
+Decoding raw server batches without the encoding pushdown must give the same frame as the baseline
+export, which built a DataFrame from the documents of `find()` and replaced "na" with NaN.
+
+The raw batches are BSON-encoded fixture documents, so no MongoDB is needed. The fixtures hold "na"
+in each field on its own and in all fields at once.
+
+Usage:
+    python -m pytest tests
+"""
+import bson
+import numpy as np
+import pandas as pd
+import pytest
+
+from vehicle_insurance_prediction.data_access.proj1_data import Proj1Data
+from vehicle_insurance_prediction.entity.schema_entity import load_schema
+
+DOCUMENTS = [
+    {"id": 1, "Gender": "Male", "Age": 44, "Driving_License": 1, "Region_Code": 28.0, "Previously_Insured": 0,
+     "Vehicle_Age": "> 2 Years", "Vehicle_Damage": "Yes", "Annual_Premium": 40454.0,
+     "Policy_Sales_Channel": 26.0, "Vintage": 217, "Response": 1},
+    {"id": 2, "Gender": "Female", "Age": 76, "Driving_License": 1, "Region_Code": 3.0, "Previously_Insured": 0,
+     "Vehicle_Age": "1-2 Year", "Vehicle_Damage": "No", "Annual_Premium": 33536.0,
+     "Policy_Sales_Channel": 26.0, "Vintage": 183, "Response": 0},
+]
+
+
+def _fixture_documents():
+    documents = list(DOCUMENTS)
+    documents += [{**DOCUMENTS[0], field: "na"} for field in DOCUMENTS[0]]
+    documents.append({field: "na" for field in DOCUMENTS[0]})
+    return [{"_id": bson.ObjectId(), **document} for document in documents]
+
+
+def _baseline_export(documents, columns):
+    """The export before batching: find() with the projection of `columns`, then "na" -> NaN."""
+    projected = [{column: document[column] for column in columns if column in document} for document in documents]
+    df = pd.DataFrame(projected, columns=columns)
+    df.replace({"na": np.nan}, inplace=True)
+    return df
+
+
+def _assert_same_values(actual, expected, dtypes):
+    assert list(actual.columns) == list(expected.columns)
+    assert len(actual) == len(expected)
+    for column in expected.columns:
+        if dtypes[column] == "object":
+            assert actual[column].where(actual[column].notna(), None).tolist() == \
+                expected[column].where(expected[column].notna(), None).tolist(), column
+        else:
+            np.testing.assert_array_equal(pd.to_numeric(actual[column]).to_numpy(dtype=np.float64),
+                                          pd.to_numeric(expected[column]).to_numpy(dtype=np.float64), err_msg=column)
+
+
+@pytest.fixture(scope="module")
+def schema():
+    return load_schema()
+
+
+def test_dict_decoding_matches_find_export(schema):
+    documents = _fixture_documents()
+    columns = ["id", *schema.columns]
+    raw_batch = b"".join(bson.encode(document) for document in documents)
+
+    decoded = Proj1Data.decode_raw_batch(raw_batch, columns)
+
+    pd.testing.assert_frame_equal(decoded, _baseline_export(documents, columns))
+
+
+def test_column_decoding_matches_find_export(schema):
+    pytest.importorskip("pymongoarrow")
+    documents = _fixture_documents()
+    field_types = {"id": "int64", **dict(schema.dtypes)}
+    raw_batch = b"".join(bson.encode(document) for document in documents)
+
+    decoded = Proj1Data.decode_raw_batch(raw_batch, list(field_types), field_types=field_types)
+
+    _assert_same_values(decoded, _baseline_export(documents, list(field_types)), field_types)
@@ -0,0 +1,51 @@
+"""
+The hash split must put every row on the same side on every run, whatever the row order, the chunking
+or the dtype the split key arrived with.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+
+from vehicle_insurance_prediction.components.data_ingestion import DataIngestion
+
+N_ROWS = 20_000
+
+
+def _frame(ids):
+    return pd.DataFrame({"id": ids, "Response": np.arange(len(ids)) % 2})
+
+
+def test_assignment_is_stable_across_runs():
+    ids = np.arange(1, N_ROWS + 1)
+    first = DataIngestion().get_test_mask(_frame(ids))
+    second = DataIngestion().get_test_mask(_frame(ids))
+
+    np.testing.assert_array_equal(first, second)
+
+
+def test_assignment_does_not_depend_on_order_or_chunks():
+    ids = np.arange(1, N_ROWS + 1)
+    data_ingestion = DataIngestion()
+    expected = dict(zip(ids, data_ingestion.get_test_mask(_frame(ids))))
+
+    shuffled = np.random.default_rng(0).permutation(ids)
+    for chunk in np.array_split(shuffled, 7):
+        mask = data_ingestion.get_test_mask(_frame(chunk))
+        assert [expected[key] for key in chunk] == mask.tolist()
+
+
+def test_assignment_does_not_depend_on_key_dtype():
+    ids = np.arange(1, N_ROWS + 1)
+    data_ingestion = DataIngestion()
+
+    np.testing.assert_array_equal(data_ingestion.get_test_mask(_frame(ids)),
+                                  data_ingestion.get_test_mask(_frame(ids.astype("float64"))))
+
+
+def test_test_fraction_follows_the_split_ratio():
+    data_ingestion = DataIngestion()
+    mask = data_ingestion.get_test_mask(_frame(np.arange(1, N_ROWS + 1)))
+
+    assert abs(mask.mean() - data_ingestion.data_ingestion_config.train_test_split_ratio) < 0.02
@@ -0,0 +1,86 @@
+"""
+The successive-halving search must draw configurations inside the search space, score every trial on
+one stratified validation split no trial trains on, promote the best 1/reduction_factor of every rung
+onto more rows, and give the same result for the same random state.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from vehicle_insurance_prediction.utils.hyperparameter_search import SuccessiveHalvingSearch, sample_params
+
+SEARCH_SPACE = {
+    "n_estimators": {"type": "int", "low": 10, "high": 30, "step": 10},
+    "max_depth": {"type": "int", "low": 2, "high": 8},
+    "min_samples_leaf": {"type": "float", "low": 0.001, "high": 0.05, "log": True},
+    "criterion": {"type": "choice", "values": ["gini", "entropy"]},
+}
+
+
+@pytest.fixture(scope="module")
+def arrays(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    n_rows = 3_000
+    y = (rng.random(n_rows) < 0.2).astype(np.int8)
+    x = rng.normal(size=(n_rows, 5)).astype(np.float32)
+    x[:, 0] += 1.5 * y
+    directory = tmp_path_factory.mktemp("transformed")
+    features_file_path, target_file_path = str(directory / "train.npy"), str(directory / "train_target.npy")
+    np.save(features_file_path, x)
+    np.save(target_file_path, y)
+    return features_file_path, target_file_path
+
+
+def _search(**kwargs):
+    settings = dict(model_class="RandomForestClassifier", params={"random_state": 42}, search_space=SEARCH_SPACE,
+                    n_trials=9, reduction_factor=3, min_rows=300, validation_fraction=0.25, n_workers=1, n_jobs=1)
+    settings.update(kwargs)
+    return SuccessiveHalvingSearch(**settings)
+
+
+def test_sampled_params_stay_in_the_search_space():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        params = sample_params(SEARCH_SPACE, rng)
+        assert params["n_estimators"] in (10, 20, 30)
+        assert isinstance(params["max_depth"], int) and 2 <= params["max_depth"] <= 8
+        assert 0.001 <= params["min_samples_leaf"] <= 0.05
+        assert params["criterion"] in ("gini", "entropy")
+
+
+def test_validation_rows_are_stratified_and_held_out():
+    y = np.array([0] * 800 + [1] * 200)
+    validation_rows, train_rows = _search()._split_rows(y, np.random.default_rng(0))
+
+    assert not set(validation_rows) & set(train_rows)
+    assert len(validation_rows) + len(train_rows) == len(y)
+    assert np.bincount(y[validation_rows]).tolist() == [200, 50]
+
+
+def test_rungs_promote_the_best_trials_onto_more_rows(arrays):
+    best_params, history = _search().search(*arrays)
+
+    rungs = sorted({entry["rung"] for entry in history})
+    trials_per_rung = [[entry for entry in history if entry["rung"] == rung] for rung in rungs]
+    assert [len(trials) for trials in trials_per_rung] == [9, 3, 1]
+    n_rows = [trials[0]["n_rows"] for trials in trials_per_rung]
+    # the last rung trains on every row left after holding out the validation quarter
+    assert n_rows[:2] == [300, 900] and abs(n_rows[2] - 2_250) <= 1
+    for trials, next_trials in zip(trials_per_rung, trials_per_rung[1:]):
+        promoted = {entry["trial"] for entry in trials if entry["status"] == "promoted"}
+        assert promoted == {entry["trial"] for entry in next_trials}
+        assert min(entry["score"] for entry in trials if entry["trial"] in promoted) >= \
+            max(entry["score"] for entry in trials if entry["trial"] not in promoted)
+    best = [entry for entry in history if entry["status"] == "best"]
+    assert len(best) == 1 and best[0]["params"] == best_params
+    assert best_params["random_state"] == 42
+
+
+def test_search_is_reproducible(arrays):
+    first_params, first_history = _search().search(*arrays)
+    second_params, second_history = _search().search(*arrays)
+
+    assert first_params == second_params
+    assert [entry["score"] for entry in first_history] == [entry["score"] for entry in second_history]
@@ -0,0 +1,66 @@
+"""
+ScalableResampler must balance the classes with synthetic minority rows interpolated between real
+ones, drop the rows ENN cleaning rejects, and give the same output for the same random state.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from vehicle_insurance_prediction.utils.resampling import ScalableResampler
+
+
+@pytest.fixture(scope="module")
+def imbalanced():
+    rng = np.random.default_rng(0)
+    X = np.concatenate([rng.normal(0, 1, (2_000, 4)), rng.normal(6, 1, (200, 4))]).astype(np.float32)
+    y = np.concatenate([np.zeros(2_000, dtype=np.int8), np.ones(200, dtype=np.int8)])
+    return X, y
+
+
+def test_oversampling_balances_with_interpolated_rows(imbalanced):
+    X, y = imbalanced
+    resampler = ScalableResampler(chunk_size=300, n_jobs=1)
+
+    X_over, y_over = resampler._oversample(X, y, np.random.default_rng(0))
+
+    assert X_over.dtype == X.dtype and y_over.dtype == y.dtype
+    assert np.bincount(y_over).tolist() == [2_000, 2_000]
+    np.testing.assert_array_equal(X_over[:len(X)], X)
+    synthetic, minority = X_over[len(X):], X[y == 1]
+    assert (synthetic >= minority.min(axis=0) - 1e-5).all() and (synthetic <= minority.max(axis=0) + 1e-5).all()
+
+
+def test_max_synthetic_rows_caps_oversampling(imbalanced):
+    X, y = imbalanced
+    resampler = ScalableResampler(max_synthetic_rows=500, n_jobs=1)
+
+    _, y_over = resampler._oversample(X, y, np.random.default_rng(0))
+
+    assert np.bincount(y_over).tolist() == [2_000, 700]
+
+
+def test_cleaning_drops_rows_whose_neighbours_disagree(imbalanced):
+    X, y = imbalanced
+    # a minority row in the middle of the majority cluster
+    X = np.concatenate([X, np.zeros((1, 4), dtype=X.dtype)])
+    y = np.concatenate([y, np.ones(1, dtype=y.dtype)])
+
+    X_clean, y_clean = ScalableResampler(n_jobs=1)._clean(X, y, np.random.default_rng(0))
+
+    assert not ((y_clean == 1) & (np.abs(X_clean).max(axis=1) == 0)).any()
+    # the separated clusters themselves lose almost nothing
+    assert len(y_clean) > 0.99 * len(y) - 1
+
+
+@pytest.mark.parametrize("approximate", [False, True])
+def test_fit_resample_is_reproducible(imbalanced, approximate):
+    X, y = imbalanced
+    first = ScalableResampler(approximate=approximate, block_size=500, n_jobs=1).fit_resample(X, y)
+    second = ScalableResampler(approximate=approximate, block_size=500, n_jobs=1).fit_resample(X, y)
+
+    np.testing.assert_array_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])
+    counts = np.bincount(first[1])
+    assert abs(int(counts[0]) - int(counts[1])) < 0.05 * counts.sum()
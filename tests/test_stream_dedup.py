@@ -0,0 +1,66 @@
+"""
+The streaming deduplicator must drop exact repeats of earlier rows, within a batch and across
+batches, and keep every row that differs from all earlier ones in any key column.
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+
+from vehicle_insurance_prediction.utils.stream_dedup import StreamDeduplicator
+
+KEY_COLUMNS = ["Gender", "Age", "Annual_Premium", "Response"]
+
+
+def _rows(*rows):
+    return pd.DataFrame(list(rows), columns=KEY_COLUMNS)
+
+
+def test_drops_exact_repeats_only():
+    deduplicator = StreamDeduplicator(KEY_COLUMNS, expected_rows=1_000)
+    first = deduplicator.filter(_rows(
+        ["Male", 44, 40454.0, 1],
+        ["Male", 44, 40454.0, 1],    # repeat within the batch
+        ["Male", 44, 40454.0, 0],    # differs in the target only
+        ["Female", 44, 40454.0, 1],  # differs in a feature only
+    ))
+    second = deduplicator.filter(_rows(
+        ["Male", 44, 40454.0, 1],    # repeat of the first batch
+        ["Male", 45, 40454.0, 1],
+        ["Male", 44, np.nan, 1],
+        ["Male", 44, np.nan, 1],     # missing values repeat like any other value
+    ))
+
+    assert first.index.tolist() == [0, 2, 3]
+    assert second.index.tolist() == [1, 2]
+    assert deduplicator.report() == {"key_columns": KEY_COLUMNS, "rows_seen": 8, "duplicates_dropped": 3,
+                                     "dedup_ratio": 0.375}
+
+
+def test_same_value_in_another_dtype_is_a_repeat():
+    deduplicator = StreamDeduplicator(KEY_COLUMNS, expected_rows=1_000)
+    deduplicator.filter(_rows(["Male", 44, 40454.0, 1]))
+    batch = _rows(["Male", 44, 40454.0, 1]).astype({"Age": "float32", "Response": "int8"})
+
+    assert deduplicator.filter(batch).empty
+
+
+def test_distinct_rows_all_survive_many_batches():
+    deduplicator = StreamDeduplicator(["id"], expected_rows=1_000, false_positive_rate=0.05)
+    ids = np.arange(20_000)
+    kept = sum(len(deduplicator.filter(pd.DataFrame({"id": batch}))) for batch in np.array_split(ids, 40))
+
+    assert kept == len(ids)
+    assert deduplicator.n_duplicates == 0
+
+
+def test_state_round_trip_keeps_deduplicating(tmp_path):
+    state_file_path = str(tmp_path / "dedup_state.npz")
+    deduplicator = StreamDeduplicator(["id"], expected_rows=1_000)
+    deduplicator.filter(pd.DataFrame({"id": [1, 2, 3]}))
+    deduplicator.save(state_file_path)
+
+    restored = StreamDeduplicator.load(state_file_path, ["id"], expected_rows=1_000)
+
+    assert restored.filter(pd.DataFrame({"id": [2, 3, 4]}))["id"].tolist() == [4]